@@ -1,11 +1,19 @@
 import streamlit as st
-import os
 import hashlib
-from datetime import datetime
-from utils.data import collect_user_data
-from utils.cv_generator import generate_cv_pdf
-from utils.encryption import encrypt_pdf
-from utils.dropbox_handler import upload_to_dropbox, test_connection
+import sqlite3
+import time
+from utils.data import collect_user_data, reset_form
+from utils.cv_generator import cv_filename, input_hash
+from utils.storage import create_backend, storage_settings, StorageError
+from utils.preview import show_live_preview
+from utils.submission_log import SubmissionLog, submission_row, DEFAULT_LOG_DIR
+from utils.cv_index import CVIndex, DEFAULT_INDEX_PATH
+from utils.render_pool import RenderPool, PoolBusy, pool_settings
+from utils.cv_queue import (CVQueue, QueuedCV, store_cv, store_sidecar, trim_entries,
+                            QUEUED, RENDERING, UPLOADING, DONE, UPLOAD_FAILED, FAILED)
+from utils.profiling import profile, profile_settings, configure as configure_profiling
+from utils.sidecar import sidecar_key
+from utils.retry_policy import retry_summary
 
 def hash_password(password):
     """Generate SHA256 hash of the password"""
@@ -56,6 +64,110 @@ def logout():
     st.session_state.user_data = {}
     st.rerun()
 
+@st.cache_resource
+def get_storage(settings):
+    """One storage backend per process, shared by all sessions"""
+    return create_backend(settings)
+
+@st.cache_resource
+def get_submission_log(settings):
+    """One buffered submission log per process, shared by all sessions"""
+    return SubmissionLog(
+        log_dir=settings.get("dir", DEFAULT_LOG_DIR),
+        include_pii=settings.get("include_pii", False)
+    )
+
+@st.cache_resource
+def get_cv_index(path):
+    """One index connection per process, shared by all sessions"""
+    return CVIndex(path)
+
+# One entry each: when the template or settings change, the old workers and threads are shut down
+@st.cache_resource(max_entries=1, on_release=lambda pool: pool.shutdown())
+def get_render_pool(settings, template, profiling):
+    """One warm pool of render worker processes per app process, shared by all sessions"""
+    return RenderPool(template=template, profiling=profiling, **settings)
+
+@st.cache_resource(max_entries=1, on_release=lambda queue: queue.shutdown())
+def get_cv_queue(settings, template, profiling):
+    """One set of queue-mode threads per app process, feeding the shared render pool"""
+    return CVQueue(get_render_pool(settings, template, profiling))
+
+QUEUE_REFRESH_SECONDS = 2
+QUEUE_STATUS_LABELS = {
+    QUEUED: "⏳ Queued",
+    RENDERING: "🔄 Creating PDF",
+    UPLOADING: "📤 Uploading",
+    DONE: "✅ Uploaded",
+    UPLOAD_FAILED: "⚠️ Upload failed",
+    FAILED: "❌ Failed",
+}
+
+def show_cv_queue(enqueue, polling=False):
+    """This session's queued candidates, newest first, with status and download links"""
+    entries = st.session_state.cv_queue
+    finished = [entry for entry in entries if entry.finished]
+    if polling and len(finished) == len(entries):
+        # All done: one full run stops the polling
+        st.rerun()
+    st.subheader(f"📋 Queue ({len(entries) - len(finished)} in progress)")
+    if not entries:
+        st.caption("Candidates you add appear here while their CVs are generated.")
+        return
+    
+    done = sum(entry.status == DONE for entry in entries)
+    hours = (time.time() - min(entry.queued_at for entry in entries)) / 3600
+    if done and hours > 0:
+        st.caption(f"{done} uploaded this session · {done / max(hours, 1 / 60):.0f} candidates/hour")
+    # Dropbox retries and throttling, process-wide: explains slow uploads
+    retries = retry_summary()
+    if retries:
+        st.caption(f"🔁 {retries}")
+    
+    for entry in entries:
+        with st.container(border=True):
+            status = QUEUE_STATUS_LABELS[entry.status]
+            if entry.status == QUEUED and entry.jobs_ahead:
+                status += f" ({entry.jobs_ahead} ahead)"
+            st.markdown(f"**{entry.user_data['name']}** — {entry.user_data['phone']}  \n{status}")
+            if entry.error:
+                st.caption(entry.error)
+            if entry.pdf is not None:
+                st.download_button("📥 Download", data=entry.pdf, file_name=entry.filename,
+                                   mime="application/pdf", key=f"cv_queue_download_{entry.id}", on_click="ignore")
+            retry_label = "🔁 Retry upload" if entry.pdf is not None else "🔁 Retry"
+            if entry.status in (UPLOAD_FAILED, FAILED) and st.button(retry_label, key=f"cv_queue_retry_{entry.id}"):
+                enqueue(entry)
+                st.rerun()
+
+def show_existing_cv_search(index, storage):
+    """Search box over the local CV index; links are fetched only on request"""
+    with st.expander("🔎 Check for an existing CV"):
+        query = st.text_input("Name or phone number", key="cv_search_query")
+        if not query.strip():
+            return
+        
+        matches = index.search(query, limit=10)
+        if not matches:
+            st.caption("No existing CV found.")
+            return
+        
+        for match in matches:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.markdown(f"**{match['name']}** — {match['phone']}  \n`{match['path']}` · {match['updated_at']}")
+            with col2:
+                if st.button("🔗 Get link", key=f"cv_link_{match['id']}"):
+                    try:
+                        link = storage.link(match['path'])
+                    except StorageError as e:
+                        link = None
+                        st.error(f"❌ {e}")
+                    if link:
+                        st.markdown(f"[📥 Download existing CV]({link})")
+                    else:
+                        st.warning("⚠️ File not found in storage — it may have been moved or deleted.")
+
 def main():
     st.set_page_config(
         page_title="CV Generator",
@@ -89,79 +201,204 @@ def main():
         st.session_state.step = 1
     if 'user_data' not in st.session_state:
         st.session_state.user_data = {}
+    if 'cv_queue' not in st.session_state:
+        st.session_state.cv_queue = []
+    
+    # Storage: backend and folder from secrets (defaults to Dropbox)
+    settings = storage_settings(st.secrets)
+    storage = get_storage(settings)
+    storage_folder = settings["folder"]
+
+    # CV template: optional per-client override (name in utils/templates or a file path)
+    cv_template = st.secrets.get("cv", {}).get("template", "default")
+    cv_renderer = st.secrets.get("cv", {}).get("renderer", "platypus")
+    cv_linearize = st.secrets.get("cv", {}).get("linearize", False)
+    cv_deterministic = st.secrets.get("cv", {}).get("deterministic", False)
+    cv_password = st.secrets.get("cv", {}).get("password", "gbl")
+    cv_queue_mode = st.secrets.get("cv", {}).get("queue_mode", False)
+    cv_sidecar_key = sidecar_key(st.secrets)
+    
+    # Profiling of slow submissions: optional, applied here and in the render workers
+    profiling = profile_settings(st.secrets)
+    configure_profiling(profiling)
     
-    # Dropbox: optional folder path override
-    dropbox_folder = st.secrets["dropbox"].get("folder_path", "/CVs")
+    # Render workers: CPU-heavy rendering/encryption runs off the script thread
+    render_pool = get_render_pool(pool_settings(st.secrets), cv_template, profiling)
     
-    # Test Dropbox on first load
-    if 'dropbox_status' not in st.session_state:
-        st.session_state.dropbox_status = test_connection()
+    # Submission log: optional directory / PII settings
+    log_settings = dict(st.secrets.get("submission_log", {}))
     
-    # Show Dropbox status
-    if st.session_state.dropbox_status:
-        st.info(f"✅ Dropbox connection verified — folder: `{dropbox_folder}`")
+    # Index of existing CVs: optional database path
+    cv_index = get_cv_index(st.secrets.get("cv_index", {}).get("path", DEFAULT_INDEX_PATH))
+    
+    # Queue mode: background render and upload, so operators can enter the next candidate at once
+    cv_queue = get_cv_queue(pool_settings(st.secrets), cv_template, profiling)
+    def enqueue(entry):
+        cv_queue.submit(entry, storage, storage_folder, cv_index, get_submission_log(log_settings),
+                        cv_template, cv_renderer, cv_password, cv_linearize, cv_deterministic,
+                        cv_sidecar_key)
+    
+    # Test storage on first load
+    if 'storage_status' not in st.session_state:
+        st.session_state.storage_status = storage.health()
+    
+    # Show storage status
+    if st.session_state.storage_status:
+        st.info(f"✅ {storage.name} connection verified — folder: `{storage_folder}`")
     else:
-        st.warning("⚠️ Dropbox not connected — check secrets.toml")
+        st.warning(f"⚠️ {storage.name} not connected — check secrets.toml")
 
     # Step 1 — Form Input
     if st.session_state.step == 1:
+        show_existing_cv_search(cv_index, storage)
+        
         st.header("📝 Personal Information")
-        user_data = collect_user_data()
+        toggle_col1, toggle_col2 = st.columns(2)
+        with toggle_col1:
+            live_preview = st.toggle("👀 Live preview", value=False)
+        with toggle_col2:
+            queue_mode = st.toggle("⚡ Queue mode", value=cv_queue_mode,
+                                   help="Add candidates back to back while earlier CVs are generated and uploaded")
+        
+        # Side panel for queued candidates (the sidebar is hidden), shown while there are any
+        show_queue = queue_mode or bool(st.session_state.cv_queue)
+        widths = [3] + ([2] if live_preview else []) + ([2] if show_queue else [])
+        columns = st.columns(widths) if len(widths) > 1 else [st.container()]
+        form_col = columns[0]
+        preview_col = columns[1] if live_preview else None
+        queue_col = columns[-1] if show_queue else None
         
-        if user_data and st.button("Generate CV", type="primary"):
-            st.session_state.user_data = user_data
-            st.session_state.step = 2
-            st.rerun()
+        with form_col:
+            user_data = collect_user_data()
+            
+            draft_phone = st.session_state.get('cv_draft', {}).get('phone')
+            existing = cv_index.find_by_phone(draft_phone)
+            if existing:
+                st.warning(f"⚠️ A CV for this phone number already exists: `{existing[0]['path']}` "
+                           f"({existing[0]['updated_at']}). Use the search above to get its link.")
+            if draft_phone and any(entry.user_data['phone'] == draft_phone for entry in st.session_state.cv_queue):
+                st.warning("⚠️ A candidate with this phone number is already in your queue.")
+        
+            if queue_mode:
+                if user_data and st.button("➕ Add to Queue", type="primary"):
+                    st.session_state.cv_queue.insert(0, QueuedCV(user_data))
+                    enqueue(st.session_state.cv_queue[0])
+                    st.session_state.cv_queue = trim_entries(st.session_state.cv_queue)
+                    reset_form()
+                    st.rerun()
+            elif user_data and st.button("Generate CV", type="primary"):
+                st.session_state.user_data = user_data
+                st.session_state.step = 2
+                st.rerun()
+        
+        if preview_col is not None:
+            with preview_col:
+                show_live_preview(cv_template)
+        
+        if queue_col is not None:
+            with queue_col:
+                # Refreshes on its own while CVs are in progress, without re-running the form
+                in_progress = any(not entry.finished for entry in st.session_state.cv_queue)
+                st.fragment(show_cv_queue, run_every=QUEUE_REFRESH_SECONDS if in_progress else None)(enqueue, in_progress)
     
     # Step 2 — PDF Generation
     elif st.session_state.step == 2:
         st.header("🔄 Generating Your CV...")
         
         try:
-            with st.spinner("Creating PDF..."):
-                pdf_path = generate_cv_pdf(st.session_state.user_data)
-            
-            with st.spinner("Securing PDF..."):
-                dob = st.session_state.user_data['dob']
-                password = "gbl"
-                encrypted_pdf_path = encrypt_pdf(pdf_path, password)
-            
-            name = st.session_state.user_data['name'].replace(" ", "-")
-            phone = st.session_state.user_data['phone']
-            final_filename = f"{name}-{phone}.pdf"
-            final_path = os.path.join(os.path.dirname(encrypted_pdf_path), final_filename)
-            os.rename(encrypted_pdf_path, final_path)
-            
-            st.success("✅ CV generated successfully!")
-            
-            # Download button
-            with open(final_path, "rb") as file:
+            password = cv_password
+            # Whole submission, render wait through upload and log; off unless [profiling] is set
+            with profile("step2", st.session_state.user_data):
+                try:
+                    job = render_pool.submit(
+                        st.session_state.user_data, cv_renderer, password, cv_linearize, cv_deterministic
+                    )
+                except PoolBusy as e:
+                    st.warning(f"⏳ {e} — please try again in a moment.")
+                    if st.button("Try Again"):
+                        st.rerun()
+                    return
+                
+                queue_status = st.empty()
+                def show_queue_position(ahead):
+                    if ahead:
+                        queue_status.info(f"⏳ {ahead} job{'s' if ahead != 1 else ''} ahead of you...")
+                    else:
+                        queue_status.info("🔄 Creating and securing PDF...")
+                
+                try:
+                    result = render_pool.result(job, on_wait=show_queue_position)
+                finally:
+                    queue_status.empty()
+                pdf_bytes = result["pdf"]
+                
+                final_filename = cv_filename(st.session_state.user_data)
+                
+                st.success("✅ CV generated successfully!")
+                
+                # Download button
                 st.download_button(
                     label="📥 Download CV",
-                    data=file.read(),
+                    data=pdf_bytes,
                     file_name=final_filename,
-                    mime="application/pdf"
+                    mime="application/pdf",
+                    on_click="ignore"
                 )
-            
-            # Upload to Dropbox
-            with st.spinner("Uploading to Dropbox..."):
-                uploaded = upload_to_dropbox(final_path, dropbox_folder, final_filename)
-                if uploaded:
-                    st.success("📤 Uploaded to Dropbox successfully!")
-                else:
-                    st.error("❌ Upload to Dropbox failed.")
-            
+                
+                # Upload to storage
+                with st.spinner(f"Uploading to {storage.name}..."):
+                    upload_started = time.perf_counter()
+                    try:
+                        stored_path = store_cv(storage, storage_folder, st.session_state.user_data, result)
+                        upload_status = "ok"
+                        st.success(f"📤 Uploaded to {storage.name} successfully!")
+                    except StorageError as e:
+                        upload_status = "failed"
+                        st.error(f"❌ Upload to {storage.name} failed: {e}")
+                    uploaded = time.perf_counter()
+                retries = retry_summary()
+                if retries:
+                    st.caption(f"🔁 {retries}")
+                
+                if upload_status == "ok":
+                    try:
+                        store_sidecar(storage, storage_folder, st.session_state.user_data, result,
+                                      cv_template, cv_renderer, cv_linearize, cv_sidecar_key)
+                    except StorageError as e:
+                        st.warning(f"⚠️ The CV was uploaded, but its re-render sidecar could not be saved: {e}")
+                    try:
+                        cv_index.upsert(
+                            st.session_state.user_data['name'],
+                            st.session_state.user_data['phone'],
+                            stored_path,
+                            storage.name,
+                            len(pdf_bytes)
+                        )
+                    except sqlite3.Error as e:
+                        st.warning(f"⚠️ The CV was uploaded, but the CV index could not be updated: {e}")
+                
+                # A rerun of Step 2 (e.g. another button) is the same submission: log it once
+                submission_key = input_hash(st.session_state.user_data, cv_template, cv_renderer, cv_linearize)
+                if st.session_state.get('logged_submission') != submission_key:
+                    get_submission_log(log_settings).append(submission_row(
+                        st.session_state.user_data,
+                        template=cv_template,
+                        renderer=cv_renderer,
+                        render_ms=result["render_ms"],
+                        encrypt_ms=result["encrypt_ms"],
+                        upload_ms=(uploaded - upload_started) * 1000,
+                        size_bytes=len(pdf_bytes),
+                        upload_status=upload_status,
+                        storage=storage.name
+                    ))
+                    st.session_state.logged_submission = submission_key
+                
             st.info(f"🔐 PDF Password: `{password}`:")
             
-            try:
-                os.remove(pdf_path)
-                os.remove(final_path)
-            except:
-                pass
-            
             if st.button("Generate Another CV"):
                 st.session_state.step = 1
                 st.session_state.user_data = {}
+                st.session_state.logged_submission = None
                 st.rerun()
         
         except Exception as e:
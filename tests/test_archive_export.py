@@ -0,0 +1,110 @@
+# tests/test_archive_export.py
+"""Streamed ZIP export: an interrupted upload resumes from its checkpoint"""
+import io
+import os
+import types
+import zipfile
+
+import pytest
+from dropbox.exceptions import ApiError
+from dropbox.files import UploadSessionAppendError, UploadSessionOffsetError
+
+import utils.archive_export as archive_export
+from utils.archive_export import export_archive
+
+FILES = {f"cv-{i:02d}.pdf": bytes([i]) * (30000 + i) for i in range(40)}
+
+
+class FakeDropbox:
+    """Upload sessions in memory; drops the connection on the chosen append"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.files = {}
+        self.appends = 0
+        self.fail_on = None         # append number that never reaches Dropbox
+        self.lose_ack_on = None     # append number Dropbox stores but never confirms
+
+    def files_upload_session_start(self, data):
+        session_id = f"session-{len(self.sessions)}"
+        self.sessions[session_id] = bytearray(data)
+        return types.SimpleNamespace(session_id=session_id)
+
+    def files_upload_session_append_v2(self, data, cursor):
+        received = self.sessions[cursor.session_id]
+        if cursor.offset != len(received):
+            error = UploadSessionAppendError.incorrect_offset(UploadSessionOffsetError(correct_offset=len(received)))
+            raise ApiError("request-id", error, None, None)
+        if not data:
+            return
+        self.appends += 1
+        if self.appends == self.fail_on:
+            raise ConnectionError("connection reset")
+        received += data
+        if self.appends == self.lose_ack_on:
+            raise ConnectionError("connection reset")
+
+    def files_upload_session_finish(self, data, cursor, commit):
+        received = self.sessions[cursor.session_id]
+        assert cursor.offset == len(received)
+        self.files[commit.path] = bytes(received + data)
+        return types.SimpleNamespace(path_display=commit.path, size=len(self.files[commit.path]))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(archive_export, "CHUNK_SIZE", 64 * 1024)
+
+
+def jobs(produced):
+    def produce(name):
+        produced.append(name)
+        return FILES[name]
+    return [(name, lambda name=name: produce(name)) for name in FILES]
+
+
+def archive_contents(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_export_without_interruption(tmp_path):
+    dbx = FakeDropbox()
+    checkpoint = str(tmp_path / "cvs.json")
+    metadata = export_archive(jobs([]), "/Exports/cvs.zip", checkpoint, dbx=dbx)
+    assert metadata.size == len(dbx.files["/Exports/cvs.zip"])
+    assert archive_contents(dbx.files["/Exports/cvs.zip"]) == FILES
+    assert not os.path.exists(checkpoint)
+
+
+@pytest.mark.parametrize("failure", ["fail_on", "lose_ack_on"])
+def test_resume_after_interrupted_upload(tmp_path, failure):
+    dbx = FakeDropbox()
+    setattr(dbx, failure, 5)
+    checkpoint = str(tmp_path / "cvs.json")
+    produced = []
+
+    with pytest.raises(ConnectionError):
+        export_archive(jobs(produced), "/Exports/cvs.zip", checkpoint, dbx=dbx)
+    assert os.path.exists(checkpoint)
+    assert "/Exports/cvs.zip" not in dbx.files
+    first_run = len(produced)
+
+    setattr(dbx, failure, None)
+    export_archive(jobs(produced), "/Exports/cvs.zip", checkpoint, dbx=dbx)
+    assert archive_contents(dbx.files["/Exports/cvs.zip"]) == FILES
+    assert not os.path.exists(checkpoint)
+    # Only entries written after the last checkpoint are produced again
+    assert first_run < len(FILES)
+    assert len(produced) - first_run < len(FILES)
+
+
+def test_checkpoint_for_another_archive_is_refused(tmp_path):
+    dbx = FakeDropbox()
+    dbx.fail_on = 2
+    checkpoint = str(tmp_path / "cvs.json")
+    with pytest.raises(ConnectionError):
+        export_archive(jobs([]), "/Exports/cvs.zip", checkpoint, dbx=dbx)
+    with pytest.raises(ValueError):
+        export_archive(jobs([]), "/Exports/other.zip", checkpoint, dbx=dbx)
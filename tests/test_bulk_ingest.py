@@ -0,0 +1,81 @@
+# tests/test_bulk_ingest.py
+"""Bulk intake: column-wise normalization and the per-row error table"""
+import pandas as pd
+import pytest
+
+from utils.bulk_ingest import ingest, iter_user_records
+from utils.cv_template import PHONE_ERROR
+
+VALID_ROW = {
+    "name": "  ravi   KUMAR ",
+    "phone": "+91 98765-43210",
+    "dob": "15/08/2000",
+    "address": "12 MG Road, Pune",
+    "is_married": "single",
+    "father_name": "suresh kumar",
+    "highest_qualification": "Diploma",
+    "edu_10th_institution": "CBSE",
+    "edu_10th_year": "2016",
+    "edu_12th_institution": "CBSE",
+    "edu_12th_year": "2018",
+    "edu_diploma_institution": "Govt Polytechnic",
+    "edu_diploma_year": "2021",
+    "edu_diploma_specialization": "Mechanical",
+    "exp_1_company": "Tata Motors",
+    "exp_1_position": "Technician",
+    "exp_1_start_date": "01/07/2021",
+    "exp_1_is_current": "yes",
+}
+
+
+def errors_for(**changes):
+    """Error table (field, error) pairs for VALID_ROW with some columns changed"""
+    valid, errors = ingest(pd.DataFrame([dict(VALID_ROW, **changes)]))
+    assert len(valid) == (0 if len(errors) else 1)
+    return list(zip(errors["field"], errors["error"]))
+
+
+def test_valid_row_normalized():
+    valid, errors = ingest(pd.DataFrame([VALID_ROW]))
+    assert errors.empty
+    record = next(iter_user_records(valid))
+    assert record["name"] == "Ravi Kumar"
+    assert record["phone"] == "9876543210"
+    assert record["dob"].isoformat() == "2000-08-15"
+    assert record["is_married"] == "Single"
+    assert list(record["education"]) == ["10th", "12th", "Diploma"]
+    assert record["work_experience"][0]["is_current"] is True
+
+
+@pytest.mark.parametrize("phone", ["98765", "+1 555 0100 9999", "phone"])
+def test_invalid_phone(phone):
+    assert errors_for(phone=phone) == [("phone", PHONE_ERROR)]
+
+
+@pytest.mark.parametrize("changes, expected", [
+    ({"name": " "}, [("name", "Please fill in all required fields marked with *")]),
+    ({"phone": ""}, [("phone", "Please fill in all required fields marked with *")]),
+    ({"dob": "not a date"}, [("dob", "Please enter a valid Date of Birth")]),
+    ({"father_name": ""}, [("father_name", "Please enter father's name")]),
+    ({"is_married": "Married"}, [("husband_name", "Please enter husband's name")]),
+    ({"edu_12th_year": ""}, [("edu_12th_year", "Please enter Year of Completion for 12th")]),
+    ({"edu_diploma_specialization": ""},
+     [("edu_diploma_specialization", "Please enter Course Title for Diploma")]),
+    ({"edu_12th_year": "2016"}, [("edu_12th_year", "12th year must be after 10th year")]),
+    ({"edu_10th_year": "2014"}, [("edu_10th_year", "Year of Completion for 10th must be between 2015 and "
+                                                   f"{pd.Timestamp.now().year}")]),
+    ({"highest_qualification": "12th"},
+     [("edu_diploma", "Diploma details are not expected for this Highest Qualification")]),
+    ({"exp_1_is_current": "", "exp_1_end_date": "01/01/2021"},
+     [("exp_1_end_date", "Employer 1: End Date is before Start Date")]),
+    ({"exp_1_position": ""}, [("exp_1", "Employer 1: Company Name and Position are required")]),
+])
+def test_rule_errors(changes, expected):
+    assert errors_for(**changes) == expected
+
+
+def test_errors_reported_per_row():
+    rows = [VALID_ROW, dict(VALID_ROW, phone="123", dob=""), dict(VALID_ROW, name="")]
+    valid, errors = ingest(pd.DataFrame(rows, index=[10, 11, 12]))
+    assert list(valid.index) == [10]
+    assert list(zip(errors["row"], errors["field"])) == [(11, "dob"), (11, "phone"), (12, "name")]
@@ -0,0 +1,74 @@
+# tests/test_cv_index.py
+"""CV index: FTS name search, phone lookup and rebuilding from stored file names"""
+import pytest
+
+from utils.cv_generator import cv_filename
+from utils.cv_index import CVIndex, index_storage_folder, parse_cv_filename
+from utils.storage import InMemoryBackend
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CVIndex(str(tmp_path / "index.db"))
+    index.upsert("ravi kumar", "+91 98765-43210", "/CVs/ravi-kumar-9876543210.pdf", "Dropbox", 1234)
+    index.upsert("priya raman", "9123456780", "/CVs/priya-raman-9123456780.pdf")
+    index.upsert("José Ravichandran", "9000000001", "/CVs/jose-ravichandran-9000000001.pdf")
+    yield index
+    index.close()
+
+
+def names(rows):
+    return sorted(row["name"] for row in rows)
+
+
+@pytest.mark.parametrize("typed", ["9876543210", "98765 43210", "+91 98765-43210", "098765 43210"])
+def test_find_by_phone_matches_however_it_is_typed(index, typed):
+    assert names(index.find_by_phone(typed)) == ["ravi kumar"]
+
+
+def test_phone_is_stored_as_digits(index):
+    assert index.find_by_phone("9876543210")[0]["phone"] == "9876543210"
+
+
+def test_find_by_phone_without_digits(index):
+    assert index.find_by_phone("") == []
+    assert index.find_by_phone("n/a") == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ravi", ["José Ravichandran", "ravi kumar"]),   # prefix match on any word
+    ("ravi kum", ["ravi kumar"]),                     # every word must match
+    ("RAMAN", ["priya raman"]),                       # case-insensitive
+    ("jose", ["José Ravichandran"]),                  # diacritics ignored
+    ("98765", ["ravi kumar"]),                        # phone prefix
+    ("+91 91234", ["priya raman"]),
+    ("nobody", []),
+    ("", []),
+])
+def test_search(index, query, expected):
+    assert names(index.search(query)) == expected
+
+
+def test_upsert_refreshes_by_path(index):
+    index.upsert("ravi kumar s", "9876543210", "/CVs/ravi-kumar-9876543210.pdf")
+    assert index.count() == 3
+    assert names(index.search("ravi kumar")) == ["ravi kumar s"]
+
+
+def test_remove(index):
+    index.remove("/CVs/priya-raman-9123456780.pdf")
+    assert index.search("priya") == []
+    assert index.find_by_phone("9123456780") == []
+
+
+def test_rebuild_from_stored_file_names(tmp_path):
+    storage = InMemoryBackend()
+    filename = cv_filename({"name": "ravi kumar", "phone": "+91 98765-43210"})
+    assert parse_cv_filename(filename) == ("ravi kumar", "9876543210")
+    storage.put("/CVs", filename, b"%PDF")
+    storage.put("/CVs", "notes.txt", b"")
+
+    index = CVIndex(str(tmp_path / "rebuilt.db"))
+    assert index_storage_folder(index, storage, "/CVs") == 1
+    assert names(index.find_by_phone("98765 43210")) == ["ravi kumar"]
+    index.close()
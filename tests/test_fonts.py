@@ -0,0 +1,59 @@
+# tests/test_fonts.py
+"""Non-Latin fields render (and are shaped) with TTF script fonts configured"""
+import io
+import json
+import os
+
+import pytest
+import PyPDF2
+import reportlab
+
+from utils.benchmarks import SAMPLE_USER_DATA
+from utils.cv_generator import render_cv_bytes
+from utils.cv_template import load_template, resolve_template_path, DEFAULT_TEMPLATE, SCRIPT_STYLE_SEPARATOR
+from utils.fonts import SHAPING_AVAILABLE
+
+# ReportLab ships Bitstream Vera; it stands in for the Noto fonts, which are not in the repo.
+# It has no Devanagari or Arabic glyphs, but the paragraphs still go through HarfBuzz.
+TEST_FONT_DIR = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+TEST_FONT = {"regular": "Vera.ttf", "bold": "VeraBd.ttf"}
+
+FIELDS = {
+    "latin_extended_name": {"name": "łukasz Żółw"},
+    "latin_extended_address": {"address": "ul. Łódź 12"},
+    "devanagari": {"name": "राम कुमार", "address": "नई दिल्ली"},
+    "arabic": {"address": "شارع ١٢، الرياض"},
+}
+
+pytestmark = pytest.mark.skipif(not SHAPING_AVAILABLE, reason="uharfbuzz is not installed")
+
+
+@pytest.fixture(scope="module")
+def font_template(tmp_path_factory):
+    with open(resolve_template_path(DEFAULT_TEMPLATE), encoding="utf-8") as f:
+        spec = json.load(f)
+    spec["fonts"] = {"dir": TEST_FONT_DIR, "scripts": {"devanagari": TEST_FONT, "unicode": TEST_FONT}}
+    path = tmp_path_factory.mktemp("templates") / "fonts.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("renderer", ["platypus", "canvas"])
+@pytest.mark.parametrize("case", sorted(FIELDS))
+def test_script_fields_render(font_template, case, renderer):
+    pdf = render_cv_bytes(dict(SAMPLE_USER_DATA, **FIELDS[case]), font_template, renderer)
+    assert PyPDF2.PdfReader(io.BytesIO(pdf)).pages
+
+
+@pytest.mark.parametrize("case", sorted(FIELDS))
+def test_script_paragraphs_are_shaped(font_template, case):
+    plan = load_template(font_template)
+    styles = [item[1] for item in plan.items(dict(SAMPLE_USER_DATA, **FIELDS[case])) if item[0] == "paragraph"]
+    shaped = [plan.styles[style] for style in styles if SCRIPT_STYLE_SEPARATOR in style]
+    assert shaped and all(style.shaping for style in shaped)
+
+
+def test_latin_labels_kept_in_script_paragraphs(font_template):
+    pdf = render_cv_bytes(dict(SAMPLE_USER_DATA, **FIELDS["latin_extended_address"]), font_template)
+    text = PyPDF2.PdfReader(io.BytesIO(pdf)).pages[0].extract_text()
+    assert "Address: ul. Łód" in text
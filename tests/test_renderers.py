@@ -0,0 +1,65 @@
+# tests/test_renderers.py
+"""The canvas fast path must lay out CVs exactly as the platypus pipeline does"""
+import json
+
+import pytest
+
+from utils.benchmarks import SAMPLE_USER_DATA, compare_renderers, render_canvas, text_positions
+from utils.cv_generator import render_cv_bytes
+from utils.cv_template import resolve_template_path, DEFAULT_TEMPLATE
+
+RECORDS = {
+    "graduate": SAMPLE_USER_DATA,
+    "married_10th_only": dict(
+        SAMPLE_USER_DATA, is_married="Married", father_name="", husband_name="arun kumar",
+        highest_qualification="10th", education={"10th": SAMPLE_USER_DATA["education"]["10th"]},
+        certifications=[], work_experience=[],
+    ),
+    "postgraduate_with_diploma": dict(
+        SAMPLE_USER_DATA, highest_qualification="PG (Master's)",
+        education=dict(
+            SAMPLE_USER_DATA["education"],
+            **{
+                "Diploma": {"institution": "Govt Polytechnic", "year": 2019, "specialization": "Mechanical"},
+                "PG (Master's)": {"institution": "IIT Madras", "year": 2023, "specialization": "MTech"},
+            },
+        ),
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(RECORDS))
+def test_canvas_matches_platypus(name):
+    assert compare_renderers(RECORDS[name], DEFAULT_TEMPLATE) == []
+
+
+def test_overflowing_cv_falls_back_to_platypus():
+    employers = [dict(SAMPLE_USER_DATA["work_experience"][0], company=f"company {i}") for i in range(40)]
+    user_data = dict(SAMPLE_USER_DATA, work_experience=employers)
+    assert render_canvas(user_data) is None
+    assert (text_positions(render_cv_bytes(user_data, renderer="canvas"))
+            == text_positions(render_cv_bytes(user_data, renderer="platypus")))
+
+
+INLINE_MARKUP = {
+    "partial_bold": ("Phone Number: {phone}", "<b>Phone Number:</b> {phone}"),
+    "line_break": ("Address: {address}", "Address:<br/>{address}"),
+}
+
+
+@pytest.mark.parametrize("case", sorted(INLINE_MARKUP))
+def test_inline_markup_falls_back_to_platypus(tmp_path, case):
+    old, new = INLINE_MARKUP[case]
+    with open(resolve_template_path(DEFAULT_TEMPLATE), encoding="utf-8") as f:
+        spec = f.read()
+    assert old in spec
+    template = tmp_path / "markup.json"
+    template.write_text(json.dumps(json.loads(spec.replace(old, new))), encoding="utf-8")
+
+    assert render_canvas(SAMPLE_USER_DATA, str(template)) is None
+    assert (text_positions(render_cv_bytes(SAMPLE_USER_DATA, str(template), renderer="canvas"))
+            == text_positions(render_cv_bytes(SAMPLE_USER_DATA, str(template), renderer="platypus")))
+
+
+def test_whole_line_bold_uses_canvas():
+    assert render_canvas(SAMPLE_USER_DATA) is not None
@@ -0,0 +1,81 @@
+# tests/test_storage.py
+"""Conditional writes: put_if_unchanged refuses to overwrite a file that changed since it was read"""
+import pytest
+from dropbox.exceptions import ApiError
+from dropbox.files import UploadError, UploadWriteFailed, WriteConflictError, WriteError
+
+from utils.storage import (
+    DropboxBackend, InMemoryBackend, LocalFilesystemBackend, StorageConflict, StorageError
+)
+
+
+@pytest.fixture(params=["local", "memory"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        return LocalFilesystemBackend(str(tmp_path / "storage"))
+    return InMemoryBackend()
+
+
+def test_write_at_current_rev(storage):
+    path = storage.put("/CVs", "index.json", b"v1")
+    data, rev = storage.get_versioned(path)
+    assert data == b"v1"
+
+    storage.put_if_unchanged(path, b"v2 updated", rev)
+    data, new_rev = storage.get_versioned(path)
+    assert data == b"v2 updated"
+    assert new_rev != rev
+
+
+def test_conflict_after_concurrent_write(storage):
+    path = storage.put("/CVs", "index.json", b"v1")
+    _, rev = storage.get_versioned(path)
+    storage.put("/CVs", "index.json", b"someone else")
+
+    with pytest.raises(StorageConflict):
+        storage.put_if_unchanged(path, b"mine", rev)
+    assert storage.get(path) == b"someone else"
+
+
+def test_stale_rev_conflicts_once_written(storage):
+    path = storage.put("/CVs", "index.json", b"v1")
+    _, rev = storage.get_versioned(path)
+    storage.put_if_unchanged(path, b"first writer", rev)
+
+    with pytest.raises(StorageConflict):
+        storage.put_if_unchanged(path, b"second writer", rev)
+    assert storage.get(path) == b"first writer"
+
+
+def test_conflict_when_file_missing(storage):
+    with pytest.raises(StorageConflict):
+        storage.put_if_unchanged("/CVs/missing.json", b"data", "1")
+
+
+def test_conflict_is_a_storage_error(storage):
+    path = storage.put("/CVs", "index.json", b"v1")
+    with pytest.raises(StorageError):
+        storage.put_if_unchanged(path, b"data", "stale")
+
+
+class FakeDropbox:
+    def __init__(self, error):
+        self.error = error
+
+    def files_upload(self, data, path, mode):
+        raise self.error
+
+
+def _upload_error(reason):
+    return ApiError("request-id", UploadError.path(UploadWriteFailed(reason=reason, upload_session_id="")), None, None)
+
+
+@pytest.mark.parametrize("reason, expected", [
+    (WriteError.conflict(WriteConflictError.file), StorageConflict),
+    (WriteError.insufficient_space, StorageError),
+])
+def test_dropbox_conflict_mapping(reason, expected):
+    backend = DropboxBackend(client_factory=lambda: FakeDropbox(_upload_error(reason)))
+    with pytest.raises(expected) as excinfo:
+        backend.put_if_unchanged("/CVs/index.json", b"data", "015f8a2c3d4e0000000000001")
+    assert type(excinfo.value) is expected
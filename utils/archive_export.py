@@ -0,0 +1,322 @@
+# utils/archive_export.py
+"""
+Stream many CVs into one ZIP archive uploaded through a Dropbox upload session
+
+Nothing is staged on disk except a small checkpoint: the ZIP is written into an
+in-memory buffer that is shipped to Dropbox in CHUNK_SIZE appends. Before every
+append the checkpoint records the upload offset, the number of entries written,
+the buffered bytes not yet confirmed by Dropbox and the ZIP directory entries,
+so an interrupted export resumes from the last append instead of starting over.
+
+Run from the project root, e.g.:
+    python -m utils.archive_export --folder /CVs --dest /Exports/cvs.zip
+"""
+import argparse
+import base64
+import json
+import os
+import time
+import zipfile
+from functools import partial
+
+import dropbox
+from dropbox.exceptions import ApiError
+
+from utils.cv_generator import render_cv_bytes, cv_filename
+from utils.cv_template import DEFAULT_TEMPLATE
+from utils.dropbox_handler import default_dbx_client, iter_folder_files, download_bytes
+from utils.encryption import encrypt_pdf_bytes
+
+CHUNK_SIZE = 4 * 1024 * 1024
+CHECKPOINT_DIR = "checkpoints"
+
+# ZipInfo attributes needed to rewrite the central directory after a resume
+_ZIPINFO_FIELDS = (
+    "compress_type", "create_system", "create_version", "extract_version", "flag_bits",
+    "volume", "internal_attr", "external_attr", "header_offset", "CRC", "compress_size", "file_size",
+)
+
+
+# ---------------------
+# 🧾 Jobs
+# ---------------------
+def record_jobs(records, password, template=DEFAULT_TEMPLATE, renderer="platypus"):
+    """(arcname, produce) jobs that render and encrypt each record in memory"""
+    jobs = []
+    seen = {}
+    for user_data in records:
+        arcname = _unique_name(cv_filename(user_data), seen)
+        jobs.append((arcname, partial(_render_encrypted, user_data, password, template, renderer)))
+    return jobs
+
+
+def folder_jobs(folder_path, dbx=None):
+    """(arcname, produce) jobs that download each PDF in a Dropbox folder, in a stable order"""
+    dbx = dbx or default_dbx_client()
+    # Only the PDFs: sidecars hold the candidates' raw data
+    entries = sorted(
+        (e for e in iter_folder_files(folder_path, dbx) if e.name.lower().endswith(".pdf")),
+        key=lambda e: e.path_lower
+    )
+    return [(entry.name, partial(download_bytes, entry.path_lower, dbx)) for entry in entries]
+
+
+def _render_encrypted(user_data, password, template, renderer):
+    return encrypt_pdf_bytes(render_cv_bytes(user_data, template, renderer), password)
+
+
+def _unique_name(name, seen):
+    count = seen.get(name, 0) + 1
+    seen[name] = count
+    if count == 1:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}-{count}{ext}"
+
+
+# ---------------------
+# 💾 Checkpoint
+# ---------------------
+class _Checkpoint:
+    """Upload state persisted as <path> (JSON), <path>.pending and <path>.entries (JSON lines)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pending_path = path + ".pending"
+        self.entries_path = path + ".entries"
+        self.dropbox_path = None
+        self.session_id = None
+        self.offset = 0
+        self.entries_done = 0
+        self.finalizing = False
+        self.pending = b""
+        self.zip_entries = []
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        with open(self.path) as f:
+            state = json.load(f)
+        self.dropbox_path = state["dropbox_path"]
+        self.session_id = state["session_id"]
+        self.offset = state["offset"]
+        self.entries_done = state["entries_done"]
+        self.finalizing = state.get("finalizing", False)
+        with open(self.pending_path, "rb") as f:
+            self.pending = f.read()
+
+        # Entry lines written after the last checkpoint are discarded
+        with open(self.entries_path) as f:
+            lines = [line for line in f if line.strip()][:self.entries_done]
+        self.zip_entries = [_zipinfo_from_dict(json.loads(line)) for line in lines]
+        with open(self.entries_path, "w") as f:
+            f.writelines(lines)
+
+    def save(self, pending):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        _atomic_write(self.pending_path, bytes(pending))
+        state = {
+            "dropbox_path": self.dropbox_path,
+            "session_id": self.session_id,
+            "offset": self.offset,
+            "entries_done": self.entries_done,
+            "finalizing": self.finalizing,
+        }
+        _atomic_write(self.path, json.dumps(state).encode())
+
+    def append_entry(self, zinfo):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.entries_path, "a") as f:
+            f.write(json.dumps(_zipinfo_to_dict(zinfo)) + "\n")
+
+    def remove(self):
+        for path in (self.path, self.pending_path, self.entries_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _atomic_write(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _zipinfo_to_dict(zinfo):
+    data = {field: getattr(zinfo, field) for field in _ZIPINFO_FIELDS}
+    data["filename"] = zinfo.filename
+    data["date_time"] = list(zinfo.date_time)
+    data["extra"] = base64.b64encode(zinfo.extra).decode()
+    data["comment"] = base64.b64encode(zinfo.comment).decode()
+    return data
+
+
+def _zipinfo_from_dict(data):
+    zinfo = zipfile.ZipInfo(data["filename"], tuple(data["date_time"]))
+    for field in _ZIPINFO_FIELDS:
+        setattr(zinfo, field, data[field])
+    zinfo.extra = base64.b64decode(data["extra"])
+    zinfo.comment = base64.b64decode(data["comment"])
+    return zinfo
+
+
+# ---------------------
+# 🚰 Upload Sink
+# ---------------------
+class _UploadSink:
+    """
+    Write-only, non-seekable stream that zipfile writes into
+
+    tell() reports the absolute archive position so ZIP header offsets stay
+    correct across resumes; bytes are held until CHUNK_SIZE is available.
+    """
+
+    def __init__(self, position, pending):
+        self.buffer = bytearray(pending)
+        self.position = position
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+
+class _ArchiveUpload:
+    def __init__(self, dbx, checkpoint):
+        self.dbx = dbx
+        self.checkpoint = checkpoint
+
+    def cursor(self):
+        return dropbox.files.UploadSessionCursor(session_id=self.checkpoint.session_id, offset=self.checkpoint.offset)
+
+    def start(self, dropbox_path):
+        self.checkpoint.dropbox_path = dropbox_path
+        self.checkpoint.session_id = self.dbx.files_upload_session_start(b"").session_id
+        self.checkpoint.save(b"")
+
+    def sync_offset(self):
+        """After a resume, skip buffered bytes that Dropbox already received"""
+        try:
+            self.dbx.files_upload_session_append_v2(b"", self.cursor())
+            return
+        except ApiError as e:
+            if not (e.error.is_incorrect_offset()):
+                raise
+            correct = e.error.get_incorrect_offset().correct_offset
+
+        ahead = correct - self.checkpoint.offset
+        if ahead < 0 or ahead > len(self.checkpoint.pending):
+            raise RuntimeError(f"Upload session offset {correct} does not match checkpoint at {self.checkpoint.offset}")
+        self.checkpoint.pending = self.checkpoint.pending[ahead:]
+        self.checkpoint.offset = correct
+
+    def ship_full_chunks(self, sink, keep_last=False):
+        """Checkpoint, then append every complete chunk in the sink's buffer"""
+        threshold = CHUNK_SIZE if not keep_last else CHUNK_SIZE + 1
+        if len(sink.buffer) < threshold:
+            return
+
+        # Checkpoint first: if we die mid-append, these exact bytes are replayed
+        self.checkpoint.save(sink.buffer)
+        while len(sink.buffer) >= threshold:
+            chunk = bytes(sink.buffer[:CHUNK_SIZE])
+            self.dbx.files_upload_session_append_v2(chunk, self.cursor())
+            del sink.buffer[:CHUNK_SIZE]
+            self.checkpoint.offset += len(chunk)
+        self.checkpoint.save(sink.buffer)
+
+    def finish(self, sink):
+        commit = dropbox.files.CommitInfo(path=self.checkpoint.dropbox_path, mode=dropbox.files.WriteMode.overwrite)
+        return self.dbx.files_upload_session_finish(bytes(sink.buffer), self.cursor(), commit)
+
+
+# ---------------------
+# 📦 Export
+# ---------------------
+def export_archive(jobs, dropbox_path, checkpoint_path=None, compression=zipfile.ZIP_STORED, progress=None, dbx=None):
+    """
+    Stream jobs into a ZIP uploaded to dropbox_path, resuming from a checkpoint if one exists
+
+    Args:
+        jobs (list): (arcname, produce) pairs; produce() returns the file bytes.
+            The order must be the same when resuming.
+        dropbox_path (str): Destination path of the archive in Dropbox
+        checkpoint_path (str): Local checkpoint file (defaults to checkpoints/<archive name>.json)
+        compression (int): zipfile compression; PDFs are already compressed, so ZIP_STORED by default
+        progress (callable): Optional progress(done, total) callback
+        dbx (dropbox.Dropbox): Optional client
+
+    Returns:
+        dropbox.files.FileMetadata: Metadata of the uploaded archive
+    """
+    if not dropbox_path.startswith("/"):
+        dropbox_path = "/" + dropbox_path
+    checkpoint_path = checkpoint_path or os.path.join(CHECKPOINT_DIR, os.path.basename(dropbox_path) + ".json")
+    dbx = dbx or default_dbx_client()
+
+    checkpoint = _Checkpoint(checkpoint_path)
+    upload = _ArchiveUpload(dbx, checkpoint)
+    if checkpoint.exists():
+        checkpoint.load()
+        if checkpoint.dropbox_path != dropbox_path:
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to {checkpoint.dropbox_path}, not {dropbox_path}")
+        upload.sync_offset()
+    else:
+        upload.start(dropbox_path)
+
+    sink = _UploadSink(checkpoint.offset + len(checkpoint.pending), checkpoint.pending)
+    if not checkpoint.finalizing:
+        zf = zipfile.ZipFile(sink, "w", compression=compression)
+        for zinfo in checkpoint.zip_entries:
+            zf.filelist.append(zinfo)
+            zf.NameToInfo[zinfo.filename] = zinfo
+
+        total = len(jobs)
+        for index, (arcname, produce) in enumerate(jobs):
+            if index < checkpoint.entries_done:
+                continue
+            zinfo = zipfile.ZipInfo(arcname, time.localtime()[:6])
+            zinfo.compress_type = compression
+            zf.writestr(zinfo, produce())
+
+            checkpoint.append_entry(zinfo)
+            checkpoint.entries_done = index + 1
+            upload.ship_full_chunks(sink)
+            if progress:
+                progress(index + 1, total)
+
+        zf.close()  # writes the central directory into the sink
+        checkpoint.finalizing = True
+        checkpoint.save(sink.buffer)
+
+    upload.ship_full_chunks(sink, keep_last=True)
+    metadata = upload.finish(sink)
+    checkpoint.remove()
+    return metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export CVs from a Dropbox folder into one streamed ZIP archive")
+    parser.add_argument("--folder", required=True, help="Dropbox folder holding the CVs")
+    parser.add_argument("--dest", required=True, help="Dropbox path of the archive to create")
+    parser.add_argument("--checkpoint", help="Local checkpoint file (resumes if it exists)")
+    args = parser.parse_args(argv)
+
+    dbx = default_dbx_client()
+    jobs = folder_jobs(args.folder, dbx)
+    metadata = export_archive(
+        jobs, args.dest, args.checkpoint, dbx=dbx,
+        progress=lambda done, total: print(f"\r{done}/{total} files", end="", flush=True)
+    )
+    print(f"\nUploaded {metadata.path_display} ({metadata.size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
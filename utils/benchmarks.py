@@ -0,0 +1,412 @@
+# utils/benchmarks.py
+"""
+Offline benchmarks and renderer checks
+
+Run from the project root, e.g.:
+    python -m utils.benchmarks render --count 200
+    python -m utils.benchmarks diff
+    python -m utils.benchmarks first-page --kbps 256 --employers 40
+    python -m utils.benchmarks fonts --script tamil
+    python -m utils.benchmarks bundle --counts 100 1000 2000
+    python -m utils.benchmarks stamp --recipients 50
+"""
+import argparse
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import PyPDF2
+from reportlab.platypus import SimpleDocTemplate
+
+from utils.canvas_renderer import draw_cv
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+from utils.cv_generator import render_cv_bytes
+from utils.encryption import encrypt_pdf_bytes
+from utils import profiling
+from reportlab.pdfbase.ttfonts import TTFont
+
+SAMPLE_USER_DATA = {
+    'name': 'ravi kumar',
+    'phone': '9876543210',
+    'dob': date(2000, 5, 17),
+    'address': '12 Main Road, Chennai',
+    'is_married': 'Single',
+    'father_name': 'suresh kumar',
+    'husband_name': '',
+    'highest_qualification': "UG (Bachelor's)",
+    'education': {
+        '10th': {'institution': 'State Board', 'year': 2015, 'specialization': None},
+        '12th': {'institution': 'State Board', 'year': 2017, 'specialization': None},
+        'ITI': {'institution': 'Govt ITI', 'year': 2018, 'specialization': 'Fitter'},
+        "UG (Bachelor's)": {'institution': 'Anna University', 'year': 2021, 'specialization': 'BSC'},
+    },
+    'certifications': [
+        {'name': 'Tally', 'institution': 'NIIT', 'year': 2019, 'duration': None},
+        {'name': 'Excel', 'institution': 'Coursera', 'year': 2022, 'duration': '3 months'},
+    ],
+    'work_experience': [
+        {'company': 'acme ltd', 'position': 'operator', 'start_date': date(2021, 6, 1),
+         'end_date': date(2022, 6, 1), 'is_current': False},
+        {'company': 'globex', 'position': 'senior operator', 'start_date': date(2022, 7, 1),
+         'end_date': None, 'is_current': True},
+    ],
+}
+
+
+def render_platypus(user_data, template=DEFAULT_TEMPLATE):
+    """Render with the platypus pipeline into memory"""
+    plan = load_template(template)
+    buf = io.BytesIO()
+    SimpleDocTemplate(buf, **plan.doc_kwargs()).build(plan.build_story(user_data), onFirstPage=plan.first_page(user_data))
+    return buf.getvalue()
+
+
+def render_canvas(user_data, template=DEFAULT_TEMPLATE):
+    """Render with the canvas fast path into memory (None on overflow or unsupported markup)"""
+    buf = io.BytesIO()
+    if not draw_cv(load_template(template), user_data, buf):
+        return None
+    return buf.getvalue()
+
+
+def text_positions(pdf_bytes):
+    """Absolute (page, x, y, text) of every text-showing operation in a PDF"""
+    positions = []
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    for page_num, page in enumerate(reader.pages):
+        def visit(operator, operands, cm, tm):
+            if operator == b"Tj" and operands:
+                # Text space origin mapped through the current transformation matrix
+                x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+                y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+                positions.append((page_num, round(x, 2), round(y, 2), str(operands[0]).strip()))
+        page.extract_text(visitor_operand_before=visit)
+    return [p for p in positions if p[3]]
+
+
+def compare_renderers(user_data, template=DEFAULT_TEMPLATE, tolerance=0.5):
+    """
+    Visual diff of canvas vs platypus output, by text run and position
+
+    Returns:
+        list: Human-readable differences (empty when the outputs match)
+    """
+    canvas_pdf = render_canvas(user_data, template)
+    if canvas_pdf is None:
+        return ["canvas renderer declined (overflow or inline markup); platypus fallback would be used"]
+
+    expected = text_positions(render_platypus(user_data, template))
+    actual = text_positions(canvas_pdf)
+    diffs = []
+    if len(expected) != len(actual):
+        diffs.append(f"text run count differs: platypus={len(expected)} canvas={len(actual)}")
+    for e, a in zip(expected, actual):
+        if e[0] != a[0] or e[3] != a[3] or abs(e[1] - a[1]) > tolerance or abs(e[2] - a[2]) > tolerance:
+            diffs.append(f"platypus {e} != canvas {a}")
+    return diffs
+
+
+def bench_renderers(count=200, template=DEFAULT_TEMPLATE):
+    """Documents/sec for each renderer over `count` copies of the sample CV"""
+    load_template(template)  # compile outside the timed loop
+    results = {}
+    for label, render in (("platypus", render_platypus), ("canvas", render_canvas)):
+        start = time.perf_counter()
+        for _ in range(count):
+            render(SAMPLE_USER_DATA, template)
+        elapsed = time.perf_counter() - start
+        results[label] = count / elapsed
+    return results
+
+
+# ---------------------
+# 🐢 Time to First Page
+# ---------------------
+def sample_with_employers(employers):
+    """The sample CV with `employers` work entries (enough of them spill onto more pages)"""
+    base = SAMPLE_USER_DATA['work_experience'][0]
+    work = [dict(base, company=f"{base['company']} {i + 1}") for i in range(employers)]
+    return dict(SAMPLE_USER_DATA, work_experience=work or SAMPLE_USER_DATA['work_experience'])
+
+
+def first_page_bytes(pdf_bytes):
+    """
+    Bytes a progressive viewer needs before it can draw page 1: the end of the
+    first-page section (/E) for a linearized file, otherwise the whole file
+    (the cross-reference table is at the end)
+    """
+    match = re.search(rb"/Linearized\s.*?/E\s+(\d+)", pdf_bytes[:1024], re.S)
+    return int(match.group(1)) if match else len(pdf_bytes)
+
+
+class _ThrottledServer:
+    """Local HTTP stand-in for Dropbox links: fixed bandwidth plus one round-trip of latency"""
+
+    def __init__(self, files, kbps, latency):
+        chunk = max(512, int(kbps * 1024 / 20))
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                data = files[self.path]
+                time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                for offset in range(0, len(data), chunk):
+                    self.wfile.write(data[offset:offset + chunk])
+                    self.wfile.flush()
+                    time.sleep(chunk / (kbps * 1024))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _time_to_bytes(url, needed):
+    """Seconds until `needed` bytes have arrived, and until the whole body has"""
+    start = time.perf_counter()
+    received, first_page = 0, None
+    with urllib.request.urlopen(url) as response:
+        while True:
+            block = response.read(1024)
+            if not block:
+                break
+            received += len(block)
+            if first_page is None and received >= needed:
+                first_page = time.perf_counter() - start
+    return first_page, time.perf_counter() - start
+
+
+def bench_first_page(kbps=256, latency=0.1, employers=0, password="gbl", template=DEFAULT_TEMPLATE):
+    """Time to first page and to full download, plain vs linearized, over a throttled link"""
+    pdf = render_cv_bytes(sample_with_employers(employers), template)
+    files = {
+        "/plain.pdf": encrypt_pdf_bytes(pdf, password),
+        "/linearized.pdf": encrypt_pdf_bytes(pdf, password, linearize=True),
+    }
+    server = _ThrottledServer(files, kbps, latency)
+    results = {}
+    try:
+        for path, data in files.items():
+            first_page, total = _time_to_bytes(server.url + path, first_page_bytes(data))
+            results[path.strip("/").replace(".pdf", "")] = {
+                "size": len(data), "pages": len(PyPDF2.PdfReader(io.BytesIO(pdf)).pages),
+                "first_page_s": first_page, "total_s": total,
+            }
+    finally:
+        server.close()
+    return results
+
+
+# ---------------------
+# 🔤 Script Fonts
+# ---------------------
+SCRIPT_SAMPLES = {
+    "tamil": ("ரவி குமார்", "12, காந்தி சாலை, சென்னை"),
+    "devanagari": ("रवि कुमार", "12, गांधी मार्ग, दिल्ली"),
+    "telugu": ("రవి కుమార్", "12, గాంధీ రోడ్, హైదరాబాద్"),
+    "kannada": ("ರವಿ ಕುಮಾರ್", "12, ಗಾಂಧಿ ರಸ್ತೆ, ಬೆಂಗಳೂರು"),
+    "malayalam": ("രവി കുമാർ", "12, ഗാന്ധി റോഡ്, കൊച്ചി"),
+    "unicode": ("Иван Петров", "12, Ленина, Москва"),
+}
+
+
+def _timed_renders(user_data, template, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        pdf = render_cv_bytes(user_data, template)
+    return (time.perf_counter() - start) / count * 1000, len(pdf)
+
+
+def bench_fonts(count=100, template=DEFAULT_TEMPLATE, script=None):
+    """
+    Render time and size: Helvetica-only vs embedded script-font subsets, plus
+    what loading the font per render and embedding the whole font would cost
+    """
+    plan = load_template(template)
+    if not plan.fonts:
+        raise SystemExit(f"No script fonts found for template {template} (missing: {', '.join(plan.fonts.missing)})")
+    script = script or next(s for s in SCRIPT_SAMPLES if s in plan.fonts.fonts)
+    name, address = SCRIPT_SAMPLES[script]
+    font_name = plan.fonts.font_for(script)
+    font_path = plan.fonts.paths.get(script) or plan.fonts.paths["unicode"]
+
+    latin_ms, latin_size = _timed_renders(SAMPLE_USER_DATA, template, count)
+    script_ms, script_size = _timed_renders(dict(SAMPLE_USER_DATA, name=name, address=address), template, count)
+    start = time.perf_counter()
+    for _ in range(max(1, count // 10)):
+        TTFont("bench-font", font_path)
+    load_ms = (time.perf_counter() - start) / max(1, count // 10) * 1000
+    return {
+        "script": script, "font": font_name,
+        "latin_ms": latin_ms, "latin_size": latin_size,
+        "subset_ms": script_ms, "subset_size": script_size,
+        "load_per_render_ms": load_ms, "font_file_size": os.path.getsize(font_path),
+    }
+
+
+def bench_bundle(counts=(100, 1000), template=DEFAULT_TEMPLATE, password="gbl"):
+    """Bundle size and build time per CV: render mode, merge mode, and separate files"""
+    # Imported here: bundle pulls in Streamlit and pandas, which the other benchmarks don't need
+    from utils.bundle import render_bundle, merge_bundle
+
+    results = {}
+    records = [dict(SAMPLE_USER_DATA, name=f"Candidate {i}", phone=f"9{i:09d}") for i in range(max(counts))]
+    separate = [(r["name"], encrypt_pdf_bytes(render_cv_bytes(r, template), password)) for r in records]
+    for count in counts:
+        start = time.perf_counter()
+        rendered = io.BytesIO()
+        render_bundle(records[:count], rendered, template, password)
+        render_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merged = io.BytesIO()
+        merge_bundle(separate[:count], merged, password, password)
+        merge_s = time.perf_counter() - start
+        results[count] = {
+            "render_s": render_s, "render_size": len(rendered.getvalue()),
+            "merge_s": merge_s, "merge_size": len(merged.getvalue()),
+            "separate_size": sum(len(pdf) for _, pdf in separate[:count]),
+        }
+    return results
+
+
+def bench_stamping(recipients=50, template=DEFAULT_TEMPLATE, password="gbl"):
+    """One CV for many recipients: full render + encrypt per copy vs cached base and overlays"""
+    from utils.stamping import stamp_copies
+
+    names = [f"Employer {i}" for i in range(recipients)]
+    start = time.perf_counter()
+    for _ in names:
+        encrypt_pdf_bytes(render_cv_bytes(SAMPLE_USER_DATA, template), password)
+    full_s = time.perf_counter() - start
+
+    # Cold: base and overlays built on first use (a fresh phone number misses the base cache)
+    user_data = dict(SAMPLE_USER_DATA, phone=f"9{time.time_ns() % 10 ** 9:09d}")
+    start = time.perf_counter()
+    stamp_copies(user_data, names, password, template)
+    cold_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stamp_copies(user_data, names, password, template)
+    warm_s = time.perf_counter() - start
+    return {"full_s": full_s, "cold_s": cold_s, "warm_s": warm_s}
+
+
+def bench_profiling(count=100, template=DEFAULT_TEMPLATE):
+    """Render time with profiling off, with the threshold sampler armed, and with cProfile on every run"""
+    profile_dir = tempfile.mkdtemp(prefix="cv-profiles-")
+    render_cv_bytes(SAMPLE_USER_DATA, template)  # warm-up, so "off" is not charged for the first render
+    modes = {
+        "off": None,
+        "sampler": {"threshold_ms": 10 ** 9, "dir": profile_dir},  # never slow enough to write
+        "cprofile": {"sample_every": 1, "dir": profile_dir},
+    }
+    results = {}
+    try:
+        for label, settings in modes.items():
+            profiling.configure(settings)
+            counts = count if label != "cprofile" else max(1, count // 10)
+            start = time.perf_counter()
+            for _ in range(counts):
+                render_cv_bytes(SAMPLE_USER_DATA, template)
+            results[label] = (time.perf_counter() - start) / counts * 1000
+    finally:
+        profiling.configure(None)
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CV generator benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    render = sub.add_parser("render", help="platypus vs canvas throughput")
+    render.add_argument("--count", type=int, default=200)
+    render.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    diff = sub.add_parser("diff", help="visual diff of canvas vs platypus output")
+    diff.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    first_page = sub.add_parser("first-page", help="time to first page, plain vs linearized, on a throttled link")
+    first_page.add_argument("--kbps", type=float, default=256, help="bandwidth in KB/s")
+    first_page.add_argument("--latency", type=float, default=0.1, help="seconds before the first byte")
+    first_page.add_argument("--employers", type=int, default=0, help="work entries (more entries, more pages)")
+    first_page.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    fonts = sub.add_parser("fonts", help="render time and size with embedded script-font subsets")
+    fonts.add_argument("--count", type=int, default=100)
+    fonts.add_argument("--template", default=DEFAULT_TEMPLATE)
+    fonts.add_argument("--script", choices=sorted(SCRIPT_SAMPLES), help="defaults to the first with a font")
+
+    bundle = sub.add_parser("bundle", help="print bundle size and build time as the CV count grows")
+    bundle.add_argument("--counts", type=int, nargs="+", default=[100, 1000])
+    bundle.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    stamp = sub.add_parser("stamp", help="per-recipient watermarked copies: full renders vs cached stamping")
+    stamp.add_argument("--recipients", type=int, default=50)
+    stamp.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    prof = sub.add_parser("profiling", help="per-render overhead of the profiling hook")
+    prof.add_argument("--count", type=int, default=100)
+    prof.add_argument("--template", default=DEFAULT_TEMPLATE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "render":
+        results = bench_renderers(args.count, args.template)
+        for label, rate in results.items():
+            print(f"{label:>10}: {rate:8.1f} docs/sec")
+        print(f"   speedup: {results['canvas'] / results['platypus']:.1f}x")
+    elif args.command == "diff":
+        diffs = compare_renderers(SAMPLE_USER_DATA, args.template)
+        for line in diffs:
+            print(line)
+        print("renderers match" if not diffs else f"{len(diffs)} difference(s)")
+        return 1 if diffs else 0
+    elif args.command == "fonts":
+        r = bench_fonts(args.count, args.template, args.script)
+        print(f"  Helvetica only: {r['latin_ms']:6.2f} ms/CV, {r['latin_size']:8d} bytes")
+        print(f"  {r['script']} subset: {r['subset_ms']:6.2f} ms/CV, {r['subset_size']:8d} bytes ({r['font']})")
+        print(f"  loading the font per render would add {r['load_per_render_ms']:.2f} ms/CV")
+        print(f"  embedding the whole font would add ~{r['font_file_size'] - (r['subset_size'] - r['latin_size']):d} bytes/CV "
+              f"(font file {r['font_file_size']} bytes)")
+    elif args.command == "bundle":
+        for count, r in bench_bundle(args.counts, args.template).items():
+            print(f"{count:>6} CVs: render {r['render_s']:6.2f}s {r['render_size'] / count:7.0f} B/CV | "
+                  f"merge {r['merge_s']:6.2f}s {r['merge_size'] / count:7.0f} B/CV | "
+                  f"separate files {r['separate_size'] / count:7.0f} B/CV")
+    elif args.command == "stamp":
+        r = bench_stamping(args.recipients, args.template)
+        for label, key in (("full renders", "full_s"), ("stamp (cold)", "cold_s"), ("stamp (warm)", "warm_s")):
+            print(f"{label:>13}: {r[key]:6.3f}s  ({r[key] / args.recipients * 1000:6.2f} ms/copy, "
+                  f"{r[key] / r['full_s']:5.1%} of full)")
+    elif args.command == "profiling":
+        results = bench_profiling(args.count, args.template)
+        for label, ms in results.items():
+            print(f"{label:>9}: {ms:6.2f} ms/CV ({ms / results['off'] - 1:+6.1%})")
+    elif args.command == "first-page":
+        results = bench_first_page(args.kbps, args.latency, args.employers, template=args.template)
+        for label, r in results.items():
+            print(f"{label:>10}: {r['size']:8d} bytes, {r['pages']} page(s), "
+                  f"first page {r['first_page_s']:.2f}s, complete {r['total_s']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+# utils/bulk_ingest.py
+"""
+Bulk intake from CSV / Excel / Parquet
+
+Normalizes and validates a whole table with column-wise pandas operations and
+returns the valid rows plus a per-row error table. The rules mirror
+collect_user_data / collect_education_details / validate_education_completeness.
+
+Expected columns (one row per candidate):
+    name, phone, dob, address, is_married, father_name, husband_name, highest_qualification
+    edu_<level>_institution, edu_<level>_year, edu_<level>_specialization
+        for <level> in 10th, 12th, iti, diploma, ug, pg
+    cert_<n>_name, cert_<n>_institution, cert_<n>_year, cert_<n>_duration      (n = 1, 2, ...)
+    exp_<n>_company, exp_<n>_position, exp_<n>_department, exp_<n>_start_date,
+        exp_<n>_end_date, exp_<n>_is_current                                  (n = 1, 2, ...)
+
+Run from the project root, e.g.:
+    python -m utils.bulk_ingest intake.csv --valid valid.parquet --errors errors.csv
+"""
+import argparse
+import os
+import re
+from datetime import date, datetime
+
+import pandas as pd
+
+from utils.cv_template import PHONE_ERROR
+
+MIN_YEAR = 2015
+
+# Education levels as used in user_data, with their column prefixes
+LEVEL_PREFIXES = {
+    "10th": "edu_10th",
+    "12th": "edu_12th",
+    "ITI": "edu_iti",
+    "Diploma": "edu_diploma",
+    "UG (Bachelor's)": "edu_ug",
+    "PG (Master's)": "edu_pg",
+}
+QUALIFICATION_LEVELS = ["10th", "12th", "Diploma", "UG (Bachelor's)", "PG (Master's)"]
+
+# Levels always required for each highest qualification (ITI and Diploma are optional extras)
+REQUIRED_LEVELS = {
+    "10th": ["10th"],
+    "12th": ["10th", "12th"],
+    "Diploma": ["10th", "12th", "Diploma"],
+    "UG (Bachelor's)": ["10th", "12th", "UG (Bachelor's)"],
+    "PG (Master's)": ["10th", "12th", "UG (Bachelor's)", "PG (Master's)"],
+}
+# Optional levels each qualification may include
+OPTIONAL_LEVELS = {
+    "10th": [],
+    "12th": ["ITI"],
+    "Diploma": ["ITI"],
+    "UG (Bachelor's)": ["ITI", "Diploma"],
+    "PG (Master's)": ["ITI", "Diploma"],
+}
+SPECIALIZATION_LEVELS = ["ITI", "Diploma", "UG (Bachelor's)", "PG (Master's)"]
+
+# A level's year must be later than every level listed for it (and present)
+EARLIER_LEVELS = {
+    "12th": ["10th"],
+    "ITI": ["10th"],
+    "Diploma": ["10th", "12th", "ITI"],
+    "UG (Bachelor's)": ["10th", "12th", "ITI", "Diploma"],
+    "PG (Master's)": ["10th", "12th", "ITI", "Diploma", "UG (Bachelor's)"],
+}
+
+NAME_COLUMNS = ["name", "father_name", "husband_name"]
+TEXT_COLUMNS = ["name", "phone", "dob", "address", "is_married", "father_name", "husband_name", "highest_qualification"]
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+
+_CERT_RE = re.compile(r"^cert_(\d+)_")
+_EXP_RE = re.compile(r"^exp_(\d+)_")
+
+
+# ---------------------
+# 📥 Loading
+# ---------------------
+def load_table(path):
+    """Load a CSV, Excel or Parquet file with every column as text"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        df = pd.read_csv(path, dtype=str, engine="pyarrow")
+    elif ext in (".xlsx", ".xls"):
+        df = pd.read_excel(path, dtype=str)
+    elif ext == ".parquet":
+        df = pd.read_parquet(path).astype("string")
+    else:
+        raise ValueError(f"Unsupported intake file type: {ext}")
+    return df
+
+
+# ---------------------
+# 🧹 Normalization
+# ---------------------
+def capitalize_names(series):
+    """Vectorized capitalize_name: collapse whitespace, capitalize each word, keep 'N/A'"""
+    s = series.astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+    capitalized = s.str.lower().str.replace(r"(^| )(\S)", lambda m: m.group(1) + m.group(2).upper(), regex=True)
+    return capitalized.where(s != "N/A", s)
+
+
+def clean_phones(series):
+    """Vectorized clean_phone: keep digits only and drop a +91 / leading 0 prefix; invalid numbers become <NA>"""
+    digits = series.astype("string").str.replace(r"\D", "", regex=True)
+    digits = digits.mask((digits.str.len() == 12) & digits.str.startswith("91"), digits.str[2:])
+    digits = digits.mask((digits.str.len() == 11) & digits.str.startswith("0"), digits.str[1:])
+    return digits.where(digits.str.len() == 10)
+
+
+def parse_dates(series, dayfirst=True):
+    """Parse mixed date formats column-wise; unparseable values become NaT"""
+    return pd.to_datetime(series, errors="coerce", dayfirst=dayfirst, format="mixed")
+
+
+def parse_years(series):
+    return pd.to_numeric(series, errors="coerce").astype("Int64")
+
+
+def _column(df, name, dtype="string"):
+    """A column, or an all-missing one if the intake file doesn't have it"""
+    if name in df:
+        return df[name]
+    return pd.Series(pd.NA, index=df.index, dtype=dtype)
+
+
+def _blank(series):
+    return series.isna() | (series.astype("string").str.strip() == "")
+
+
+def _numbered_groups(columns, pattern):
+    return sorted({int(m.group(1)) for m in map(pattern.match, columns) if m})
+
+
+def normalize(df, dayfirst=True):
+    """Return a normalized copy of the intake table (all operations column-wise)"""
+    df = df.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+
+    for column in TEXT_COLUMNS:
+        if column not in df:
+            df[column] = pd.NA
+        df[column] = df[column].astype("string").str.strip()
+    for column in NAME_COLUMNS:
+        df[column] = capitalize_names(df[column])
+
+    df["phone_raw"] = df["phone"]
+    df["phone"] = clean_phones(df["phone"])
+    df["dob"] = parse_dates(df["dob"], dayfirst)
+    df["is_married"] = df["is_married"].str.capitalize()
+
+    for prefix in LEVEL_PREFIXES.values():
+        for field in ("institution", "specialization"):
+            df[f"{prefix}_{field}"] = _column(df, f"{prefix}_{field}").astype("string").str.strip()
+        df[f"{prefix}_year"] = parse_years(_column(df, f"{prefix}_year"))
+
+    for n in _numbered_groups(df.columns, _CERT_RE):
+        for field in ("name", "institution", "duration"):
+            df[f"cert_{n}_{field}"] = _column(df, f"cert_{n}_{field}").astype("string").str.strip()
+        df[f"cert_{n}_year"] = parse_years(_column(df, f"cert_{n}_year"))
+    for n in _numbered_groups(df.columns, _EXP_RE):
+        for field in ("company", "position", "department"):
+            df[f"exp_{n}_{field}"] = _column(df, f"exp_{n}_{field}").astype("string").str.strip()
+        for field in ("start_date", "end_date"):
+            df[f"exp_{n}_{field}"] = parse_dates(_column(df, f"exp_{n}_{field}"), dayfirst)
+        current = _column(df, f"exp_{n}_is_current").astype("string").str.strip().str.lower()
+        df[f"exp_{n}_is_current"] = current.isin(TRUE_VALUES).fillna(False).astype(bool)
+    return df
+
+
+# ---------------------
+# ✅ Validation
+# ---------------------
+def validate(df):
+    """
+    Check the intake rules on a normalized table
+
+    Returns:
+        pandas.DataFrame: One row per problem with columns row, field, error
+    """
+    checks = []
+    current_year = datetime.now().year
+
+    def check(mask, field, message):
+        mask = mask.fillna(False).astype(bool)
+        if mask.any():
+            checks.append(pd.DataFrame({"row": df.index[mask], "field": field, "error": message}))
+
+    # Basic information
+    check(_blank(df["name"]), "name", "Please fill in all required fields marked with *")
+    check(_blank(df["address"]), "address", "Please fill in all required fields marked with *")
+    check(_blank(df["phone_raw"]), "phone", "Please fill in all required fields marked with *")
+    check(~_blank(df["phone_raw"]) & df["phone"].isna(), "phone", PHONE_ERROR)
+    check(df["dob"].isna(), "dob", "Please enter a valid Date of Birth")
+
+    # Family information by marital status
+    check(~df["is_married"].isin(["Single", "Married"]), "is_married", "Marital Status must be Single or Married")
+    check((df["is_married"] == "Single") & _blank(df["father_name"]), "father_name", "Please enter father's name")
+    check((df["is_married"] == "Married") & _blank(df["husband_name"]), "husband_name", "Please enter husband's name")
+
+    # Education: required levels by highest qualification
+    qualification = df["highest_qualification"]
+    check(~qualification.isin(QUALIFICATION_LEVELS), "highest_qualification",
+          f"Highest Qualification must be one of: {', '.join(QUALIFICATION_LEVELS)}")
+
+    present = {}
+    for level, prefix in LEVEL_PREFIXES.items():
+        institution = df[f"{prefix}_institution"]
+        year = df[f"{prefix}_year"]
+        specialization = df[f"{prefix}_specialization"]
+        has_any = ~_blank(institution) | year.notna() | ~_blank(specialization)
+
+        required = qualification.isin([q for q, levels in REQUIRED_LEVELS.items() if level in levels])
+        allowed = required | qualification.isin([q for q, levels in OPTIONAL_LEVELS.items() if level in levels])
+        expected = required | (allowed & has_any)
+        present[level] = expected
+
+        label = "Board Name" if level in ("10th", "12th") else "University/Institution Name"
+        check(expected & _blank(institution), f"{prefix}_institution", f"Please enter {label} for {level}")
+        check(expected & year.isna(), f"{prefix}_year", f"Please enter Year of Completion for {level}")
+        check(expected & ((year < MIN_YEAR) | (year > current_year)), f"{prefix}_year",
+              f"Year of Completion for {level} must be between {MIN_YEAR} and {current_year}")
+        if level in SPECIALIZATION_LEVELS:
+            title = "ITI Trade/Course Title" if level == "ITI" else "Course Title"
+            check(expected & _blank(specialization), f"{prefix}_specialization", f"Please enter {title} for {level}")
+        check(~allowed & has_any & qualification.isin(QUALIFICATION_LEVELS), prefix,
+              f"{level} details are not expected for this Highest Qualification")
+
+    # Education: year ordering across levels
+    for level, earlier_levels in EARLIER_LEVELS.items():
+        year = df[f"{LEVEL_PREFIXES[level]}_year"]
+        for earlier in earlier_levels:
+            earlier_year = df[f"{LEVEL_PREFIXES[earlier]}_year"]
+            check(present[level] & present[earlier] & (year <= earlier_year),
+                  f"{LEVEL_PREFIXES[level]}_year", f"{level} year must be after {earlier} year")
+    iti_year = df[f"{LEVEL_PREFIXES['ITI']}_year"]
+    twelfth_year = df[f"{LEVEL_PREFIXES['12th']}_year"]
+    check(present["ITI"] & present["12th"] & (iti_year == twelfth_year),
+          f"{LEVEL_PREFIXES['ITI']}_year", "ITI must be completed before or after 12th, not in the same year")
+
+    # Certifications
+    for n in _numbered_groups(df.columns, _CERT_RE):
+        name, institution, year = df[f"cert_{n}_name"], df[f"cert_{n}_institution"], df[f"cert_{n}_year"]
+        has_any = ~_blank(name) | ~_blank(institution) | year.notna()
+        check(has_any & (_blank(name) | _blank(institution)), f"cert_{n}",
+              f"Certification {n}: Certification Name and Institution are required")
+        check(has_any & ((year < MIN_YEAR) | (year > current_year)), f"cert_{n}_year",
+              f"Certification {n}: Year of Completion must be between {MIN_YEAR} and {current_year}")
+
+    # Work experience
+    for n in _numbered_groups(df.columns, _EXP_RE):
+        company, position = df[f"exp_{n}_company"], df[f"exp_{n}_position"]
+        start, end, current = df[f"exp_{n}_start_date"], df[f"exp_{n}_end_date"], df[f"exp_{n}_is_current"]
+        has_any = ~_blank(company) | ~_blank(position) | start.notna()
+        check(has_any & (_blank(company) | _blank(position)), f"exp_{n}",
+              f"Employer {n}: Company Name and Position are required")
+        check(has_any & start.isna(), f"exp_{n}_start_date", f"Employer {n}: Please enter a valid Start Date")
+        check(has_any & ~current & end.isna(), f"exp_{n}_end_date", f"Employer {n}: Please enter a valid End Date")
+        check(has_any & ~current & (end < start), f"exp_{n}_end_date", f"Employer {n}: End Date is before Start Date")
+
+    if not checks:
+        return pd.DataFrame({"row": pd.Series(dtype=df.index.dtype), "field": pd.Series(dtype=str), "error": pd.Series(dtype=str)})
+    return pd.concat(checks, ignore_index=True).sort_values(["row", "field"], kind="stable", ignore_index=True)
+
+
+def ingest(source, dayfirst=True):
+    """
+    Load, normalize and validate an intake table
+
+    Args:
+        source (str or pandas.DataFrame): File path (CSV/Excel/Parquet) or a raw table
+        dayfirst (bool): Read ambiguous dates as DD/MM/YYYY
+
+    Returns:
+        tuple: (valid rows as a normalized DataFrame, error table with row/field/error)
+    """
+    raw = load_table(source) if isinstance(source, str) else source
+    df = normalize(raw, dayfirst)
+    errors = validate(df)
+    valid = df[~df.index.isin(errors["row"])]
+    return valid, errors
+
+
+# ---------------------
+# 🧾 Records
+# ---------------------
+def _python_values(series):
+    """A column as a plain list with None for missing values and datetime.date for dates"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.date.astype(object)
+    elif pd.api.types.is_integer_dtype(series):
+        values = series.astype(object)
+    else:
+        values = series.astype(object)
+        values = values.where(values != "", None)
+    return values.where(series.notna(), None).tolist()
+
+
+def iter_user_records(valid):
+    """Yield user_data dicts (as collect_user_data builds them) for validated rows"""
+    # Convert column-wise once instead of boxing every cell
+    col = {column: _python_values(valid[column]) for column in valid.columns}
+
+    levels = [
+        (level, list(zip(col[f"{prefix}_institution"], col[f"{prefix}_year"], col[f"{prefix}_specialization"])))
+        for level, prefix in LEVEL_PREFIXES.items()
+    ]
+    certs = [
+        list(zip(col[f"cert_{n}_name"], col[f"cert_{n}_institution"], col[f"cert_{n}_year"], col[f"cert_{n}_duration"]))
+        for n in _numbered_groups(valid.columns, _CERT_RE)
+    ]
+    exps = [
+        list(zip(col[f"exp_{n}_company"], col[f"exp_{n}_position"], col[f"exp_{n}_department"],
+                 col[f"exp_{n}_start_date"], col[f"exp_{n}_end_date"], col[f"exp_{n}_is_current"]))
+        for n in _numbered_groups(valid.columns, _EXP_RE)
+    ]
+    collected_on = date.today()
+    people = zip(col["name"], col["phone"], col["dob"], col["address"], col["is_married"],
+                 col["father_name"], col["husband_name"], col["highest_qualification"])
+
+    for i, (name, phone, dob, address, is_married, father_name, husband_name, qualification) in enumerate(people):
+        education = {}
+        for level, rows in levels:
+            institution, year, specialization = rows[i]
+            if institution and year:
+                education[level] = {'institution': institution, 'year': year, 'specialization': specialization}
+
+        certifications = []
+        for rows in certs:
+            cert_name, institution, year, duration = rows[i]
+            if cert_name and institution:
+                certifications.append({'name': cert_name, 'institution': institution, 'year': year, 'duration': duration})
+
+        work_experience = []
+        for rows in exps:
+            company, position, department, start_date, end_date, is_current = rows[i]
+            if company and position:
+                experience = {
+                    'company': company,
+                    'position': position,
+                    'start_date': start_date,
+                    'end_date': None if is_current else end_date,
+                    'is_current': bool(is_current),
+                }
+                if department:
+                    experience['department'] = department
+                work_experience.append(experience)
+
+        yield {
+            'name': name,
+            'phone': phone,
+            'dob': dob,
+            'address': address,
+            'is_married': is_married,
+            'father_name': father_name or "",
+            'husband_name': husband_name or "",
+            'highest_qualification': qualification,
+            'education': education,
+            'certifications': certifications,
+            'work_experience': work_experience,
+            'collected_on': collected_on,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a bulk CV intake file")
+    parser.add_argument("source", help="CSV, Excel or Parquet file")
+    parser.add_argument("--valid", help="Write valid, normalized rows here (.parquet or .csv)")
+    parser.add_argument("--errors", help="Write the per-row error table here (.csv)")
+    parser.add_argument("--monthfirst", action="store_true", help="Read ambiguous dates as MM/DD/YYYY")
+    args = parser.parse_args(argv)
+
+    valid, errors = ingest(args.source, dayfirst=not args.monthfirst)
+    print(f"{len(valid)} valid rows, {errors['row'].nunique()} rows with {len(errors)} errors")
+
+    if args.valid:
+        if args.valid.endswith(".parquet"):
+            valid.to_parquet(args.valid, index=True)
+        else:
+            valid.to_csv(args.valid, index=True)
+    if args.errors:
+        errors.to_csv(args.errors, index=False)
+
+
+if __name__ == "__main__":
+    main()
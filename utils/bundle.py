@@ -0,0 +1,228 @@
+# utils/bundle.py
+"""
+Print bundles: many CVs in one PDF, one bookmark per candidate
+
+- render_bundle() renders records (e.g. a bulk intake file) into a single
+  ReportLab document, so each font, style and identical image is written once
+  for the whole bundle instead of once per CV.
+- merge_bundle() merges CVs that were already generated (and encrypted) with
+  qpdf: pages are copied as-is, without re-rendering or PyPDF2 decryption, and
+  identical standard-font dictionaries are shared.
+
+Either way the bundle is encrypted at most once, when it is written. Both
+modes hold the whole bundle in memory until then (see the README for sizes),
+so split very large runs. Run from the project root, e.g.:
+
+    python -m utils.bundle render intake.csv --output bundle.pdf
+    python -m utils.bundle merge --date 2026-10-19 --source-password gbl --password gbl --output bundle.pdf
+"""
+import argparse
+import concurrent.futures
+import io
+import time
+
+import pikepdf
+import streamlit as st
+from reportlab.platypus import SimpleDocTemplate
+from reportlab.platypus.flowables import Flowable, PageBreakIfNotEmpty
+
+from utils.bulk_ingest import ingest, iter_user_records
+from utils.cv_index import CVIndex, DEFAULT_INDEX_PATH, parse_cv_filename
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+from utils.encryption import qpdf_encryption
+from utils.profiling import profile, profile_settings, configure as configure_profiling
+from utils.storage import create_backend, storage_settings, join_path
+
+DOWNLOAD_THREADS = 8
+
+
+def bookmark_title(name, phone):
+    return f"{name} ({phone})"
+
+
+# ---------------------
+# 🖨️ Render Mode
+# ---------------------
+class _CandidateStart(Flowable):
+    """Zero-size marker placed at the top of each candidate's first page"""
+
+    def __init__(self, key, title, user_data):
+        super().__init__()
+        self.key = key
+        self.title = title
+        self.user_data = user_data
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        pass
+
+
+class _BundleDocTemplate(SimpleDocTemplate):
+    """Adds a bookmark and draws the photo where each candidate starts"""
+
+    def __init__(self, output, plan, **kwargs):
+        super().__init__(output, **plan.doc_kwargs(), **kwargs)
+        self.plan = plan
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, _CandidateStart):
+            self.canv.showOutline()
+            self.canv.bookmarkPage(flowable.key)
+            self.canv.addOutlineEntry(flowable.title, flowable.key, level=0)
+            # Back in page coordinates here, so the photo lands in its usual slot
+            self.plan.draw_photo(self.canv, flowable.user_data)
+
+
+def render_bundle(records, output, template=DEFAULT_TEMPLATE, password=None):
+    """
+    Render many records into one PDF
+
+    Args:
+        records (iterable): user_data dicts
+        output (str or file): Where to write the bundle
+        template (str): Template name or path
+        password (str): Encrypt the bundle once with this password
+
+    Returns:
+        int: Number of CVs in the bundle
+    """
+    plan = load_template(template)
+    story = []
+    count = 0
+    for count, user_data in enumerate(records, 1):
+        story.append(PageBreakIfNotEmpty())
+        story.append(_CandidateStart(f"cv{count}", bookmark_title(user_data['name'], user_data['phone']), user_data))
+        story.extend(plan.build_story(user_data))
+
+    buf = io.BytesIO()
+    with profile(f"bundle-{count}cvs"):
+        doc = _BundleDocTemplate(buf, plan, title="CV bundle")
+        doc.build(story)
+        _write(buf.getvalue(), output, password)
+    return count
+
+
+def _write(pdf_bytes, output, password):
+    # qpdf packs the many small per-page objects into compressed object streams
+    with pikepdf.open(io.BytesIO(pdf_bytes)) as pdf:
+        pdf.save(output, encryption=qpdf_encryption(password) or False,
+                 object_stream_mode=pikepdf.ObjectStreamMode.generate)
+
+
+# ---------------------
+# 📎 Merge Mode
+# ---------------------
+def merge_bundle(sources, output, source_password=None, password=None):
+    """
+    Merge existing CV PDFs into one, without re-rendering
+
+    Every source stays open (in memory) until the bundle is saved, so memory
+    grows with the number of CVs.
+
+    Args:
+        sources (iterable): (bookmark title, PDF bytes) pairs, in bundle order
+        output (str or file): Where to write the bundle
+        source_password (str): Password of the (encrypted) source CVs
+        password (str): Encrypt the bundle once with this password
+
+    Returns:
+        int: Number of CVs in the bundle
+    """
+    opened = []
+    starts = []
+    shared_fonts = {}
+    page_count = 0
+    bundle = pikepdf.new()
+    try:
+        for title, pdf_bytes in sources:
+            # qpdf copies page streams lazily, so sources stay open until the bundle is saved
+            source = pikepdf.open(io.BytesIO(pdf_bytes), password=source_password or "")
+            opened.append(source)
+            bundle.pages.extend(source.pages)
+            starts.append((title, page_count))
+            page_count += len(source.pages)
+
+        # One pass over the pages at the end: looking pages up by number while the list grows re-scans it
+        pages = list(bundle.pages)
+        for page in pages:
+            _share_standard_fonts(bundle, page, shared_fonts)
+        with bundle.open_outline() as outline:
+            for title, first_page in starts:
+                destination = pikepdf.Array([pages[first_page].obj, pikepdf.Name.Fit])
+                outline.root.append(pikepdf.OutlineItem(title, destination=destination))
+        bundle.Root.PageMode = pikepdf.Name.UseOutlines
+        bundle.save(output, encryption=qpdf_encryption(password) or False,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    finally:
+        bundle.close()
+        for source in opened:
+            source.close()
+    return len(opened)
+
+
+def _share_standard_fonts(pdf, page, shared):
+    # Standard-14 font dicts (no embedded data) are identical across CVs; point them all at one object
+    fonts = page.obj.get("/Resources", {}).get("/Font")
+    if fonts is None:
+        return
+    for name, font in list(fonts.items()):
+        if "/FontDescriptor" in font or not all(isinstance(v, pikepdf.Name) for v in font.values()):
+            continue
+        key = tuple(sorted((k, str(v)) for k, v in font.items()))
+        if key in shared:
+            fonts[name] = shared[key]
+        else:
+            shared[key] = font if font.is_indirect else pdf.make_indirect(font)
+
+
+def storage_sources(storage, paths, threads=DOWNLOAD_THREADS):
+    """(bookmark title, PDF bytes) for stored CVs, downloaded in parallel, in the given order"""
+    def title(path):
+        parsed = parse_cv_filename(path.rsplit("/", 1)[-1])
+        return bookmark_title(*parsed) if parsed else path.rsplit("/", 1)[-1]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        yield from zip(map(title, paths), executor.map(storage.get, paths))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle many CVs into one PDF for printing")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    render = sub.add_parser("render", help="render the valid rows of a bulk intake file into one PDF")
+    render.add_argument("source", help="CSV, Excel or Parquet intake file")
+    render.add_argument("--template", default=st.secrets.get("cv", {}).get("template", DEFAULT_TEMPLATE))
+
+    merge = sub.add_parser("merge", help="merge CVs from the configured storage folder")
+    merge.add_argument("--date", help="only CVs uploaded on this date (YYYY-MM-DD), from the CV index")
+    merge.add_argument("--until", help="with --date: last date to include")
+    merge.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    merge.add_argument("--source-password", help="password of the stored CVs")
+
+    for command in (render, merge):
+        command.add_argument("--output", required=True, help="bundle file to write")
+        command.add_argument("--password", help="encrypt the bundle with this password")
+    args = parser.parse_args(argv)
+    configure_profiling(profile_settings(st.secrets))
+
+    started = time.perf_counter()
+    if args.command == "render":
+        valid, errors = ingest(args.source)
+        if len(errors):
+            print(f"Skipping {errors['row'].nunique()} invalid rows (see python -m utils.bulk_ingest)")
+        count = render_bundle(iter_user_records(valid), args.output, args.template, args.password)
+    else:
+        settings = storage_settings(st.secrets)
+        storage = create_backend(settings)
+        if args.date:
+            paths = [row["path"] for row in CVIndex(args.index).updated_between(args.date, args.until)]
+        else:
+            paths = [join_path(settings["folder"], name) for name in storage.list(settings["folder"])
+                     if name.lower().endswith(".pdf")]
+        count = merge_bundle(storage_sources(storage, paths), args.output, args.source_password, args.password)
+    print(f"Wrote {count} CVs to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# utils/canvas_renderer.py
+import html
+import re
+import weakref
+
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.rl_config import spaceShrinkage
+
+# SimpleDocTemplate's frame pads its content by 6pt on every side
+FRAME_PADDING = 6
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHOLE_LINE_BOLD_RE = re.compile(r"\s*<b>([^<]*)</b>\s*")
+_style_metrics_cache = weakref.WeakKeyDictionary()
+
+
+class _StyleMetrics:
+    """Everything the canvas needs from a ParagraphStyle, resolved once per plan"""
+
+    def __init__(self, style):
+        self.font_name = style.fontName
+        family, _, italic = ps2tt(style.fontName)
+        self.bold_font_name = tt2ps(family, 1, italic)
+        self.font_size = style.fontSize
+        self.leading = style.leading
+        self.space_before = style.spaceBefore
+        self.space_after = style.spaceAfter
+        self.alignment = style.alignment
+        self.left_indent = style.leftIndent
+        self.right_indent = style.rightIndent
+        self.text_color = style.textColor
+        self.back_color = style.backColor
+        self.border_padding = style.borderPadding
+
+
+def _metrics_for(plan):
+    metrics = _style_metrics_cache.get(plan)
+    if metrics is None:
+        metrics = {name: _StyleMetrics(style) for name, style in plan.styles.items()}
+        _style_metrics_cache[plan] = metrics
+    return metrics
+
+
+def _plain_text(markup):
+    """
+    Text of a paragraph the canvas can draw: plain, or bold as a whole
+
+    Returns:
+        tuple: (text, is_bold), or None for any other inline markup (partial
+            bold, <br/>, <i>, ...), which only platypus lays out correctly
+    """
+    match = _WHOLE_LINE_BOLD_RE.fullmatch(markup)
+    if match:
+        markup, is_bold = match.group(1), True
+    elif _TAG_RE.search(markup):
+        return None
+    else:
+        is_bold = False
+    return " ".join(html.unescape(markup).split()), is_bold
+
+
+def _wrap(text, font_name, font_size, avail):
+    """Greedy word wrap with the same space-shrink allowance Paragraph uses"""
+    space_width = stringWidth(" ", font_name, font_size)
+    shrink = spaceShrinkage * space_width
+    lines = []
+    words = []
+    width = -space_width
+    for word in text.split():
+        new_width = width + space_width + stringWidth(word, font_name, font_size)
+        if words and new_width > avail + shrink * len(words):
+            lines.append(" ".join(words))
+            words = [word]
+            width = stringWidth(word, font_name, font_size)
+        else:
+            words.append(word)
+            width = new_width
+    lines.append(" ".join(words))
+    return lines
+
+
+def layout_page(plan, items):
+    """
+    Precompute draw operations for layout items on a single page
+
+    Mirrors platypus frame semantics (spaceBefore/spaceAfter, leading,
+    first baseline at fontSize below the top of the paragraph).
+
+    Args:
+        plan (LayoutPlan): Compiled template plan
+        items (list): Items from LayoutPlan.items()
+
+    Returns:
+        list: Draw operations, or None if the content does not fit on one page
+            or uses markup other than whole-line bold
+    """
+    metrics = _metrics_for(plan)
+    page_width, page_height = plan.pagesize
+    x0 = plan.margins["left"] + FRAME_PADDING
+    width = page_width - plan.margins["left"] - plan.margins["right"] - 2 * FRAME_PADDING
+    y = page_height - plan.margins["top"] - FRAME_PADDING
+    y_min = plan.margins["bottom"] + FRAME_PADDING
+
+    ops = []
+    at_top = True
+    for item in items:
+        if item[0] == "spacer":
+            y -= item[1]
+            at_top = False
+            continue
+
+        # Mixed fonts (non-Latin runs), shaping and inline markup need platypus
+        plain = _plain_text(item[2])
+        if plain is None:
+            return None
+
+        m = metrics[item[1]]
+        text, is_bold = plain
+        font_name = m.bold_font_name if is_bold else m.font_name
+        avail = width - m.left_indent - m.right_indent
+        text_width = stringWidth(text, font_name, m.font_size)
+        if text_width <= avail:
+            # Almost every CV line fits; skip the word-by-word split
+            lines = [text]
+        else:
+            lines = _wrap(text, font_name, m.font_size, avail)
+
+        if not at_top:
+            y -= m.space_before
+        height = len(lines) * m.leading
+        top = y
+        y -= height
+        if y < y_min:
+            return None
+
+        if m.back_color is not None:
+            bp = m.border_padding
+            ops.append(("rect", m.back_color, x0 - bp, y - bp, width + 2 * bp, height + 2 * bp))
+
+        baseline = top - m.font_size
+        for line in lines:
+            x = x0 + m.left_indent
+            if m.alignment in (TA_CENTER, TA_RIGHT):
+                slack = avail - stringWidth(line, font_name, m.font_size)
+                x += slack / 2 if m.alignment == TA_CENTER else slack
+            ops.append(("text", font_name, m.font_size, m.text_color, x, baseline, line))
+            baseline -= m.leading
+
+        y -= m.space_after
+        at_top = False
+
+    return ops
+
+
+def draw_cv(plan, user_data, output, invariant=None):
+    """
+    Draw a CV straight onto a reportlab canvas
+
+    Args:
+        plan (LayoutPlan): Compiled template plan
+        user_data (dict): CV data
+        output (str or file-like): Destination for the PDF
+        invariant (bool): Fixed dates and content-derived document ID (reproducible bytes)
+
+    Returns:
+        bool: True if written, False if the content overflows a page or uses
+            inline markup the canvas can't draw (nothing is written)
+    """
+    ops = layout_page(plan, plan.items(user_data))
+    if ops is None:
+        return False
+
+    c = canvas.Canvas(output, pagesize=plan.pagesize, invariant=invariant)
+    for op in ops:
+        if op[0] == "rect":
+            _, color, x, y, w, h = op
+            c.setFillColor(color)
+            c.rect(x, y, w, h, stroke=0, fill=1)
+        else:
+            _, font_name, font_size, color, x, y, line = op
+            c.setFillColor(color)
+            c.setFont(font_name, font_size)
+            c.drawString(x, y, line)
+    plan.draw_photo(c, user_data)
+    c.showPage()
+    c.save()
+    return True
@@ -0,0 +1,36 @@
+# utils/checkpoint.py
+"""
+Resume files for batch jobs over stored CVs (re-render, password rotation)
+
+A plain text file with one finished storage path per line, appended as each
+CV is done, so an interrupted job skips them when it is run again.
+"""
+import os
+import threading
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+class PathCheckpoint:
+    """Storage paths a job has finished; path None keeps nothing (dry runs)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+    def add(self, cv_path):
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(cv_path + "\n")
+            self.done.add(cv_path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,21 +1,33 @@
 # utils/cv_generator.py
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+import base64
+import hashlib
+import io
+import json
 import os
-from datetime import datetime, date
-
-def capitalize_name(name):
-    """Capitalize names properly"""
-    if not name or name == 'N/A':
-        return name
-    return ' '.join(word.capitalize() for word in str(name).split())
-
-def generate_cv_pdf(user_data):
-    """Generate a professional CV PDF from user data following the format of the first CV generator"""
+from datetime import date, datetime
+from utils.cv_template import normalize_phone, load_template, DEFAULT_TEMPLATE
+from utils.canvas_renderer import draw_cv
+from utils.profiling import profile
+
+# Bump when a code change alters rendered CVs; sidecars from older layouts are re-rendered
+LAYOUT_VERSION = 1
+
+def generate_cv_pdf(user_data, template=DEFAULT_TEMPLATE, renderer="platypus", deterministic=False):
+    """
+    Generate a professional CV PDF from user data using a declarative CV template (see utils/templates)
+
+    Args:
+        user_data (dict): CV data collected by collect_user_data
+        template (str): Template name or path
+        renderer (str): "platypus", or "canvas" to draw single-page CVs directly
+            on a canvas (falls back to platypus when content overflows a page)
+        deterministic (bool): Fixed dates and document ID, so the same input
+            always produces the same bytes
+
+    Returns:
+        str: Path to the generated PDF
+    """
 
     # Create temp directory if it doesn't exist
     temp_dir = "temp"
@@ -26,216 +38,60 @@ def generate_cv_pdf(user_data):
     filename = f"cv_temp_{timestamp}.pdf"
     filepath = os.path.join(temp_dir, filename)
 
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        filepath,
-        pagesize=A4,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-
-    # Define styles matching the first CV format
-    styles = getSampleStyleSheet()
-
-    # Title style for "CURRICULUM-VITAE"
-    title_style = ParagraphStyle(
-        'CVTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-
-    # Name style
-    name_style = ParagraphStyle(
-        'NameStyle',
-        parent=styles['Normal'],
-        fontSize=14,
-        spaceAfter=10,
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    )
-
-    # Section header style with colored background
-    section_header_style = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=12,
-        spaceAfter=8,
-        spaceBefore=15,
-        fontName='Helvetica-Bold',
-        textColor=colors.black,
-        backColor=colors.darkgray,
-        borderPadding=5,
-        alignment=TA_LEFT
-    )
-
-    # Normal text style
-    normal_style = ParagraphStyle(
-        'CVNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=6,
-        alignment=TA_LEFT,
-        fontName='Helvetica'
-    )
+    _render(user_data, filepath, template, renderer, deterministic)
 
-    # Build story (content)
-    story = []
+    return filepath
 
-    # Title - "CURRICULUM-VITAE"
-    story.append(Paragraph("<b>CURRICULUM-VITAE</b>", title_style))
-    story.append(Spacer(1, 12))
+def render_cv_bytes(user_data, template=DEFAULT_TEMPLATE, renderer="platypus", deterministic=False):
+    """Render a CV straight into memory and return the PDF bytes (no temp file)"""
+    buf = io.BytesIO()
+    _render(user_data, buf, template, renderer, deterministic)
+    return buf.getvalue()
+
+def canonical_json(user_data):
+    """user_data as canonical JSON: sorted keys, no whitespace, dates in ISO format, bytes (photo) as base64"""
+    def encode(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode("ascii")
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+    return json.dumps(user_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=encode)
+
+def input_hash(user_data, template=DEFAULT_TEMPLATE, renderer="platypus", linearize=False):
+    """SHA-256 (hex) of the template file, render options and canonical user_data: what a CV's bytes depend on"""
+    digest = hashlib.sha256(load_template(template).digest.encode())
+    digest.update(f"|{renderer}|{int(bool(linearize))}|".encode())
+    digest.update(canonical_json(user_data).encode("utf-8"))
+    return digest.hexdigest()
+
+def cv_filename(user_data):
+    """Final file name used for a candidate's CV, e.g. Ravi-Kumar-9876543210.pdf"""
+    name = user_data['name'].replace(" ", "-")
+    return f"{name}-{normalize_phone(user_data['phone'])}.pdf"
+
+def _render(user_data, output, template, renderer, deterministic=False):
+    with profile("render", user_data):
+        _render_document(user_data, output, template, renderer, deterministic)
+
+def _render_document(user_data, output, template, renderer, deterministic):
+    # Compiled once per process; recompiled only when the template file changes
+    plan = load_template(template)
+
+    # Invariant mode: fixed creation/modification dates and a content-derived ID
+    invariant = 1 if deterministic else None
+
+    if renderer == "canvas" and draw_cv(plan, user_data, output, invariant):
+        return
 
-    # Name
-    story.append(Paragraph(f"<b>{capitalize_name(user_data['name'])}</b>", name_style))
+    # Create PDF document
+    doc = SimpleDocTemplate(output, invariant=invariant, **plan.doc_kwargs())
 
-    # Phone Number
-    if user_data.get('phone'):
-        story.append(Paragraph(f"Phone Number: {user_data['phone']}", normal_style))
-
-
-    # Personal Information (following the first CV format)
-    # Father's Name or Husband's Name based on marital status
-    if user_data.get('is_married') == "Single" and user_data.get('father_name'):
-        story.append(Paragraph(f"Father's Name: {capitalize_name(user_data['father_name'])}", normal_style))
-    elif user_data.get('is_married') == "Married" and user_data.get('husband_name'):
-        story.append(Paragraph(f"Husband's Name: {capitalize_name(user_data['husband_name'])}", normal_style))
-
-    # Age (calculated from DOB if available)
-    if user_data.get('dob'):
-        age = datetime.now().year - user_data['dob'].year
-        date_obj = user_data['dob']
-        story.append(Paragraph(f"Age: {age} years", normal_style))
-        story.append(Paragraph(f"Date Of Birth : {date_obj}", normal_style))
-
-    # Address
-    if user_data.get('address'):
-        story.append(Paragraph(f"Address: {user_data['address']}", normal_style))
-
-
-    story.append(Spacer(1, 15))
-
-    # EDUCATIONAL QUALIFICATIONS Section
-    story.append(Paragraph("EDUCATIONAL QUALIFICATIONS", section_header_style))
-
-    if user_data.get('education'):
-        # Order education from highest to lowest (reverse order)
-        education_order = ["PG (Master's)", "UG (Bachelor's)", "Diploma", "ITI", "12th", "10th"]
-
-        for level in education_order:
-            if level in user_data['education']:
-                edu = user_data['education'][level]
-
-                if level == "10th":
-                    if edu.get('institution') and edu.get('year'):
-                        story.append(Paragraph(f"• 10th Standard, {edu['institution']}, {edu['year']}", normal_style))
-
-                elif level == "12th":
-                    if edu.get('institution') and edu.get('year'):
-                        story.append(Paragraph(f"• 12th Standard, {edu['institution']}, {edu['year']}", normal_style))
-
-                elif level == "ITI":
-                    if edu.get('institution') and edu.get('year'):
-                        trade = edu.get('specialization', 'ITI')
-                        story.append(Paragraph(f"• ITI ({trade}), {edu['institution']}, {edu['year']}", normal_style))
-
-                elif level == "Diploma":
-                    if edu.get('institution') and edu.get('year'):
-                        course_title = edu.get('specialization', 'Diploma')
-                        story.append(Paragraph(f"• {course_title}, {edu['institution']}, {edu['year']}", normal_style))
-
-                elif level == "UG (Bachelor's)":
-                    if edu.get('institution') and edu.get('year'):
-                        course_title = edu.get('specialization', 'Graduation')
-                        story.append(Paragraph(f"• {course_title}, {edu['institution']}, {edu['year']}", normal_style))
-
-                elif level == "PG (Master's)":
-                    if edu.get('institution') and edu.get('year'):
-                        course_title = edu.get('specialization', 'Post Graduation')
-                        story.append(Paragraph(f"• {course_title}, {edu['institution']}, {edu['year']}", normal_style))
-
-    story.append(Spacer(1, 15))
-
-    # CERTIFICATION COURSES Section (only if certifications exist)
-    if user_data.get('certifications') and len(user_data['certifications']) > 0:
-        story.append(Paragraph("CERTIFICATION COURSES", section_header_style))
-
-        # Sort certifications by year (most recent first)
-        sorted_certifications = sorted(user_data['certifications'], key=lambda x: x.get('year', 0), reverse=True)
-
-        for cert in sorted_certifications:
-            cert_text = f"• {cert['name']}"
-            if cert.get('institution'):
-                cert_text += f", {cert['institution']}"
-            if cert.get('year'):
-                cert_text += f", {cert['year']}"
-            if cert.get('duration'):
-                cert_text += f" ({cert['duration']})"
-
-            story.append(Paragraph(cert_text, normal_style))
-
-        story.append(Spacer(1, 15))
-
-    # VOCATIONAL TRAINING Section (if applicable)
-    if user_data.get('vocational_training'):
-        story.append(Paragraph("VOCATIONAL TRAINING", section_header_style))
-        for training in user_data['vocational_training']:
-            story.append(Paragraph(f"• {training}", normal_style))
-        story.append(Spacer(1, 15))
-
-    # WORK EXPERIENCE Section
-    story.append(Paragraph("WORK EXPERIENCE", section_header_style))
-
-    if user_data.get('work_experience') and len(user_data['work_experience']) > 0:
-        # Sort work experience by start date (most recent first)
-        # Use a default date object for sorting when start_date is missing
-        sorted_experience = sorted(
-            user_data['work_experience'],
-            key=lambda x: x.get('start_date', date(1900, 1, 1)),
-            reverse=True
-        )
-
-        for i, exp in enumerate(sorted_experience, 1):
-            # Format similar to the first CV
-            exp_text = f"{i}. "
-            story.append(Paragraph(exp_text, normal_style))
-
-            # Role/Designation
-            if exp.get('position'):
-                story.append(Paragraph(f"    Role/Designation: {capitalize_name(exp['position'])}", normal_style))
-
-            # Department
-            if exp.get('department'):
-                story.append(Paragraph(f"    Department: {exp['department']}", normal_style))
-
-            # Company
-            if exp.get('company'):
-                story.append(Paragraph(f"    Company: {capitalize_name(exp['company'])}", normal_style))
-
-            # Start Year
-            if exp.get('start_date'):
-                start_year = exp['start_date'].year if hasattr(exp['start_date'], 'year') else exp['start_date']
-                story.append(Paragraph(f"    Start Year: {start_year}", normal_style))
-
-            # End Year or Current
-            if exp.get('is_current'):
-                story.append(Paragraph(f"    End Year: Present (Currently Working)", normal_style))
-            elif exp.get('end_date'):
-                end_year = exp['end_date'].year if hasattr(exp['end_date'], 'year') else exp['end_date']
-                story.append(Paragraph(f"    End Year: {end_year}", normal_style))
-
-            story.append(Spacer(1, 8))
-    else:
-        story.append(Paragraph("• Fresher - No prior work experience", normal_style))
-
-    # Build PDF
-    doc.build(story)
+    # Build story (content)
+    story = plan.build_story(user_data)
 
-    return filepath
+    # Build PDF (the photo, if any, is drawn on page 1)
+    doc.build(story, onFirstPage=plan.first_page(user_data))
 
 def add_colored_header_pdf(story, text, section_header_style):
     """Add a colored header section to the PDF story"""
@@ -0,0 +1,185 @@
+# utils/cv_index.py
+"""
+Local index of CVs that already exist in storage
+
+A SQLite database (FTS5 for names, a B-tree index for phone numbers) that is
+updated whenever a CV is uploaded, so operators can find an existing CV in
+milliseconds instead of regenerating it. Rebuild it from storage with:
+
+    python -m utils.cv_index rebuild
+"""
+import argparse
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import streamlit as st
+
+from utils.cv_template import clean_phone, normalize_phone
+from utils.storage import create_backend, storage_settings, join_path
+
+DEFAULT_INDEX_PATH = "cv_index.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cvs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    storage TEXT,
+    size_bytes INTEGER,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cvs_phone ON cvs (phone);
+CREATE VIRTUAL TABLE IF NOT EXISTS cvs_fts USING fts5(
+    name, content='cvs', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS cvs_ai AFTER INSERT ON cvs BEGIN
+    INSERT INTO cvs_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS cvs_ad AFTER DELETE ON cvs BEGIN
+    INSERT INTO cvs_fts (cvs_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS cvs_au AFTER UPDATE OF name ON cvs BEGIN
+    INSERT INTO cvs_fts (cvs_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO cvs_fts (rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+_FILENAME_RE = re.compile(r"^(?P<name>.+)-(?P<phone>\d+)\.pdf$")
+
+
+def parse_cv_filename(filename):
+    """Recover (name, phone) from a name-phone.pdf file name, or None"""
+    match = _FILENAME_RE.match(filename)
+    if not match:
+        return None
+    return match.group("name").replace("-", " "), match.group("phone")
+
+
+class CVIndex:
+    """Thread-safe SQLite index of stored CVs, searchable by name and phone"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def upsert(self, name, phone, path, storage=None, size_bytes=None):
+        """Record (or refresh) a stored CV; the phone is stored normalized, as find_by_phone looks it up"""
+        phone = normalize_phone(phone)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO cvs (name, phone, path, storage, size_bytes, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    name = excluded.name, phone = excluded.phone, storage = excluded.storage,
+                    size_bytes = excluded.size_bytes, updated_at = excluded.updated_at
+                """,
+                (name, phone, path, storage, size_bytes, datetime.now().isoformat(timespec="seconds"))
+            )
+
+    def remove(self, path):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cvs WHERE path = ?", (path,))
+
+    def find_by_phone(self, phone):
+        digits = normalize_phone(phone)
+        if not digits:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM cvs WHERE phone = ? ORDER BY updated_at DESC", (digits,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query, limit=20):
+        """
+        Find CVs by phone number prefix (digits) or by name words (prefix match)
+
+        Returns:
+            list: Matching rows as dicts, best matches first
+        """
+        query = (query or "").strip()
+        compact = re.sub(r"[\s\-()]", "", query)
+        # A whole number typed with +91 or a leading 0 matches as stored; so does a prefix after +91
+        digits = clean_phone(compact) or re.sub(r"^\+(91)?", "", compact)
+        with self._lock:
+            if digits.isdigit():
+                # Prefix range on the phone index
+                rows = self._conn.execute(
+                    "SELECT * FROM cvs WHERE phone >= ? AND phone < ? ORDER BY phone LIMIT ?",
+                    (digits, digits + ":", limit)
+                ).fetchall()
+            else:
+                terms = [t for t in re.findall(r"\w+", query) if t]
+                if not terms:
+                    return []
+                match = " ".join(f'"{t}"*' for t in terms)
+                rows = self._conn.execute(
+                    """
+                    SELECT cvs.* FROM cvs_fts JOIN cvs ON cvs.id = cvs_fts.rowid
+                    WHERE cvs_fts MATCH ? ORDER BY bm25(cvs_fts), cvs.updated_at DESC LIMIT ?
+                    """,
+                    (match, limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def updated_between(self, since, until=None):
+        """CVs uploaded or refreshed on dates since..until (YYYY-MM-DD, inclusive), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM cvs WHERE date(updated_at) BETWEEN ? AND ? ORDER BY updated_at, id",
+                (str(since), str(until or since))
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cvs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def index_storage_folder(index, storage, folder):
+    """Add every name-phone.pdf in a storage folder to the index; returns the number indexed"""
+    indexed = 0
+    for filename in storage.list(folder):
+        parsed = parse_cv_filename(filename)
+        if parsed:
+            name, phone = parsed
+            index.upsert(name, phone, join_path(folder, filename), storage.name)
+            indexed += 1
+    return indexed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local index of stored CVs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="index every CV in the configured storage folder")
+    rebuild.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    search = sub.add_parser("search", help="search by name or phone")
+    search.add_argument("query")
+    search.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    index = CVIndex(args.index)
+    if args.command == "rebuild":
+        settings = storage_settings(st.secrets)
+        count = index_storage_folder(index, create_backend(settings), settings["folder"])
+        print(f"Indexed {count} CVs ({index.count()} total)")
+    elif args.command == "search":
+        for row in index.search(args.query):
+            print(f"{row['name']:<30} {row['phone']:<12} {row['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# utils/cv_queue.py
+"""
+Queue mode: operators keep entering candidates while earlier CVs finish
+
+In the two-step flow an operator waits on render, encryption and upload for
+every candidate. In queue mode, submitting a candidate hands the record to a
+background thread and the form is emptied straight away. The thread waits for
+a slot in the render pool (rather than asking the operator to retry), then
+uploads the CV and its encrypted sidecar, updates the CV index and logs the submission,
+exactly as Step 2 does. Each session keeps its QueuedCV entries for the status
+panel, including the PDF for download. Switched on per operator in the app, or
+by default in secrets.toml:
+
+    [cv]
+    queue_mode = true
+"""
+import concurrent.futures
+import itertools
+import sqlite3
+import time
+
+from utils.cv_generator import cv_filename
+from utils.profiling import profile
+from utils.render_pool import PoolBusy
+from utils.sidecar import build_sidecar, sidecar_filename
+from utils.storage import StorageError
+from utils.submission_log import submission_row
+
+DEFAULT_THREADS = 8
+BUSY_RETRY_SECONDS = 1
+MAX_SESSION_ENTRIES = 50
+
+QUEUED = "queued"
+RENDERING = "rendering"
+UPLOADING = "uploading"
+DONE = "done"
+UPLOAD_FAILED = "upload_failed"
+FAILED = "failed"
+FINISHED = (DONE, UPLOAD_FAILED, FAILED)
+
+_ids = itertools.count(1)
+
+
+class QueuedCV:
+    """One candidate submitted in queue mode; a queue thread advances its status"""
+
+    def __init__(self, user_data):
+        self.id = next(_ids)
+        self.user_data = user_data
+        self.filename = cv_filename(user_data)
+        self.queued_at = time.time()
+        self.status = QUEUED
+        self.jobs_ahead = None
+        self.result = None
+        self.error = None
+
+    @property
+    def pdf(self):
+        """The encrypted PDF, once rendered"""
+        return self.result["pdf"] if self.result else None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+
+def store_cv(storage, folder, user_data, result):
+    """
+    Upload a rendered CV
+
+    Args:
+        result (dict): From render_pool.render_job
+
+    Returns:
+        str: Stored path of the PDF
+
+    Raises:
+        StorageError: Upload failed
+    """
+    return storage.put(folder, cv_filename(user_data), result["pdf"])
+
+
+def store_sidecar(storage, folder, user_data, result, template, renderer, linearize, key):
+    """
+    Upload the encrypted sidecar of a stored CV, the source data for
+    re-rendering when the template changes (utils/rerender.py)
+
+    Args:
+        key (str): Sidecar key; None skips the sidecar
+
+    Returns:
+        str: Stored path of the sidecar, or None without a key
+
+    Raises:
+        StorageError: Upload failed
+    """
+    if not key:
+        return None
+    sidecar = build_sidecar(user_data, key, template, renderer, linearize, result["input_hash"])
+    return storage.put(folder, sidecar_filename(cv_filename(user_data)), sidecar)
+
+
+def trim_entries(entries, limit=MAX_SESSION_ENTRIES):
+    """Drop the oldest finished entries (and their PDFs) beyond limit; entries are newest first"""
+    keep = []
+    for entry in entries:
+        if len(keep) < limit or not entry.finished:
+            keep.append(entry)
+    return keep
+
+
+class CVQueue:
+    """
+    Background threads that render and store queued CVs, shared by all sessions
+
+    Args:
+        render_pool (RenderPool): Renders and encrypts; its queue limit is waited out
+        threads (int): CVs in progress at once (beyond that they wait as "queued")
+    """
+
+    def __init__(self, render_pool, threads=DEFAULT_THREADS):
+        self.render_pool = render_pool
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads, thread_name_prefix="cv-queue")
+
+    def submit(self, entry, storage, folder, cv_index, submission_log, template, renderer,
+               password, linearize=False, deterministic=False, sidecar_key=None):
+        """
+        Render and store a CV in the background; also used to retry a failed entry,
+        which re-renders only if it has no PDF yet
+
+        Args:
+            entry (QueuedCV): Updated in place as the CV progresses
+            storage, folder, cv_index, submission_log: Where the CV goes, as in Step 2
+            template, renderer, password, linearize, deterministic: As in Step 2
+            sidecar_key (str): Encrypts the sidecar; None skips it
+        """
+        entry.status, entry.error, entry.jobs_ahead = QUEUED, None, None
+        self._executor.submit(self._process, entry, storage, folder, cv_index, submission_log,
+                              template, renderer, (password, linearize, deterministic), sidecar_key)
+        return entry
+
+    def _process(self, entry, storage, folder, cv_index, submission_log, template, renderer, render_args,
+                 sidecar_key):
+        try:
+            with profile("queued_cv", entry.user_data):
+                self._render_and_store(entry, storage, folder, cv_index, submission_log,
+                                       template, renderer, render_args, sidecar_key)
+        except Exception as e:
+            # Nothing waits on this thread; the operator sees the error in the panel
+            entry.error = str(e)
+            entry.status = FAILED
+
+    def _render_and_store(self, entry, storage, folder, cv_index, submission_log, template, renderer, render_args,
+                          sidecar_key):
+        if entry.result is None:
+            entry.result = self._render(entry, renderer, render_args)
+        result = entry.result
+
+        entry.status = UPLOADING
+        upload_started = time.perf_counter()
+        try:
+            stored_path = store_cv(storage, folder, entry.user_data, result)
+            upload_status = "ok"
+        except StorageError as e:
+            upload_status = "failed"
+            entry.error = str(e)
+        uploaded = time.perf_counter()
+
+        if upload_status == "ok":
+            # The CV itself is stored; these only get a warning in the panel
+            warnings = []
+            try:
+                store_sidecar(storage, folder, entry.user_data, result, template, renderer, render_args[1],
+                              sidecar_key)
+            except StorageError as e:
+                warnings.append(f"Uploaded, but the re-render sidecar could not be saved: {e}")
+            try:
+                cv_index.upsert(entry.user_data['name'], entry.user_data['phone'], stored_path,
+                                storage.name, len(result["pdf"]))
+            except sqlite3.Error as e:
+                warnings.append(f"Uploaded, but the CV index could not be updated: {e}")
+            entry.error = "; ".join(warnings) or None
+
+        submission_log.append(submission_row(
+            entry.user_data,
+            template=template,
+            renderer=renderer,
+            render_ms=result["render_ms"],
+            encrypt_ms=result["encrypt_ms"],
+            upload_ms=(uploaded - upload_started) * 1000,
+            size_bytes=len(result["pdf"]),
+            upload_status=upload_status,
+            storage=storage.name
+        ))
+        entry.status = DONE if upload_status == "ok" else UPLOAD_FAILED
+
+    def _render(self, entry, renderer, render_args):
+        while True:
+            try:
+                job = self.render_pool.submit(entry.user_data, renderer, *render_args)
+                break
+            except PoolBusy:
+                time.sleep(BUSY_RETRY_SECONDS)
+
+        def show_queue_position(ahead):
+            entry.jobs_ahead = ahead
+            entry.status = RENDERING if not ahead else QUEUED
+
+        return self.render_pool.result(job, on_wait=show_queue_position)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,419 @@
+# utils/cv_template.py
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer
+
+from utils.fonts import (FontSet, FALLBACK_SCRIPT, SHAPING_AVAILABLE, embolden_font_tags, first_font_tag,
+                         only_truetype_fonts)
+from utils.photo import photo_image
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+DEFAULT_TEMPLATE = "default"
+
+PAGE_SIZES = {"A4": A4, "letter": letter}
+ALIGNMENTS = {"left": TA_LEFT, "center": TA_CENTER, "right": TA_RIGHT, "justify": TA_JUSTIFY}
+COLOR_KEYS = ("textColor", "backColor", "borderColor")
+PHOTO_STYLE_SUFFIX = "+photo"
+SCRIPT_STYLE_SEPARATOR = "@"
+PHONE_ERROR = "Phone number must have 10 digits"
+
+_plan_cache = {}
+_plan_lock = threading.Lock()
+
+
+def capitalize_name(name):
+    """Capitalize names properly"""
+    if not name or name == 'N/A':
+        return name
+    return ' '.join(word.capitalize() for word in str(name).split())
+
+
+def clean_phone(phone):
+    """Keep digits only and drop a +91 / leading 0 prefix; None unless 10 digits remain"""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else None
+
+
+def normalize_phone(phone):
+    """The phone as stored in file names and the CV index: clean_phone, else just its digits"""
+    return clean_phone(phone) or re.sub(r"\D", "", str(phone or ""))
+
+
+class _FormatContext(dict):
+    """Mapping used with str.format_map; unknown fields render as empty strings"""
+
+    def __missing__(self, key):
+        return ""
+
+
+# ---------------------
+# 📐 Layout Plan
+# ---------------------
+class LayoutPlan:
+    """A template compiled into page settings, ready-made styles and section specs"""
+
+    def __init__(self, spec, path, digest):
+        self.path = path
+        self.digest = digest
+        self.name = spec.get("name", os.path.splitext(os.path.basename(path))[0])
+        self.version = spec.get("version", 1)
+
+        page = spec.get("page", {})
+        self.pagesize = PAGE_SIZES[page.get("size", "A4")]
+        margins = page.get("margins", {})
+        self.margins = {side: margins.get(side, 0.75) * inch for side in ("left", "right", "top", "bottom")}
+
+        self.styles = _compile_styles(spec.get("styles", {}))
+        self.fonts = FontSet(spec.get("fonts"))
+        self.sections = [_compile_section(section, self.styles, self.fonts) for section in spec.get("sections", [])]
+
+        # Optional header photo slot (top-right of page 1); sections marked
+        # beside_photo are narrowed so their text wraps clear of it
+        photo = spec.get("photo")
+        self.photo = None
+        if photo:
+            self.photo = {key: photo.get(key, default) * inch
+                          for key, default in (("width", 1.1), ("height", 1.4), ("gap", 0.2))}
+            for section in self.sections:
+                if section.get("beside_photo"):
+                    _add_photo_styles(section, self.styles, self.photo["width"] + self.photo["gap"])
+
+        # Styles for paragraphs that contain non-Latin text: a shapable TTF as the
+        # paragraph font (so HarfBuzz shaping applies); see _script_item
+        for font_name in set(self.fonts.fonts.values()):
+            for name, base in list(self.styles.items()):
+                if SCRIPT_STYLE_SEPARATOR not in name:
+                    self.styles[name + SCRIPT_STYLE_SEPARATOR + font_name] = ParagraphStyle(
+                        name + SCRIPT_STYLE_SEPARATOR + font_name, parent=base,
+                        fontName=font_name, shaping=1 if SHAPING_AVAILABLE else 0
+                    )
+
+    def doc_kwargs(self):
+        """Keyword arguments for SimpleDocTemplate"""
+        return {
+            "pagesize": self.pagesize,
+            "leftMargin": self.margins["left"],
+            "rightMargin": self.margins["right"],
+            "topMargin": self.margins["top"],
+            "bottomMargin": self.margins["bottom"],
+        }
+
+    def section_items(self, section, user_data):
+        """
+        Lay out one section as a list of items
+
+        Items are ("paragraph", style_name, text) or ("spacer", height) tuples,
+        independent of any particular renderer.
+        """
+        items = SECTION_BUILDERS[section["type"]](section, user_data)
+        if section.get("beside_photo") and self.photo and user_data.get("photo"):
+            items = [(item[0], item[1] + PHOTO_STYLE_SUFFIX, item[2]) if item[0] == "paragraph" else item
+                     for item in items]
+        if self.fonts:
+            items = [self._script_item(item) for item in items]
+        return items
+
+    def _script_item(self, item):
+        """
+        Switch a paragraph with script-font runs to its shaping style
+
+        HarfBuzz cannot shape Type 1 faces, so the paragraph's Latin text is set
+        in the "unicode" TTF (or the script's own) instead of the style's
+        Helvetica. If the template's own markup names a Type 1 font, the
+        paragraph keeps its style and is left unshaped.
+        """
+        if item[0] != "paragraph":
+            return item
+        font_name = first_font_tag(item[2])
+        if font_name not in self.fonts.fonts.values():
+            return item
+        _, bold, italic = ps2tt(self.styles[item[1]].fontName)
+        latin_font = tt2ps(self.fonts.font_for(FALLBACK_SCRIPT) or font_name, bold, italic)
+        text = f'<font name="{latin_font}">{embolden_font_tags(item[2], everywhere=bold)}</font>'
+        if not only_truetype_fonts(text):
+            return item
+        return ("paragraph", item[1] + SCRIPT_STYLE_SEPARATOR + font_name, text)
+
+    def section_inputs(self, section, user_data):
+        """The part of user_data a section reads; used to key per-section caches"""
+        if "source" in section:
+            return user_data.get(section["source"])
+        if section["type"] == "education":
+            return user_data.get("education")
+        if section["type"] == "fields":
+            return {k: v for k, v in user_data.items() if not isinstance(v, (list, dict))}
+        return None
+
+    def items(self, user_data):
+        """Lay out every section of the template"""
+        items = []
+        for section in self.sections:
+            items.extend(self.section_items(section, user_data))
+        return items
+
+    def flowables(self, items):
+        """Turn layout items into platypus flowables"""
+        story = []
+        for item in items:
+            if item[0] == "spacer":
+                story.append(Spacer(1, item[1]))
+            else:
+                story.append(Paragraph(item[2], self.styles[item[1]]))
+        return story
+
+    def build_story(self, user_data):
+        """Full platypus story for user_data"""
+        return self.flowables(self.items(user_data))
+
+    def photo_box(self):
+        """(x, y, width, height) of the photo slot on page 1, or None"""
+        if not self.photo:
+            return None
+        page_width, page_height = self.pagesize
+        width, height = self.photo["width"], self.photo["height"]
+        return (page_width - self.margins["right"] - width, page_height - self.margins["top"] - height,
+                width, height)
+
+    def draw_photo(self, canv, user_data):
+        """Draw the candidate's photo (if any) into the photo slot"""
+        box = self.photo_box()
+        if box and user_data.get("photo"):
+            canv.drawImage(photo_image(user_data["photo"]), *box, preserveAspectRatio=True, anchor="ne")
+
+    def first_page(self, user_data):
+        """onFirstPage callback for SimpleDocTemplate.build"""
+        return lambda canv, doc: self.draw_photo(canv, user_data)
+
+
+# ---------------------
+# 📂 Loading & Caching
+# ---------------------
+def resolve_template_path(template):
+    """Map a template name (e.g. "default") or a file path to a file path"""
+    if os.path.sep in template or os.path.splitext(template)[1]:
+        return template
+    for ext in (".json", ".yaml", ".yml"):
+        candidate = os.path.join(TEMPLATES_DIR, template + ext)
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"CV template not found: {template}")
+
+
+def load_template(template=DEFAULT_TEMPLATE):
+    """
+    Return the compiled layout plan for a template
+
+    Plans are compiled once per process and recompiled only when the
+    template file's modification time changes.
+
+    Args:
+        template (str): Template name in utils/templates or path to a template file
+
+    Returns:
+        LayoutPlan: The compiled plan
+    """
+    path = os.path.abspath(resolve_template_path(template))
+    mtime = os.path.getmtime(path)
+
+    with _plan_lock:
+        cached = _plan_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        plan = LayoutPlan(_parse_template(raw, path), path, hashlib.sha256(raw).hexdigest())
+        _plan_cache[path] = (mtime, plan)
+        return plan
+
+
+def _parse_template(raw, path):
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required for YAML CV templates")
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+
+def _compile_styles(style_specs):
+    base = getSampleStyleSheet()
+    styles = {}
+    for style_name, spec in style_specs.items():
+        spec = dict(spec)
+        parent = base[spec.pop("parent", "Normal")]
+        if "alignment" in spec:
+            spec["alignment"] = ALIGNMENTS[spec["alignment"]]
+        for key in COLOR_KEYS:
+            if key in spec:
+                spec[key] = colors.toColor(spec[key])
+        styles[style_name] = ParagraphStyle(style_name, parent=parent, **spec)
+    return styles
+
+
+def _add_photo_styles(section, styles, indent):
+    used = {section["style"], section["heading_style"]} | {line.get("style", section["style"])
+                                                           for line in section.get("lines", [])}
+    for name in used:
+        if name in styles and name + PHOTO_STYLE_SUFFIX not in styles:
+            base = styles[name]
+            styles[name + PHOTO_STYLE_SUFFIX] = ParagraphStyle(
+                name + PHOTO_STYLE_SUFFIX, parent=base, rightIndent=base.rightIndent + indent
+            )
+
+
+def _compile_section(spec, styles, fonts=None):
+    section = dict(spec)
+    section["_fonts"] = fonts
+    if section.get("type") not in SECTION_BUILDERS:
+        raise ValueError(f"Unknown CV template section type: {section.get('type')}")
+
+    section.setdefault("style", "normal")
+    section.setdefault("heading_style", "section_header")
+    used_styles = {section["style"]}
+    if section.get("heading"):
+        used_styles.add(section["heading_style"])
+    for line in section.get("lines", []):
+        used_styles.add(line.get("style", section["style"]))
+    missing = used_styles - set(styles)
+    if missing:
+        raise ValueError(f"CV template section '{section.get('id')}' uses undefined styles: {sorted(missing)}")
+    return section
+
+
+# ---------------------
+# 🧱 Section Builders
+# ---------------------
+def _line_applies(line, ctx):
+    if not all(ctx.get(field) for field in line.get("requires", [])):
+        return False
+    if any(ctx.get(field) for field in line.get("unless", [])):
+        return False
+    return all(ctx.get(field) == value for field, value in line.get("when", {}).items())
+
+
+def _context(record, section, extra=None):
+    ctx = _FormatContext(record)
+    if extra:
+        ctx.update(extra)
+
+    # Derived fields available to every format string
+    if ctx.get("dob"):
+        # As of collection (part of the input hash, so re-renders stay byte-identical)
+        ctx["age"] = (ctx.get("collected_on") or date.today()).year - ctx["dob"].year
+    for key in list(ctx):
+        if key.endswith("_date") and ctx[key]:
+            value = ctx[key]
+            ctx[key[:-len("_date")] + "_year"] = value.year if hasattr(value, "year") else value
+
+    for field in section.get("capitalize", []):
+        ctx[field] = capitalize_name(ctx.get(field))
+    if section.get("_fonts"):
+        section["_fonts"].wrap_context(ctx)
+    return ctx
+
+
+def _render_lines(lines, ctx, default_style):
+    return [
+        ("paragraph", line.get("style", default_style), line["format"].format_map(ctx))
+        for line in lines if _line_applies(line, ctx)
+    ]
+
+
+def _sorted_records(records, sort_spec):
+    if not sort_spec:
+        return list(records)
+    key = sort_spec["key"]
+    return sorted(
+        records,
+        key=lambda r: (r.get(key) is not None, r.get(key) if r.get(key) is not None else 0),
+        reverse=sort_spec.get("reverse", False)
+    )
+
+
+def _with_heading(section, items):
+    if section.get("heading"):
+        items.insert(0, ("paragraph", section["heading_style"], section["heading"]))
+    if section.get("spacer_after"):
+        items.append(("spacer", section["spacer_after"]))
+    return items
+
+
+def _build_paragraph(section, user_data):
+    items = [("paragraph", section["style"], section["text"])]
+    return _with_heading(section, items)
+
+
+def _build_fields(section, user_data):
+    items = _render_lines(section["lines"], _context(user_data, section), section["style"])
+    return _with_heading(section, items)
+
+
+def _build_education(section, user_data):
+    items = []
+    education = user_data.get("education") or {}
+    for level in section["order"]:
+        if level not in education or level not in section["levels"]:
+            continue
+        level_spec = section["levels"][level]
+        ctx = _context(education[level], section)
+        for field, default in level_spec.get("defaults", {}).items():
+            if ctx.get(field) is None:
+                ctx[field] = default
+        if all(ctx.get(field) for field in section.get("requires", [])):
+            items.append(("paragraph", section["style"], level_spec["format"].format_map(ctx)))
+    return _with_heading(section, items)
+
+
+def _build_list(section, user_data):
+    records = user_data.get(section["source"]) or []
+    if not records:
+        return []
+
+    items = []
+    for record in _sorted_records(records, section.get("sort")):
+        if not isinstance(record, dict):
+            record = {"value": record}
+        ctx = _context(record, section)
+        text = "".join(part["format"].format_map(ctx) for part in section["item"] if _line_applies(part, ctx))
+        items.append(("paragraph", section["style"], text))
+    return _with_heading(section, items)
+
+
+def _build_entries(section, user_data):
+    records = user_data.get(section["source"]) or []
+    items = []
+    if records:
+        for i, record in enumerate(_sorted_records(records, section.get("sort")), 1):
+            ctx = _context(record, section, {"index": i})
+            items.extend(_render_lines(section["lines"], ctx, section["style"]))
+            if section.get("spacer_between"):
+                items.append(("spacer", section["spacer_between"]))
+    elif section.get("empty_text"):
+        items.append(("paragraph", section["style"], section["empty_text"]))
+    return _with_heading(section, items)
+
+
+SECTION_BUILDERS = {
+    "paragraph": _build_paragraph,
+    "fields": _build_fields,
+    "education": _build_education,
+    "list": _build_list,
+    "entries": _build_entries,
+}
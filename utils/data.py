@@ -1,6 +1,17 @@
 # utils/data.py
 import streamlit as st
 from datetime import datetime, date
+from utils.photo import prepare_photo, PhotoError
+from utils.cv_template import clean_phone
+
+def _key(name):
+    # Widget keys carry the form generation, so reset_form() starts every field afresh
+    return f"{name}_{st.session_state.get('cv_form_generation', 0)}"
+
+def reset_form():
+    """Empty the form on the next run (queue mode, after a candidate is queued)"""
+    st.session_state.cv_form_generation = st.session_state.get('cv_form_generation', 0) + 1
+    st.session_state.pop('cv_draft', None)
 
 def collect_user_data():
     """Collect all user data for CV generation"""
@@ -10,30 +21,40 @@ def collect_user_data():
     col1, col2 = st.columns(2)
 
     with col1:
-        name = st.text_input("Full Name *", placeholder="Enter your full name")
-        phone = st.text_input("Phone Number *", placeholder="Enter your phone number")
+        name = st.text_input("Full Name *", placeholder="Enter your full name", key=_key("name"))
+        phone = st.text_input("Phone Number *", placeholder="Enter your phone number", key=_key("phone"))
 
     with col2:
-        dob = st.date_input("Date of Birth *", max_value=date(2007,1,1), min_value=date(1999, 1, 1))
-        is_married = st.selectbox("Marital Status *", ["Single", "Married"])
+        dob = st.date_input("Date of Birth *", max_value=date(2007,1,1), min_value=date(1999, 1, 1), key=_key("dob"))
+        is_married = st.selectbox("Marital Status *", ["Single", "Married"], key=_key("is_married"))
 
     # Address Information
-    address = st.text_area("Current Address *", placeholder="Enter your current address")
+    address = st.text_area("Current Address *", placeholder="Enter your current address", key=_key("address"))
+
+    # Photo (Optional): resized and recompressed once, cached by content
+    photo = None
+    photo_file = st.file_uploader("Photo (Optional)", type=["jpg", "jpeg", "png", "webp"], key=_key("photo"))
+    if photo_file is not None:
+        try:
+            photo = prepare_photo(photo_file.getvalue())
+            st.image(photo, width=110)
+        except PhotoError as e:
+            st.error(f"❌ {e}")
 
     # Family Information based on marital status
     father_name = ""
     husband_name = ""
     if is_married == "Single":
-        father_name = st.text_input("Father's Name *", placeholder="Enter father's name")
+        father_name = st.text_input("Father's Name *", placeholder="Enter father's name", key=_key("father_name"))
     elif is_married == "Married":
-        husband_name = st.text_input("Husband's Name *", placeholder="Enter husband's name")
+        husband_name = st.text_input("Husband's Name *", placeholder="Enter husband's name", key=_key("husband_name"))
 
     # Education Information
     st.subheader("Education Information")
 
     # Determine highest qualification
     qualification_levels = ["10th", "12th", "Diploma", "UG (Bachelor's)", "PG (Master's)"]
-    highest_qualification = st.selectbox("Highest Qualification *", qualification_levels)
+    highest_qualification = st.selectbox("Highest Qualification *", qualification_levels, key=_key("highest_qualification"))
 
     # Ask about ITI and diploma based on highest qualification
     has_iti = False
@@ -41,38 +62,38 @@ def collect_user_data():
     has_diploma = False
 
     if highest_qualification in ["12th", "Diploma", "UG (Bachelor's)", "PG (Master's)"]:
-        has_iti = st.checkbox("Do you have an ITI Certificate?", value=False)
+        has_iti = st.checkbox("Do you have an ITI Certificate?", value=False, key=_key("has_iti"))
         if has_iti:
-            iti_timing = st.radio("When did you complete ITI?", ["Before 12th", "After 12th"])
+            iti_timing = st.radio("When did you complete ITI?", ["Before 12th", "After 12th"], key=_key("iti_timing"))
 
     if highest_qualification in ["UG (Bachelor's)", "PG (Master's)"]:
-        has_diploma = st.checkbox("Do you have a Diploma?", value=False)
+        has_diploma = st.checkbox("Do you have a Diploma?", value=False, key=_key("has_diploma"))
 
     # Collect education details based on highest qualification
     education_details = collect_education_details(highest_qualification, has_iti, iti_timing, has_diploma)
 
     # Certification Courses (Optional)
     st.subheader("Certification Courses (Optional)")
-    has_certifications = st.radio("Do you have any certification courses?", ["No", "Yes"])
+    has_certifications = st.radio("Do you have any certification courses?", ["No", "Yes"], key=_key("has_certifications"))
 
     certifications = []
     if has_certifications == "Yes":
-        num_certifications = st.number_input("Number of Certifications", min_value=1, max_value=10, value=1)
+        num_certifications = st.number_input("Number of Certifications", min_value=1, max_value=10, value=1, key=_key("num_certifications"))
 
         for i in range(int(num_certifications)):
             st.write(f"**Certification {i+1}:**")
             col1, col2 = st.columns(2)
 
             with col1:
-                cert_name = st.text_input(f"Certification Name *", key=f"cert_name_{i}")
-                institution = st.text_input(f"Institution/Organization *", key=f"cert_inst_{i}")
+                cert_name = st.text_input(f"Certification Name *", key=_key(f"cert_name_{i}"))
+                institution = st.text_input(f"Institution/Organization *", key=_key(f"cert_inst_{i}"))
 
             with col2:
                 cert_year = st.number_input(f"Year of Completion *",
                                           min_value=2015,
                                           max_value=datetime.now().year,
-                                          key=f"cert_year_{i}")
-                duration = st.text_input(f"Duration (Optional)", key=f"cert_duration_{i}", placeholder="e.g., 6 months")
+                                          key=_key(f"cert_year_{i}"))
+                duration = st.text_input(f"Duration (Optional)", key=_key(f"cert_duration_{i}"), placeholder="e.g., 6 months")
 
             if cert_name and institution:
                 certifications.append({
@@ -84,26 +105,26 @@ def collect_user_data():
 
     # Work Experience
     st.subheader("Work Experience")
-    has_experience = st.radio("Do you have work experience?", ["No", "Yes"])
+    has_experience = st.radio("Do you have work experience?", ["No", "Yes"], key=_key("has_experience"))
 
     work_experience = []
     if has_experience == "Yes":
-        num_employers = st.number_input("Number of Previous Employers", min_value=1, max_value=10, value=1)
+        num_employers = st.number_input("Number of Previous Employers", min_value=1, max_value=10, value=1, key=_key("num_employers"))
 
         for i in range(int(num_employers)):
             st.write(f"**Employer {i+1}:**")
             col1, col2 = st.columns(2)
 
             with col1:
-                company = st.text_input(f"Company Name *", key=f"company_{i}")
-                position = st.text_input(f"Position *", key=f"position_{i}")
+                company = st.text_input(f"Company Name *", key=_key(f"company_{i}"))
+                position = st.text_input(f"Position *", key=_key(f"position_{i}"))
 
             with col2:
-                start_date = st.date_input(f"Start Date *", key=f"start_{i}")
-                is_current = st.checkbox(f"Currently working here", key=f"current_{i}")
+                start_date = st.date_input(f"Start Date *", key=_key(f"start_{i}"))
+                is_current = st.checkbox(f"Currently working here", key=_key(f"current_{i}"))
                 end_date = None
                 if not is_current:
-                    end_date = st.date_input(f"End Date *", key=f"end_{i}")
+                    end_date = st.date_input(f"End Date *", key=_key(f"end_{i}"))
 
             if company and position:
                 work_experience.append({
@@ -114,6 +135,26 @@ def collect_user_data():
                     'is_current': is_current
                 })
 
+    # Compile all data
+    user_data = {
+        'name': name,
+        'phone': clean_phone(phone) or phone,
+        'dob': dob,
+        'address': address,
+        'photo': photo,
+        'is_married': is_married,
+        'father_name': father_name,
+        'husband_name': husband_name,
+        'highest_qualification': highest_qualification,
+        'education': education_details,
+        'certifications': certifications,
+        'work_experience': work_experience,
+        'collected_on': date.today()
+    }
+
+    # Keep the (possibly incomplete) draft for the live preview
+    st.session_state.cv_draft = user_data
+
     # Validation
     if not all([name, phone, address]):
         st.warning("Please fill in all required fields marked with *")
@@ -148,21 +189,6 @@ def collect_user_data():
         st.warning("Please add at least one work experience or select 'No' for work experience")
         return None
 
-    # Compile all data
-    user_data = {
-        'name': name,
-        'phone': phone,
-        'dob': dob,
-        'address': address,
-        'is_married': is_married,
-        'father_name': father_name,
-        'husband_name': husband_name,
-        'highest_qualification': highest_qualification,
-        'education': education_details,
-        'certifications': certifications,
-        'work_experience': work_experience
-    }
-
     return user_data
 
 def collect_education_details(highest_qualification, has_iti=False, iti_timing=None, has_diploma=False):
@@ -218,9 +244,9 @@ def collect_education_details(highest_qualification, has_iti=False, iti_timing=N
 
         with col1:
             if level in ["10th", "12th"]:
-                board_name = st.text_input(f"Board Name *", key=f"board_{level}")
+                board_name = st.text_input(f"Board Name *", key=_key(f"board_{level}"))
             else:
-                board_name = st.text_input(f"University/Institution Name *", key=f"board_{level}")
+                board_name = st.text_input(f"University/Institution Name *", key=_key(f"board_{level}"))
 
         with col2:
             # Set minimum year based on previous qualification
@@ -228,20 +254,20 @@ def collect_education_details(highest_qualification, has_iti=False, iti_timing=N
             year = st.number_input(f"Year of Completion *",
                                  min_value=min_year,
                                  max_value=datetime.now().year,
-                                 key=f"year_{level}",
+                                 key=_key(f"year_{level}"),
                                  help=f"Must be {min_year} or later")
 
         # Handle specialization/course based on level
         specialization = ""
         if level == "ITI":
-            specialization = st.text_input(f"ITI Trade/Course Title (e.g., Electrician, Fitter) *", key=f"spec_{level}")
+            specialization = st.text_input(f"ITI Trade/Course Title (e.g., Electrician, Fitter) *", key=_key(f"spec_{level}"))
         elif level == "Diploma":
-            specialization = st.text_input(f"Course Title (e.g., Diploma in Computer Science) *", key=f"spec_{level}")
+            specialization = st.text_input(f"Course Title (e.g., Diploma in Computer Science) *", key=_key(f"spec_{level}"))
         elif level in ["UG (Bachelor's)", "PG (Master's)"]:
             if level == "UG (Bachelor's)":
-                specialization = st.text_input(f"Course Title (e.g., BSC, BCOM, BTech) *", key=f"spec_{level}")
+                specialization = st.text_input(f"Course Title (e.g., BSC, BCOM, BTech) *", key=_key(f"spec_{level}"))
             else:  # PG
-                specialization = st.text_input(f"Course Title (e.g., MSC, MCOM, MTech) *", key=f"spec_{level}")
+                specialization = st.text_input(f"Course Title (e.g., MSC, MCOM, MTech) *", key=_key(f"spec_{level}"))
         # No specialization/stream for 10th and 12th
 
         if board_name and year:
@@ -1,28 +1,68 @@
 # utils/dropbox_handler.py
 
 import os
+import threading
+import time
 import requests
 import dropbox
-from dropbox.exceptions import AuthError, ApiError
+from dropbox.exceptions import ApiError
 import streamlit as st
+from utils.retry_policy import call_with_retry
+
+# Refreshed tokens are short-lived (~4h); reuse one until shortly before it expires
+TOKEN_EXPIRY_MARGIN = 300
+_token_cache = {"token": None, "expires_at": 0.0}
+_token_lock = threading.Lock()
 
 # ---------------------
 # 🔁 Refresh Access Token
 # ---------------------
-def refresh_access_token():
-    try:
-        creds = st.secrets["dropbox"]
+def dropbox_credentials(secrets):
+    """refresh_token, client_id and client_secret from Streamlit secrets (None where missing)"""
+    creds = secrets.get("dropbox", {})
+    return {
+        "refresh_token": creds.get("refresh_token"),
+        "client_id": creds.get("client_id", secrets.get("DROPBOX_APP_KEY")),
+        "client_secret": creds.get("client_secret", secrets.get("DROPBOX_APP_SECRET")),
+    }
+
+def fetch_access_token(credentials):
+    """
+    A short-lived access token for the given credentials, reused until shortly before it expires
+
+    Raises:
+        ValueError: Credentials are incomplete
+        requests.RequestException: The token request failed
+    """
+    with _token_lock:
+        if _token_cache["token"] and time.time() < _token_cache["expires_at"]:
+            return _token_cache["token"]
+        missing = [name for name in ("refresh_token", "client_id", "client_secret") if not credentials.get(name)]
+        if missing:
+            raise ValueError(f"missing Dropbox credentials: {', '.join(missing)}")
         data = {
             "grant_type": "refresh_token",
-            "refresh_token": creds["refresh_token"],
-            "client_id": creds["client_id"] if "client_id" in creds else st.secrets["DROPBOX_APP_KEY"],
-            "client_secret": creds["client_secret"] if "client_secret" in creds else st.secrets["DROPBOX_APP_SECRET"]
+            "refresh_token": credentials["refresh_token"],
+            "client_id": credentials["client_id"],
+            "client_secret": credentials["client_secret"]
         }
 
-        response = requests.post("https://api.dropboxapi.com/oauth2/token", data=data)
-        response.raise_for_status()
-        token = response.json().get("access_token")
+        def post_token_request():
+            response = requests.post("https://api.dropboxapi.com/oauth2/token", data=data)
+            response.raise_for_status()
+            return response.json()
+
+        payload = call_with_retry(post_token_request)
+        token = payload.get("access_token")
+        if not token:
+            raise ValueError("token response had no access_token")
+        _token_cache["token"] = token
+        _token_cache["expires_at"] = time.time() + payload.get("expires_in", 0) - TOKEN_EXPIRY_MARGIN
         return token
+
+def refresh_access_token():
+    try:
+        return fetch_access_token(dropbox_credentials(st.secrets))
     except Exception as e:
         st.error(f"Error refreshing access token: {e}")
         return None
@@ -30,10 +70,43 @@ def refresh_access_token():
 # ---------------------
 # 📦 Dropbox Client
 # ---------------------
+class RateLimitedDropbox(dropbox.Dropbox):
+    """Dropbox client whose every request goes through the shared retry policy and rate limiter"""
+
+    def __init__(self, *args, **kwargs):
+        # The SDK's own retry loop is disabled; utils.retry_policy owns retries
+        kwargs.setdefault("max_retries_on_error", 0)
+        kwargs.setdefault("max_retries_on_rate_limit", 0)
+        super().__init__(*args, **kwargs)
+
+    def request_json_string(self, host, func_name, route_style, request_json_arg, auth_type,
+                            request_binary, timeout=None):
+        rewind = None
+        if hasattr(request_binary, "seek"):
+            start = request_binary.tell()
+            rewind = lambda: request_binary.seek(start)
+        return call_with_retry(
+            super().request_json_string, host, func_name, route_style, request_json_arg,
+            auth_type, request_binary, timeout=timeout, rewind=rewind
+        )
+
+def create_dbx_client(credentials):
+    """
+    A Dropbox client for the given credentials; no Streamlit calls, so it is safe in CLIs and threads
+
+    Raises:
+        ValueError or requests.RequestException: The access token could not be refreshed
+    """
+    return RateLimitedDropbox(fetch_access_token(credentials))
+
+def default_dbx_client():
+    """create_dbx_client with the credentials in secrets.toml, for CLI jobs"""
+    return create_dbx_client(dropbox_credentials(st.secrets))
+
 def get_dbx_client():
     access_token = refresh_access_token()
     if access_token:
-        return dropbox.Dropbox(access_token)
+        return RateLimitedDropbox(access_token)
     else:
         st.error("Failed to refresh Dropbox token.")
         st.stop()
@@ -137,3 +210,31 @@ def get_download_link(file_path):
     except Exception as e:
         st.error(f"Error getting download link: {e}")
         return None
+
+# ---------------------
+# 📚 Iterate Folder (all pages)
+# ---------------------
+def iter_folder_files(folder_path="", dbx=None):
+    """Yield FileMetadata for every file in a folder, following pagination. Errors propagate."""
+    dbx = dbx or get_dbx_client()
+    if folder_path and not folder_path.startswith("/"):
+        folder_path = "/" + folder_path
+    result = dbx.files_list_folder(folder_path)
+    while True:
+        for entry in result.entries:
+            if isinstance(entry, dropbox.files.FileMetadata):
+                yield entry
+        if not result.has_more:
+            break
+        result = dbx.files_list_folder_continue(result.cursor)
+
+# ---------------------
+# ⬇️ Download File (in memory)
+# ---------------------
+def download_bytes(file_path, dbx=None):
+    """Return a file's contents without writing it to disk. Errors propagate."""
+    dbx = dbx or get_dbx_client()
+    if not file_path.startswith("/"):
+        file_path = "/" + file_path
+    _, response = dbx.files_download(file_path)
+    return response.content
@@ -1,14 +1,20 @@
 # utils/encryption.py
 import PyPDF2
+import pikepdf
+import hashlib
+import io
 import os
 
-def encrypt_pdf(input_path, password):
+def encrypt_pdf(input_path, password, linearize=False, input_digest=None):
     """
     Encrypt a PDF file with a password
     
     Args:
         input_path (str): Path to the input PDF file
         password (str): Password to encrypt the PDF with
+        linearize (bool): Write a linearized ("fast web view") PDF
+        input_digest (str): Input hash (see cv_generator.input_hash); makes the
+            output reproducible and is stored in the PDF metadata
     
     Returns:
         str: Path to the encrypted PDF file
@@ -19,18 +25,16 @@ def encrypt_pdf(input_path, password):
     output_path = f"{base_name}_encrypted.pdf"
     
     try:
+        if linearize or input_digest:
+            with open(input_path, 'rb') as input_file:
+                pdf_bytes = rewrite_pdf_bytes(input_file.read(), password, linearize, input_digest)
+            with open(output_path, 'wb') as output_file:
+                output_file.write(pdf_bytes)
+            return output_path
+        
         # Read the original PDF
         with open(input_path, 'rb') as input_file:
-            pdf_reader = PyPDF2.PdfReader(input_file)
-            pdf_writer = PyPDF2.PdfWriter()
-            
-            # Add all pages to the writer
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                pdf_writer.add_page(page)
-            
-            # Encrypt the PDF
-            pdf_writer.encrypt(password)
+            pdf_writer = _encrypted_writer(PyPDF2.PdfReader(input_file), password)
             
             # Write the encrypted PDF
             with open(output_path, 'wb') as output_file:
@@ -41,6 +45,134 @@ def encrypt_pdf(input_path, password):
     except Exception as e:
         raise Exception(f"Error encrypting PDF: {str(e)}")
 
+def encrypt_pdf_bytes(pdf_bytes, password, linearize=False, input_digest=None):
+    """
+    Encrypt an in-memory PDF with a password
+    
+    Args:
+        pdf_bytes (bytes): The unencrypted PDF
+        password (str): Password to encrypt the PDF with
+        linearize (bool): Write a linearized ("fast web view") PDF
+        input_digest (str): Input hash; makes the output reproducible (see rewrite_pdf_bytes)
+    
+    Returns:
+        bytes: The encrypted PDF
+    """
+    
+    if linearize or input_digest:
+        return rewrite_pdf_bytes(pdf_bytes, password, linearize, input_digest)
+    
+    try:
+        pdf_writer = _encrypted_writer(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)), password)
+        output = io.BytesIO()
+        pdf_writer.write(output)
+        return output.getvalue()
+        
+    except Exception as e:
+        raise Exception(f"Error encrypting PDF: {str(e)}")
+
+def _encrypted_writer(pdf_reader, password):
+    pdf_writer = PyPDF2.PdfWriter()
+    
+    # Add all pages to the writer
+    for page_num in range(len(pdf_reader.pages)):
+        page = pdf_reader.pages[page_num]
+        pdf_writer.add_page(page)
+    
+    # Encrypt the PDF
+    pdf_writer.encrypt(password)
+    return pdf_writer
+
+def linearize_pdf_bytes(pdf_bytes, password=None):
+    """
+    Rewrite a PDF linearized, so viewers can show page 1 before the whole file
+    has downloaded; optionally encrypting it in the same pass
+    
+    Args:
+        pdf_bytes (bytes): The unencrypted PDF
+        password (str): Password to encrypt with, or None to leave it unencrypted
+    
+    Returns:
+        bytes: The linearized PDF
+    """
+    return rewrite_pdf_bytes(pdf_bytes, password, linearize=True)
+
+def document_id(input_digest):
+    """16-byte PDF document ID derived from an input hash"""
+    return hashlib.sha256(f"cv-document-id:{input_digest}".encode()).digest()[:16]
+
+def qpdf_encryption(password):
+    """pikepdf encryption settings for a password (None if password is empty)"""
+    if not password:
+        return None
+    # Same scheme and permissions as PyPDF2's encrypt(): RC4 128-bit (R3), everything allowed,
+    # so decrypt_pdf and verify_pdf_password keep working without extra crypto dependencies
+    return pikepdf.Encryption(
+        owner=password, user=password, R=3, aes=False, metadata=False,
+        allow=pikepdf.Permissions(modify_assembly=True)
+    )
+
+def rewrite_pdf_bytes(pdf_bytes, password=None, linearize=False, input_digest=None):
+    """
+    Rewrite a PDF with qpdf: optionally encrypted, linearized and/or reproducible
+    
+    With input_digest, the document ID (which also keys the encryption) is
+    derived from it instead of the clock, and it is stored in the metadata as
+    /CVInputHash, so identical input gives identical bytes. The RC4 scheme
+    below has no random salt or IV, so the ID is its only source of randomness.
+    
+    Args:
+        pdf_bytes (bytes): The unencrypted PDF
+        password (str): Password to encrypt with, or None to leave it unencrypted
+        linearize (bool): Write a linearized ("fast web view") PDF
+        input_digest (str): Input hash (see cv_generator.input_hash)
+    
+    Returns:
+        bytes: The rewritten PDF
+    """
+    
+    try:
+        encryption = qpdf_encryption(password)
+        
+        with pikepdf.open(io.BytesIO(pdf_bytes)) as pdf:
+            if input_digest:
+                doc_id = pikepdf.String(document_id(input_digest))
+                pdf.trailer.ID = pikepdf.Array([doc_id, doc_id])
+                pdf.docinfo["/CVInputHash"] = input_digest
+            output = io.BytesIO()
+            # static_id keeps the preset first ID element and a constant second one
+            pdf.save(output, linearize=linearize, encryption=encryption, static_id=bool(input_digest))
+        return output.getvalue()
+        
+    except Exception as e:
+        raise Exception(f"Error rewriting PDF: {str(e)}")
+
+def reencrypt_pdf_bytes(pdf_bytes, old_password, new_password):
+    """
+    Change an encrypted PDF's password without re-rendering it
+    
+    Linearized files stay linearized, and reproducible ones (with /CVInputHash)
+    keep their document ID; the scheme is the same as rewrite_pdf_bytes.
+    
+    Args:
+        pdf_bytes (bytes): The PDF, encrypted with old_password
+        old_password (str): Its current password
+        new_password (str): The password to encrypt it with
+    
+    Returns:
+        bytes: The re-encrypted PDF
+    """
+    
+    try:
+        with pikepdf.open(io.BytesIO(pdf_bytes), password=old_password) as pdf:
+            output = io.BytesIO()
+            pdf.save(output, linearize=pdf.is_linearized, encryption=qpdf_encryption(new_password),
+                     static_id="/CVInputHash" in pdf.docinfo)
+        return output.getvalue()
+        
+    except Exception as e:
+        raise Exception(f"Error re-encrypting PDF: {str(e)}")
+
 def decrypt_pdf(input_path, password, output_path):
     """
     Decrypt a PDF file with a password
@@ -91,7 +223,7 @@ def verify_pdf_password(pdf_path, password):
     Verify if a password can decrypt a PDF
     
     Args:
-        pdf_path (str): Path to the PDF file
+        pdf_path (str or bytes): Path to the PDF file, or its contents
         password (str): Password to verify
     
     Returns:
@@ -99,7 +231,7 @@ def verify_pdf_password(pdf_path, password):
     """
     
     try:
-        with open(pdf_path, 'rb') as file:
+        with _open_pdf(pdf_path) as file:
             pdf_reader = PyPDF2.PdfReader(file)
             
             if pdf_reader.is_encrypted:
@@ -109,4 +241,9 @@ def verify_pdf_password(pdf_path, password):
                 
     except Exception as e:
         print(f"Error verifying PDF password: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def _open_pdf(pdf_path):
+    if isinstance(pdf_path, (bytes, bytearray)):
+        return io.BytesIO(pdf_path)
+    return open(pdf_path, 'rb')
@@ -0,0 +1,199 @@
+# utils/fonts.py
+"""
+TrueType fonts for non-Latin scripts (Tamil, Hindi, ...)
+
+The built-in Helvetica only covers Latin-1. A template can map scripts to TTF
+files; field values are split into runs by script and each non-Latin run is
+set in its script's font, so labels stay in Helvetica. Fonts are registered
+once per process and ReportLab embeds only the glyphs a document uses
+(subsets), not the whole font. Complex scripts are shaped with HarfBuzz
+(uharfbuzz) when it is installed.
+
+    "fonts": {
+      "dir": "fonts",
+      "scripts": {
+        "tamil": {"regular": "NotoSansTamil-Regular.ttf", "bold": "NotoSansTamil-Bold.ttf"},
+        "unicode": {"regular": "NotoSans-Regular.ttf"}
+      }
+    }
+
+"unicode" is the fallback for any other text Helvetica cannot show. It also
+sets the Latin text (labels, punctuation) of paragraphs that contain script
+runs: HarfBuzz can only shape TrueType faces, so such a paragraph must not mix
+in Helvetica. Without a "unicode" font the script's own font is used. Scripts
+whose font files are missing are skipped (their text falls back to Helvetica).
+"""
+import os
+import re
+import threading
+
+from reportlab.lib.fonts import ps2tt, tt2ps
+from reportlab.pdfbase import pdfmetrics, ttfonts
+from reportlab.pdfbase.ttfonts import TTFont
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT_RANGES = (
+    ("devanagari", 0x0900, 0x097F),
+    ("bengali", 0x0980, 0x09FF),
+    ("gurmukhi", 0x0A00, 0x0A7F),
+    ("gujarati", 0x0A80, 0x0AFF),
+    ("oriya", 0x0B00, 0x0B7F),
+    ("tamil", 0x0B80, 0x0BFF),
+    ("telugu", 0x0C00, 0x0C7F),
+    ("kannada", 0x0C80, 0x0CFF),
+    ("malayalam", 0x0D00, 0x0D7F),
+)
+FALLBACK_SCRIPT = "unicode"
+SHAPING_AVAILABLE = ttfonts.uharfbuzz is not None
+
+_FONT_TAG_RE = re.compile(r'<font name="([^"]+)">')
+_BOLD_SPAN_RE = re.compile(r"<b>.*?</b>", re.S)
+_registered = {}
+_register_lock = threading.Lock()
+
+
+# ---------------------
+# 🔤 Script Detection
+# ---------------------
+def char_script(ch):
+    """Script of one character: a name from SCRIPT_RANGES, "unicode", None (Latin-1) or "" (neutral)"""
+    if ch.isspace() or (ch.isascii() and not ch.isalpha()):
+        return ""
+    code = ord(ch)
+    for script, start, end in SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    try:
+        ch.encode("cp1252")
+        return None
+    except UnicodeEncodeError:
+        return FALLBACK_SCRIPT
+
+
+def script_runs(text):
+    """
+    Split text into (script, run) pairs; spaces, digits and punctuation join
+    the run they sit in, so "12, காந்தி Road" gives Latin / Tamil / Latin runs
+    """
+    runs = []
+    current, buffer = None, []
+    for ch in text:
+        script = char_script(ch)
+        if script == "" or script == current:
+            buffer.append(ch)
+            continue
+        if buffer:
+            runs.append((current, "".join(buffer)))
+        current, buffer = script, [ch]
+    if buffer:
+        runs.append((current, "".join(buffer)))
+    return runs
+
+
+def detect_scripts(text):
+    """Non-Latin scripts used in text"""
+    if text.isascii():
+        return set()
+    return {script for script, _ in script_runs(text) if script}
+
+
+# ---------------------
+# 📝 Registration
+# ---------------------
+def register_font_family(regular_path, bold_path=None):
+    """
+    Register a TTF (and optional bold face) once per process
+
+    Returns:
+        str: The registered font name (its bold face is mapped for <b>)
+    """
+    regular_path = os.path.abspath(regular_path)
+    bold_path = os.path.abspath(bold_path) if bold_path else regular_path
+    key = (regular_path, bold_path)
+    with _register_lock:
+        if key in _registered:
+            return _registered[key]
+
+        name = os.path.splitext(os.path.basename(regular_path))[0]
+        bold_name = os.path.splitext(os.path.basename(bold_path))[0]
+        pdfmetrics.registerFont(TTFont(name, regular_path))
+        if bold_name != name:
+            pdfmetrics.registerFont(TTFont(bold_name, bold_path))
+        pdfmetrics.registerFontFamily(name, normal=name, bold=bold_name, italic=name, boldItalic=bold_name)
+        _registered[key] = name
+        return name
+
+
+class FontSet:
+    """A template's script -> font mapping, with fonts registered"""
+
+    def __init__(self, spec=None, base_dir=PROJECT_ROOT):
+        spec = spec or {}
+        font_dir = os.path.join(base_dir, spec.get("dir", "fonts"))
+        self.fonts = {}
+        self.paths = {}
+        self.missing = []
+        for script, files in spec.get("scripts", {}).items():
+            if isinstance(files, str):
+                files = {"regular": files}
+            regular = os.path.join(font_dir, files["regular"])
+            bold = os.path.join(font_dir, files["bold"]) if files.get("bold") else None
+            if not os.path.isfile(regular) or (bold and not os.path.isfile(bold)):
+                self.missing.append(script)
+                continue
+            self.fonts[script] = register_font_family(regular, bold)
+            self.paths[script] = regular
+
+    def __bool__(self):
+        return bool(self.fonts)
+
+    def font_for(self, script):
+        return self.fonts.get(script) or self.fonts.get(FALLBACK_SCRIPT)
+
+    def markup(self, text):
+        """Wrap each non-Latin run of text in a <font> tag for its script"""
+        if text.isascii() or not self.fonts:
+            return text
+        parts = []
+        for script, run in script_runs(text):
+            font = self.font_for(script) if script else None
+            parts.append(f'<font name="{font}">{run}</font>' if font else run)
+        return "".join(parts)
+
+    def wrap_context(self, ctx):
+        """Apply markup() to every string value of a format context"""
+        if self.fonts:
+            for key, value in ctx.items():
+                if isinstance(value, str):
+                    ctx[key] = self.markup(value)
+        return ctx
+
+
+def embolden_font_tags(markup, everywhere=False):
+    """
+    Switch script font tags inside <b>...</b> (or everywhere, for bold styles)
+    to their bold face; an explicit <font name> otherwise resets bold
+    """
+    def bold_tags(text):
+        return _FONT_TAG_RE.sub(lambda m: f'<font name="{tt2ps(ps2tt(m.group(1))[0], 1, 0)}">', text)
+    if everywhere:
+        return bold_tags(markup)
+    return _BOLD_SPAN_RE.sub(lambda m: bold_tags(m.group(0)), markup)
+
+
+def first_font_tag(markup):
+    """Font name of the first <font name="..."> tag in markup, or None"""
+    match = _FONT_TAG_RE.search(markup)
+    return match.group(1) if match else None
+
+
+def only_truetype_fonts(markup):
+    """True if every <font name> in markup is a registered TTF (so HarfBuzz can shape it)"""
+    for name in _FONT_TAG_RE.findall(markup):
+        try:
+            if not isinstance(pdfmetrics.getFont(name), TTFont):
+                return False
+        except KeyError:
+            return False
+    return True
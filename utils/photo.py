@@ -0,0 +1,73 @@
+# utils/photo.py
+"""
+Candidate photos: decoded, cropped, resized and JPEG-recompressed once
+
+Phone camera uploads are several MB; the CV only needs a passport-size image.
+prepare_photo() turns an upload into a ~10-40 KB JPEG (cached by content hash,
+so reruns and re-renders don't redo the work). ReportLab embeds the prepared
+JPEG as-is (DCTDecode) as a single image object, without re-encoding it.
+"""
+import hashlib
+import io
+
+from PIL import Image, ImageOps
+from reportlab.lib.utils import ImageReader
+
+from utils.cache import LRUCache
+
+# ~270 dpi in the default template's 1.1 x 1.4 inch photo slot
+PHOTO_SIZE = (300, 380)
+JPEG_QUALITY = 80
+MAX_CACHED_PHOTOS = 64
+
+
+class PhotoError(Exception):
+    """The upload is not a usable image"""
+
+
+_prepared = LRUCache(MAX_CACHED_PHOTOS)
+
+
+def prepare_photo(image_bytes, size=PHOTO_SIZE, quality=JPEG_QUALITY):
+    """
+    Convert an uploaded image into a small portrait JPEG
+
+    Args:
+        image_bytes (bytes): The uploaded file (JPEG, PNG, WebP...)
+        size (tuple): Output size in pixels (width, height); the image is
+            center-cropped to this aspect ratio
+        quality (int): JPEG quality
+
+    Returns:
+        bytes: The recompressed JPEG
+
+    Raises:
+        PhotoError: The upload could not be decoded
+    """
+    key = (hashlib.sha256(image_bytes).hexdigest(), tuple(size), quality)
+    return _prepared.get_or_build(key, lambda: _recompress(image_bytes, size, quality))
+
+
+def _recompress(image_bytes, size, quality):
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # Let the JPEG decoder downscale while decoding (much faster for camera images)
+        image.draft("RGB", (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        # Crop slightly above center: faces sit in the upper half of most portraits
+        image = ImageOps.fit(image, size, Image.LANCZOS, centering=(0.5, 0.4))
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=quality, optimize=True)
+        return output.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise PhotoError(f"Could not read the photo: {e}") from e
+
+
+def photo_image(jpeg_bytes):
+    """
+    An ImageReader for a prepared photo
+
+    Cheap to create (only the JPEG header is parsed); a fresh reader per render
+    keeps concurrent renders from sharing one file position.
+    """
+    return ImageReader(io.BytesIO(jpeg_bytes))
@@ -0,0 +1,115 @@
+# utils/preview.py
+import hashlib
+import io
+import json
+import time
+
+import streamlit as st
+from reportlab.platypus import SimpleDocTemplate
+
+from utils.cache import LRUCache
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+
+DEFAULT_MAX_SECTIONS = 32
+DEFAULT_DEBOUNCE_SECONDS = 0.75
+
+
+def data_hash(value):
+    """Stable hash of CV data (dates and other non-JSON values are stringified)"""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def build_preview_story(plan, user_data, cache):
+    """
+    Build the platypus story, reusing cached flowables for unchanged sections
+    (keyed by template, section and a hash of that section's data)
+
+    Args:
+        plan (LayoutPlan): Compiled template plan
+        user_data (dict): CV data (may be an incomplete draft)
+        cache (LRUCache): Per-session section cache
+
+    Returns:
+        list: Flowables for the whole CV
+    """
+    story = []
+    for index, section in enumerate(plan.sections):
+        key = (plan.digest, section.get("id", index), data_hash(plan.section_inputs(section, user_data)))
+        flowables = cache.get_or_build(
+            key, lambda: plan.flowables(plan.section_items(section, user_data))
+        )
+        story.extend(flowables)
+    return story
+
+
+def render_preview_pdf(user_data, cache, template=DEFAULT_TEMPLATE):
+    """Render a preview PDF in memory; only sections whose data changed are rebuilt"""
+    plan = load_template(template)
+    buf = io.BytesIO()
+    SimpleDocTemplate(buf, **plan.doc_kwargs()).build(
+        build_preview_story(plan, user_data, cache), onFirstPage=plan.first_page(user_data)
+    )
+    return buf.getvalue()
+
+
+# ---------------------
+# 👀 Streamlit Live Preview
+# ---------------------
+def _session_cache(max_sections):
+    cache = st.session_state.get('preview_cache')
+    if cache is None or cache.max_entries != max_sections:
+        cache = LRUCache(max_sections)
+        st.session_state.preview_cache = cache
+    return cache
+
+
+def _refresh_preview(template, debounce_seconds, max_sections):
+    """Render the draft once it has been unchanged for debounce_seconds, then show it with a full run"""
+    if time.monotonic() - st.session_state.get('preview_changed_at', 0) < debounce_seconds:
+        return
+
+    draft = st.session_state.cv_draft
+    try:
+        st.session_state.preview_pdf = render_preview_pdf(draft, _session_cache(max_sections), template)
+        st.session_state.preview_error = None
+    except Exception as e:
+        st.session_state.preview_error = str(e)
+    # Marked rendered even on error, so polling stops until the draft changes again
+    st.session_state.preview_rendered_key = st.session_state.preview_draft_key
+    st.rerun()
+
+
+def show_live_preview(template=DEFAULT_TEMPLATE, debounce_seconds=DEFAULT_DEBOUNCE_SECONDS,
+                      max_sections=DEFAULT_MAX_SECTIONS):
+    """
+    Show a debounced live preview of the CV draft stored by collect_user_data
+
+    The PDF is shown with st.pdf (browsers block data-URL PDFs in iframes). It is
+    only polled for while the draft has changes that are not rendered yet, so an
+    unchanged preview is not sent to the browser again and again.
+
+    Args:
+        template (str): Template name or path
+        debounce_seconds (float): Quiet period before a changed draft is re-rendered
+        max_sections (int): Maximum cached sections per session
+    """
+    st.subheader("👀 Live Preview")
+    draft = st.session_state.get('cv_draft')
+    if not draft:
+        st.caption("Start filling in the form to see a preview.")
+        return
+
+    draft_key = data_hash(draft)
+    if draft_key != st.session_state.get('preview_draft_key'):
+        st.session_state.preview_draft_key = draft_key
+        st.session_state.preview_changed_at = time.monotonic()
+
+    if draft_key != st.session_state.get('preview_rendered_key'):
+        st.fragment(run_every=debounce_seconds)(_refresh_preview)(template, debounce_seconds, max_sections)
+
+    if st.session_state.get('preview_error'):
+        st.caption(f"Preview unavailable: {st.session_state.preview_error}")
+    pdf = st.session_state.get('preview_pdf')
+    if pdf:
+        st.pdf(pdf, height=800, key="cv_live_preview")
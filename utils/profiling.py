@@ -0,0 +1,162 @@
+# utils/profiling.py
+"""
+Opt-in profiling of slow CV renders
+
+Off unless configured in secrets.toml:
+
+    [profiling]
+    threshold_ms = 2000     # keep a sampled profile of every run slower than this
+    sample_every = 100      # also cProfile 1 in N runs in full (0 = never)
+    interval_ms = 5         # stack sampling interval
+    dir = "logs/profiles"
+
+While a threshold is set, a background thread samples the profiled thread's
+stack every interval_ms (cheap, unlike cProfile) and the samples are kept only
+if the run was slow: a collapsed-stack file, readable by flamegraph.pl or
+speedscope. 1-in-N runs are traced with cProfile instead (.pstats). Files are
+named after the record's shape (education path, certifications, employers):
+
+    logs/profiles/20261019-101500-render-10th-12th-UG_cert2_emp40-2350ms.collapsed
+
+Step 2 in app.py, render_job and every render are wrapped in profile(); only
+the outermost active profile() on a thread records. When profiling is off,
+profile() only checks one module attribute.
+"""
+import cProfile
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_PROFILE_DIR = os.path.join("logs", "profiles")
+DEFAULT_INTERVAL_MS = 5
+
+_settings = None
+_runs = itertools.count(1)
+_local = threading.local()
+
+
+def profile_settings(secrets):
+    """Profiling settings from Streamlit secrets (empty when not configured)"""
+    return dict(secrets.get("profiling", {}))
+
+
+def configure(settings):
+    """Enable profiling in this process with the given settings; empty or None disables it"""
+    global _settings
+    settings = dict(settings or {})
+    threshold_ms = float(settings.get("threshold_ms", 0))
+    sample_every = int(settings.get("sample_every", 0))
+    if not threshold_ms and not sample_every:
+        _settings = None
+        return
+    _settings = {
+        "threshold_ms": threshold_ms,
+        "sample_every": sample_every,
+        "interval": float(settings.get("interval_ms", DEFAULT_INTERVAL_MS)) / 1000,
+        "dir": settings.get("dir", DEFAULT_PROFILE_DIR),
+    }
+
+
+def record_shape(user_data):
+    """e.g. 10th-12th-UG_cert2_emp40: the parts of a record that drive layout cost"""
+    if not user_data:
+        return "no-record"
+    levels = "-".join(re.sub(r"[^\w]+", "", level.split(" (")[0]) for level in user_data.get("education") or {})
+    return (f"{levels or 'none'}_cert{len(user_data.get('certifications') or [])}"
+            f"_emp{len(user_data.get('work_experience') or [])}")
+
+
+# ---------------------
+# 🔥 Stack Sampler
+# ---------------------
+class _StackSampler(threading.Thread):
+    """Counts the target thread's stacks every interval seconds (collapsed-stack format)"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ---------------------
+# ⏱️ Hook
+# ---------------------
+@contextmanager
+def profile(label, user_data=None):
+    """
+    Profile the enclosed block if profiling is enabled (see module docstring)
+
+    Args:
+        label (str): Entry point, e.g. "step2" or "render"
+        user_data (dict): The record being processed; names the output file
+    """
+    settings = _settings
+    if settings is None or getattr(_local, "active", False):
+        yield
+        return
+
+    full = settings["sample_every"] and next(_runs) % settings["sample_every"] == 0
+    if not full and not settings["threshold_ms"]:
+        yield
+        return
+
+    _local.active = True
+    profiler = sampler = None
+    if full:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another thread is already being traced (Python 3.12+ allows one); sample instead
+            profiler = None
+    if not profiler:
+        sampler = _StackSampler(threading.get_ident(), settings["interval"])
+        sampler.start()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if profiler:
+            profiler.disable()
+        if sampler:
+            sampler.stop()
+        _local.active = False
+        try:
+            if profiler:
+                profiler.dump_stats(_output_path(settings["dir"], label, user_data, elapsed_ms, ".pstats"))
+            elif elapsed_ms >= settings["threshold_ms"] and sampler.stacks:
+                with open(_output_path(settings["dir"], label, user_data, elapsed_ms, ".collapsed"), "w") as f:
+                    f.writelines(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common())
+        except OSError as e:
+            # Never fail a CV because a profile could not be written
+            print(f"Could not save profile: {e}")
+
+
+def _output_path(profile_dir, label, user_data, elapsed_ms, ext):
+    os.makedirs(profile_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(profile_dir, f"{stamp}-{label}-{record_shape(user_data)}-{elapsed_ms:.0f}ms{ext}")
@@ -0,0 +1,270 @@
+# utils/render_pool.py
+"""
+Worker process pool for CV rendering and encryption
+
+ReportLab and PyPDF2 hold the GIL, so rendering on the Streamlit script thread
+stalls every other session in the process. Step 2 instead submits its job to a
+shared pool of warm worker processes and waits on the result (which releases
+the GIL). The pool accepts at most workers + max_queue jobs; beyond that
+submit() raises PoolBusy so the app can ask the operator to retry. A job that
+runs past the timeout has its worker processes terminated and replaced, so a
+stuck render cannot hold a worker and a slot for good. Configure in
+secrets.toml:
+
+    [render_pool]
+    workers = 2        # 0 renders on the script thread, as before
+    max_queue = 8
+    timeout = 60       # seconds per job
+
+Workers apply the [profiling] settings (see utils.profiling) to their jobs.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.cv_generator import render_cv_bytes, input_hash
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+from utils.encryption import encrypt_pdf_bytes, rewrite_pdf_bytes
+from utils.profiling import profile, configure as configure_profiling
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+DEFAULT_MAX_QUEUE = 8
+DEFAULT_TIMEOUT = 60
+
+
+class PoolBusy(Exception):
+    """The pool already holds as many jobs as it accepts"""
+
+    def __init__(self, queued):
+        super().__init__(f"{queued} CVs are already being generated or queued")
+        self.queued = queued
+
+
+class RenderTimeout(Exception):
+    """A job did not finish within the pool's timeout"""
+
+
+# ---------------------
+# ⚙️ Worker Side
+# ---------------------
+def render_job(user_data, template=DEFAULT_TEMPLATE, renderer="platypus", password=None,
+               linearize=False, deterministic=False):
+    """
+    Render (and optionally encrypt and linearize) one CV; runs inside a worker process
+
+    Returns:
+        dict: pdf (bytes), render_ms, encrypt_ms, input_hash (None unless deterministic)
+    """
+    with profile("render_job", user_data):
+        started = time.perf_counter()
+        digest = input_hash(user_data, template, renderer, linearize) if deterministic else None
+        pdf_bytes = render_cv_bytes(user_data, template, renderer, deterministic)
+        rendered = time.perf_counter()
+        if password:
+            pdf_bytes = encrypt_pdf_bytes(pdf_bytes, password, linearize, digest)
+        elif linearize or digest:
+            pdf_bytes = rewrite_pdf_bytes(pdf_bytes, None, linearize, digest)
+        encrypted = time.perf_counter()
+    return {
+        "pdf": pdf_bytes,
+        "render_ms": (rendered - started) * 1000,
+        "encrypt_ms": (encrypted - rendered) * 1000,
+        "input_hash": digest,
+    }
+
+
+def _warm_worker(template, profiling=None):
+    # Import ReportLab/PyPDF2 and compile the template before the first job arrives
+    load_template(template)
+    configure_profiling(profiling)
+
+
+def _ping():
+    return os.getpid()
+
+
+# ---------------------
+# 🏊 Pool
+# ---------------------
+class RenderPool:
+    """
+    Bounded pool of warm worker processes shared by all sessions
+
+    Args:
+        workers (int): Worker processes; 0 runs jobs inline on the caller's thread
+        max_queue (int): Jobs allowed to wait for a free worker
+        timeout (float): Seconds a job may take; then its workers are replaced
+        template (str): Template compiled in each worker at start-up
+        profiling (dict): [profiling] settings for the workers (see utils.profiling)
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 timeout=DEFAULT_TIMEOUT, template=DEFAULT_TEMPLATE, profiling=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.template = template
+        self.profiling = profiling
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+        # future -> (executor, job args), to recycle or resubmit a job
+        self._jobs = weakref.WeakKeyDictionary()
+        if workers:
+            self._start()
+
+    def _start(self):
+        # spawn, not fork: forking a threaded Streamlit server is unsafe
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(self.template, self.profiling)
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+
+    def _restart(self, old):
+        """Replace the executor unless another thread already did; returns the current one"""
+        with self._lock:
+            if self._executor is old and not self._closed:
+                self._start()
+            return self._executor
+
+    def in_flight(self):
+        """Jobs running or waiting"""
+        with self._lock:
+            return self._in_flight
+
+    def jobs_ahead(self, future):
+        """Approximate number of jobs queued ahead of a submitted one"""
+        if future.running() or future.done():
+            return 0
+        return max(0, self.in_flight() - self.workers)
+
+    def submit(self, user_data, renderer="platypus", password=None, linearize=False, deterministic=False):
+        """
+        Queue a render job
+
+        Returns:
+            concurrent.futures.Future: Resolves to render_job's result
+
+        Raises:
+            PoolBusy: The pool is full; try again shortly
+        """
+        job_args = (user_data, self.template, renderer, password, linearize, deterministic)
+        if not self.workers:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(render_job(*job_args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                raise PoolBusy(self._in_flight)
+            self._in_flight += 1
+        return self._submit_job(job_args)
+
+    def _submit_job(self, job_args):
+        # The caller has taken a slot; it is held until the job is done
+        executor = self._executor
+        try:
+            try:
+                future = executor.submit(render_job, *job_args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); replace the pool once
+                executor = self._restart(executor)
+                future = executor.submit(render_job, *job_args)
+        except Exception:
+            self._release()
+            raise
+        self._jobs[future] = (executor, job_args)
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def result(self, future, on_wait=None, poll_interval=0.5):
+        """
+        Wait for a job, reporting queue position while it waits
+
+        Args:
+            future: From submit()
+            on_wait (callable): Called with jobs_ahead(future) every poll_interval
+
+        Raises:
+            RenderTimeout: The job did not finish in time; if it was running, its
+                workers were terminated
+        """
+        deadline = time.monotonic() + self.timeout
+        resubmitted = False
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not future.cancel():
+                    self._recycle(future)
+                raise RenderTimeout(f"CV generation did not finish within {self.timeout:g} seconds")
+            if on_wait:
+                on_wait(self.jobs_ahead(future))
+            try:
+                return future.result(timeout=min(poll_interval, remaining))
+            except concurrent.futures.TimeoutError:
+                continue
+            except BrokenProcessPool:
+                # Its workers were terminated (another job timed out) or one died: run it once more
+                if resubmitted or future not in self._jobs:
+                    raise
+                resubmitted = True
+                future = self._resubmit(future)
+
+    def _recycle(self, future):
+        """Terminate the workers running a timed-out job and start fresh ones"""
+        executor, _ = self._jobs.get(future, (None, None))
+        if executor is None:
+            return
+        self._restart(executor)
+        # Jobs still on the old workers fail with BrokenProcessPool (which
+        # releases their slots); result() resubmits them to the new workers
+        _terminate(executor)
+
+    def _resubmit(self, future):
+        executor, job_args = self._jobs[future]
+        self._restart(executor)
+        with self._lock:
+            self._in_flight += 1
+        return self._submit_job(job_args)
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _terminate(executor):
+    """Stop an executor's worker processes now, including jobs still running"""
+    if hasattr(executor, "terminate_workers"):  # Python 3.14+
+        executor.terminate_workers()
+        return
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False)
+
+
+def pool_settings(secrets):
+    """Pool settings from Streamlit secrets"""
+    settings = dict(secrets.get("render_pool", {}))
+    return {
+        "workers": int(settings.get("workers", DEFAULT_WORKERS)),
+        "max_queue": int(settings.get("max_queue", DEFAULT_MAX_QUEUE)),
+        "timeout": float(settings.get("timeout", DEFAULT_TIMEOUT)),
+    }
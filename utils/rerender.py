@@ -0,0 +1,182 @@
+# utils/rerender.py
+"""
+Re-render stored CVs whose sidecar is out of date
+
+Run after changing a template or bumping LAYOUT_VERSION. Every sidecar in the
+storage folder is checked against the current template (see
+utils.sidecar.stale_reason); only stale CVs are re-rendered, in worker
+processes, and re-uploaded: PDF first, then the updated sidecar, so a crash in
+between leaves the CV marked stale. Finished CVs are appended to a checkpoint
+under checkpoints/ (one per template digest and layout version), so re-running
+the same command after an interruption skips them. CVs uploaded before
+sidecars existed are counted but cannot be re-rendered.
+
+Run from the project root, e.g.:
+    python -m utils.rerender --dry-run
+    python -m utils.rerender --password gbl --workers 4
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import os
+from collections import Counter
+
+import streamlit as st
+
+from utils.checkpoint import PathCheckpoint, CHECKPOINT_DIR
+from utils.cv_generator import LAYOUT_VERSION
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+from utils.profiling import profile_settings
+from utils.render_pool import RenderPool, pool_settings, DEFAULT_WORKERS, DEFAULT_TIMEOUT
+from utils.sidecar import build_sidecar, parse_sidecar, sidecar_filename, sidecar_key, stale_reason
+from utils.storage import create_backend, storage_settings, join_path
+
+
+# ---------------------
+# 💾 Checkpoint
+# ---------------------
+def default_checkpoint_path(template=DEFAULT_TEMPLATE, renderer="platypus"):
+    """Checkpoint file for re-rendering to the current template, layout and renderer"""
+    target = f"{template}|{load_template(template).digest}|{LAYOUT_VERSION}|{renderer}"
+    return os.path.join(CHECKPOINT_DIR, f"rerender-{hashlib.sha256(target.encode()).hexdigest()[:16]}.txt")
+
+
+# ---------------------
+# 🔄 Re-render
+# ---------------------
+def find_cvs(storage, folder):
+    """
+    Split a storage folder's CVs by whether they have a sidecar
+
+    Returns:
+        tuple: (PDF file names with a sidecar, number of PDFs without one)
+    """
+    names = set(storage.list(folder))
+    pdfs = sorted(name for name in names if name.lower().endswith(".pdf"))
+    with_sidecar = [name for name in pdfs if sidecar_filename(name) in names]
+    return with_sidecar, len(pdfs) - len(with_sidecar)
+
+
+def rerender_cv(storage, folder, pdf_name, key, template=DEFAULT_TEMPLATE, pool=None, password=None,
+                renderer="platypus", linearize=False, deterministic=False, force=False):
+    """
+    Re-render and re-upload one CV if its sidecar is stale
+
+    Args:
+        key (str): Sidecar key
+        pool (RenderPool): Renders the CV (built for template); None only checks (dry run)
+        force (bool): Re-render even if the sidecar is up to date
+
+    Returns:
+        str: The stale_reason ("forced" with force), or None if already up to date
+    """
+    sidecar = parse_sidecar(storage.get(join_path(folder, sidecar_filename(pdf_name))), key)
+    reason = stale_reason(sidecar, template) or ("forced" if force else None)
+    if reason is None or pool is None:
+        return reason
+
+    user_data = sidecar["user_data"]
+    result = pool.result(pool.submit(user_data, renderer, password, linearize, deterministic))
+    storage.put(folder, pdf_name, result["pdf"])
+    sidecar = build_sidecar(user_data, key, template, renderer, linearize, result["input_hash"])
+    storage.put(folder, sidecar_filename(pdf_name), sidecar)
+    return reason
+
+
+def rerender_folder(storage, folder, key, template=DEFAULT_TEMPLATE, renderer="platypus", password=None,
+                    workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, linearize=False, deterministic=False,
+                    checkpoint_path=None, dry_run=False, force=False, progress=None, profiling=None):
+    """
+    Bring every CV with a sidecar in a storage folder up to date with the template
+
+    Args:
+        key (str): Sidecar key
+        workers (int): Render worker processes (0 renders on the calling threads)
+        checkpoint_path (str): Resume file; None disables checkpointing
+        dry_run (bool): Only count stale CVs; nothing is rendered or uploaded
+        progress (callable): Called with (done, total) after each CV
+        profiling (dict): [profiling] settings for the render workers
+
+    Returns:
+        tuple: (Counter of outcomes: up_to_date, checkpointed, no_sidecar, failed
+            and one count per stale_reason; list of (file name, error) failures)
+    """
+    names, without_sidecar = find_cvs(storage, folder)
+    checkpoint = PathCheckpoint(None if dry_run else checkpoint_path)
+    todo = [name for name in names if join_path(folder, name) not in checkpoint.done]
+    counts = Counter(no_sidecar=without_sidecar, checkpointed=len(names) - len(todo))
+    failures = []
+
+    pool = None if dry_run else RenderPool(workers, max_queue=max(1, workers) * 2, timeout=timeout,
+                                           template=template, profiling=profiling)
+    # Threads overlap downloads/uploads with rendering; the pool bounds CPU use
+    threads = max(1, workers) * 2 if workers else 4
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = {
+                executor.submit(rerender_cv, storage, folder, name, key, template, pool, password, renderer,
+                                linearize, deterministic, force): name
+                for name in todo
+            }
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    reason = future.result()
+                    counts[reason or "up_to_date"] += 1
+                    checkpoint.add(join_path(folder, name))
+                except Exception as e:
+                    counts["failed"] += 1
+                    failures.append((name, str(e)))
+                if progress:
+                    progress(done, len(todo))
+    finally:
+        if pool:
+            pool.shutdown()
+    return counts, failures
+
+
+def main(argv=None):
+    cv_settings = st.secrets.get("cv", {})
+    parser = argparse.ArgumentParser(description="Re-render stored CVs whose sidecar is out of date")
+    parser.add_argument("--password", default=cv_settings.get("password"),
+                        help="PDF password for re-rendered CVs (defaults to [cv] password)")
+    parser.add_argument("--sidecar-key", default=sidecar_key(st.secrets),
+                        help="key the sidecars are encrypted with (defaults to [cv] sidecar_key)")
+    parser.add_argument("--template", default=cv_settings.get("template", DEFAULT_TEMPLATE))
+    parser.add_argument("--renderer", default=cv_settings.get("renderer", "platypus"))
+    parser.add_argument("--workers", type=int, default=pool_settings(st.secrets)["workers"])
+    parser.add_argument("--checkpoint", help="Resume file (default: one per template version under checkpoints/)")
+    parser.add_argument("--dry-run", action="store_true", help="only count CVs that need re-rendering")
+    parser.add_argument("--force", action="store_true", help="re-render every CV with a sidecar")
+    args = parser.parse_args(argv)
+    if not args.dry_run and not args.password:
+        parser.error("--password (or [cv] password in secrets.toml) is required unless --dry-run is given")
+    if not args.sidecar_key:
+        parser.error("--sidecar-key (or [cv] sidecar_key in secrets.toml) is required")
+
+    settings = storage_settings(st.secrets)
+    counts, failures = rerender_folder(
+        create_backend(settings), settings["folder"], args.sidecar_key, args.template, args.renderer, args.password,
+        workers=args.workers,
+        linearize=cv_settings.get("linearize", False),
+        deterministic=cv_settings.get("deterministic", False),
+        checkpoint_path=args.checkpoint or default_checkpoint_path(args.template, args.renderer),
+        dry_run=args.dry_run,
+        force=args.force,
+        profiling=profile_settings(st.secrets),
+        progress=lambda done, total: print(f"\r{done}/{total} CVs", end="", flush=True)
+    )
+    print()
+    stale = sum(n for key, n in counts.items() if key not in ("up_to_date", "checkpointed", "no_sidecar", "failed"))
+    print(f"{'Stale' if args.dry_run else 'Re-rendered'}: {stale} "
+          f"({', '.join(f'{k} {n}' for k, n in sorted(counts.items()) if k in ('layout', 'template', 'input', 'forced'))})")
+    print(f"Up to date: {counts['up_to_date']}, already done (checkpoint): {counts['checkpointed']}, "
+          f"without sidecar: {counts['no_sidecar']}, failed: {counts['failed']}")
+    for name, error in failures[:20]:
+        print(f"  {name}: {error}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
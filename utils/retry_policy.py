@@ -0,0 +1,206 @@
+# utils/retry_policy.py
+"""
+Shared retry policy and rate limiter for Dropbox traffic
+
+Every Dropbox request in the process goes through one token bucket, so
+concurrent sessions share the app's quota instead of bursting into 429s.
+Transient failures (rate limits, 5xx, connection errors) are retried with
+jittered exponential backoff; a rate-limit response's retry_after pauses the
+whole bucket, not just the caller that hit it.
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+import streamlit as st
+from dropbox.exceptions import RateLimitError, InternalServerError, HttpError
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_BURST = 20
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_RATE_LIMIT_BACKOFF = 5.0
+
+
+# ---------------------
+# 🪣 Token Bucket
+# ---------------------
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds` (e.g. a server-sent retry_after)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+# ---------------------
+# 📊 Retry Stats
+# ---------------------
+class RetryStats:
+    """Process-wide counters of requests, retries and give-ups"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, key, by=1):
+        with self._lock:
+            self._counts[key] += by
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+retry_stats = RetryStats()
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def _settings():
+    try:
+        return st.secrets.get("dropbox", {})
+    except Exception:
+        return {}
+
+
+def get_rate_limiter():
+    """The process-wide Dropbox token bucket (rate configurable in secrets)"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            settings = _settings()
+            _limiter = TokenBucket(
+                settings.get("requests_per_second", DEFAULT_REQUESTS_PER_SECOND),
+                settings.get("burst", DEFAULT_BURST)
+            )
+        return _limiter
+
+
+def get_retry_stats():
+    """Counts of Dropbox requests, retries by reason, and requests that gave up"""
+    return retry_stats.snapshot()
+
+
+def retry_summary(stats=None):
+    """
+    One line for operators, e.g. "Dropbox since start: 40 requests · 3 retries (2 rate-limited) · 0 gave up"
+
+    Returns:
+        str: The summary, or None before the first Dropbox request
+    """
+    stats = get_retry_stats() if stats is None else stats
+    if not stats.get("requests"):
+        return None
+    return (f"Dropbox since start: {stats['requests']} requests · {stats.get('retries', 0)} retries "
+            f"({stats.get('retries.rate_limited', 0)} rate-limited) · {stats.get('gave_up', 0)} gave up")
+
+
+# ---------------------
+# 🔁 Retry Policy
+# ---------------------
+def is_transient(exc):
+    """Errors worth retrying: rate limits, 5xx, connection problems"""
+    if isinstance(exc, (RateLimitError, InternalServerError)):
+        return True
+    if isinstance(exc, HttpError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _retry_after(exc):
+    if isinstance(exc, RateLimitError):
+        return exc.backoff if exc.backoff is not None else DEFAULT_RATE_LIMIT_BACKOFF
+    if isinstance(exc, requests.HTTPError) and exc.response is not None and exc.response.status_code == 429:
+        try:
+            return float(exc.response.headers.get("Retry-After", DEFAULT_RATE_LIMIT_BACKOFF))
+        except ValueError:
+            return DEFAULT_RATE_LIMIT_BACKOFF
+    return None
+
+
+class _Wait:
+    """Honor retry_after when the server sends one, else jittered exponential backoff"""
+
+    def __init__(self):
+        self._exponential = wait_random_exponential(multiplier=0.5, max=30)
+
+    def __call__(self, retry_state):
+        exc = retry_state.outcome.exception()
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            # Everyone waits, so the bucket doesn't keep feeding the limit
+            get_rate_limiter().pause(retry_after)
+            return retry_after + random.uniform(0, 0.25 * retry_after)
+        return self._exponential(retry_state)
+
+
+def _before_sleep(retry_state):
+    exc = retry_state.outcome.exception()
+    reason = "rate_limited" if _retry_after(exc) is not None else "transient_error"
+    retry_stats.incr("retries")
+    retry_stats.incr(f"retries.{reason}")
+
+
+def call_with_retry(fn, *args, rewind=None, **kwargs):
+    """
+    Call fn under the shared rate limiter, retrying transient Dropbox errors
+
+    Args:
+        fn (callable): The call to make
+        rewind (callable): Optional hook run before each retry (e.g. seek a payload back)
+
+    Returns:
+        The result of fn
+    """
+    max_attempts = _settings().get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+    retrying = Retrying(
+        retry=retry_if_exception(is_transient),
+        wait=_Wait(),
+        stop=stop_after_attempt(max_attempts),
+        before_sleep=_before_sleep,
+        reraise=True,
+    )
+    limiter = get_rate_limiter()
+    retry_stats.incr("requests")
+    try:
+        for attempt in retrying:
+            with attempt:
+                if attempt.retry_state.attempt_number > 1 and rewind:
+                    rewind()
+                limiter.acquire()
+                return fn(*args, **kwargs)
+    except Exception as e:
+        if is_transient(e):
+            retry_stats.incr("gave_up")
+        raise
@@ -0,0 +1,162 @@
+# utils/rotate_password.py
+"""
+Re-encrypt every stored CV with a new password, without re-rendering
+
+For each PDF in the storage folder: download it with its revision, check the
+old password with verify_pdf_password, re-encrypt it with qpdf and write it
+back only if it has not changed since it was read (on Dropbox,
+WriteMode.update(rev)). The password check is pure-Python RC4 and holds the
+GIL, so checking and re-encrypting run in a pool of worker processes while
+threads download and upload. CVs that already open with the new password are
+skipped, so the job is safe to re-run. Finished paths are appended to a
+checkpoint, which is deleted once a run completes without failures.
+
+Set the new password in secrets.toml first, so CVs generated during the
+rotation already use it:
+
+    [cv]
+    password = "new-password"
+
+Then, from the project root:
+    python -m utils.rotate_password --old gbl --new new-password --workers 8
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+from collections import Counter
+
+import streamlit as st
+
+from utils.checkpoint import PathCheckpoint, CHECKPOINT_DIR
+from utils.encryption import verify_pdf_password, reencrypt_pdf_bytes
+from utils.storage import create_backend, storage_settings, join_path, StorageConflict
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+DEFAULT_CHECKPOINT = os.path.join(CHECKPOINT_DIR, "rotate-password.txt")
+CONFLICT_RETRIES = 1
+
+
+def rotate_pdf_bytes(pdf_bytes, old_password, new_password):
+    """
+    Check the old password and re-encrypt; CPU-bound, so it runs in a worker process
+
+    Returns:
+        tuple: (outcome as in rotate_cv, re-encrypted bytes or None)
+    """
+    if not verify_pdf_password(pdf_bytes, old_password):
+        return ("already" if verify_pdf_password(pdf_bytes, new_password) else "wrong_password"), None
+    return "rotated", reencrypt_pdf_bytes(pdf_bytes, old_password, new_password)
+
+
+def rotate_cv(storage, path, old_password, new_password, executor=None):
+    """
+    Re-encrypt one stored CV
+
+    Args:
+        executor: Process pool for rotate_pdf_bytes; None runs it on this thread
+
+    Returns:
+        str: "rotated", "already" (it opens with the new password) or
+            "wrong_password" (it opens with neither)
+
+    Raises:
+        StorageError: Download or upload failed, or the file kept changing
+    """
+    for attempt in range(CONFLICT_RETRIES + 1):
+        data, rev = storage.get_versioned(path)
+        if executor:
+            outcome, rotated = executor.submit(rotate_pdf_bytes, data, old_password, new_password).result()
+        else:
+            outcome, rotated = rotate_pdf_bytes(data, old_password, new_password)
+        if rotated is None:
+            return outcome
+        try:
+            storage.put_if_unchanged(path, rotated, rev)
+            return outcome
+        except StorageConflict:
+            # Regenerated while we worked on it; look at the new version
+            if attempt == CONFLICT_RETRIES:
+                raise
+
+
+def rotate_folder(storage, folder, old_password, new_password, workers=DEFAULT_WORKERS,
+                  checkpoint_path=DEFAULT_CHECKPOINT, progress=None):
+    """
+    Rotate the password of every PDF in a storage folder
+
+    Args:
+        workers (int): Worker processes (0 checks and re-encrypts on the I/O threads)
+        checkpoint_path (str): Resume file; None disables checkpointing
+        progress (callable): Called with (done, total) after each CV
+
+    Returns:
+        tuple: (Counter of rotated, already, wrong_password, checkpointed and
+            failed; list of (file name, error) for wrong passwords and failures)
+    """
+    names = sorted(name for name in storage.list(folder) if name.lower().endswith(".pdf"))
+    checkpoint = PathCheckpoint(checkpoint_path)
+    todo = [name for name in names if join_path(folder, name) not in checkpoint.done]
+    counts = Counter(checkpointed=len(names) - len(todo))
+    problems = []
+
+    # spawn, not fork, as in render_pool; two I/O threads per worker keep the workers busy
+    processes = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) if workers else None
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers) * 2) as executor:
+            futures = {
+                executor.submit(rotate_cv, storage, join_path(folder, name), old_password, new_password, processes): name
+                for name in todo
+            }
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    outcome = future.result()
+                    counts[outcome] += 1
+                    if outcome == "wrong_password":
+                        problems.append((name, "opens with neither the old nor the new password"))
+                    else:
+                        checkpoint.add(join_path(folder, name))
+                except Exception as e:
+                    counts["failed"] += 1
+                    problems.append((name, str(e)))
+                if progress:
+                    progress(done, len(todo))
+    finally:
+        if processes:
+            processes.shutdown(cancel_futures=True)
+
+    if not problems:
+        checkpoint.remove()
+    return counts, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encrypt every stored CV with a new password")
+    parser.add_argument("--old", required=True, help="current password")
+    parser.add_argument("--new", required=True, help="new password")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="resume file")
+    args = parser.parse_args(argv)
+    if args.old == args.new:
+        parser.error("--old and --new are the same")
+
+    settings = storage_settings(st.secrets)
+    counts, problems = rotate_folder(
+        create_backend(settings), settings["folder"], args.old, args.new, args.workers, args.checkpoint,
+        progress=lambda done, total: print(f"\r{done}/{total} CVs", end="", flush=True)
+    )
+    print()
+    print(f"Rotated: {counts['rotated']}, already on the new password: {counts['already']}, "
+          f"already done (checkpoint): {counts['checkpointed']}, "
+          f"wrong password: {counts['wrong_password']}, failed: {counts['failed']}")
+    for name, error in problems[:20]:
+        print(f"  {name}: {error}")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# utils/sidecar.py
+"""
+Encrypted sidecars stored next to each uploaded CV
+
+Ravi-Kumar-9876543210.pdf is accompanied by Ravi-Kumar-9876543210.cvdata, which
+holds the exact input the PDF was rendered from and what it was rendered with:
+
+    {"input_hash": "...", "layout_version": 1, "rendered_at": "2026-10-19T10:30:00",
+     "linearize": false, "renderer": "platypus", "schema": 1,
+     "template": {"digest": "...", "name": "default", "version": 1},
+     "user_data": {...}}
+
+Keys are sorted and user_data is encoded as in canonical_json() (ISO dates,
+base64 photo), so the same input always gives the same user_data text.
+utils.rerender uses sidecars to re-render CVs after a template change.
+
+The JSON holds raw candidate data, so it is sealed as an attachment in an
+AES-256 encrypted PDF (qpdf, no extra crypto dependency) keyed by a secret
+that is not the CV password:
+
+    [cv]
+    sidecar_key = "long random string"
+
+Without a key no sidecars are written, and those CVs cannot be re-rendered.
+"""
+import base64
+import io
+import json
+from datetime import date, datetime
+
+import pikepdf
+
+from utils.cv_generator import canonical_json, input_hash, LAYOUT_VERSION
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+
+SIDECAR_SCHEMA = 1
+SIDECAR_EXTENSION = ".cvdata"
+SIDECAR_ATTACHMENT = "sidecar.json"
+DATE_FIELDS = ("dob", "start_date", "end_date", "collected_on")
+BYTES_FIELDS = ("photo",)
+
+
+def sidecar_filename(pdf_filename):
+    """Sidecar name for a CV file name, e.g. Ravi-Kumar-9876543210.cvdata"""
+    stem = pdf_filename[:-4] if pdf_filename.lower().endswith(".pdf") else pdf_filename
+    return stem + SIDECAR_EXTENSION
+
+
+def sidecar_key(secrets):
+    """The [cv] sidecar_key secret, or None if sidecars are switched off"""
+    return secrets.get("cv", {}).get("sidecar_key") or None
+
+
+def build_sidecar(user_data, key, template=DEFAULT_TEMPLATE, renderer="platypus", linearize=False, digest=None):
+    """
+    Serialize and encrypt the sidecar for a rendered CV
+
+    Args:
+        user_data (dict): CV data the PDF was rendered from
+        key (str): Sidecar key (from sidecar_key())
+        template (str): Template name or path
+        renderer (str): Renderer used
+        linearize (bool): Whether the PDF was linearized
+        digest (str): input_hash() if already computed (deterministic mode)
+
+    Returns:
+        bytes: The sealed sidecar
+    """
+    plan = load_template(template)
+    sidecar = {
+        "schema": SIDECAR_SCHEMA,
+        "layout_version": LAYOUT_VERSION,
+        "template": {"name": template, "version": plan.version, "digest": plan.digest},
+        "renderer": renderer,
+        "linearize": linearize,
+        "input_hash": digest or input_hash(user_data, template, renderer, linearize),
+        "rendered_at": datetime.now().isoformat(timespec="seconds"),
+        "user_data": json.loads(canonical_json(user_data)),
+    }
+    return _seal(json.dumps(sidecar, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), key)
+
+
+def parse_sidecar(data, key):
+    """
+    Decrypt and load a sidecar, restoring user_data to what collect_user_data
+    returns (date objects, photo bytes)
+
+    Raises:
+        ValueError: Wrong key, not a sidecar, or written by a newer schema
+    """
+    sidecar = json.loads(_unseal(data, key))
+    if not isinstance(sidecar, dict) or "user_data" not in sidecar:
+        raise ValueError("Not a CV sidecar")
+    if sidecar.get("schema", 0) > SIDECAR_SCHEMA:
+        raise ValueError(f"Sidecar schema {sidecar['schema']} is newer than supported ({SIDECAR_SCHEMA})")
+    sidecar["user_data"] = _restore(sidecar["user_data"])
+    return sidecar
+
+
+def _seal(payload, key):
+    if not key:
+        raise ValueError("A sidecar key is required ([cv] sidecar_key)")
+    with pikepdf.new() as pdf:
+        pdf.attachments[SIDECAR_ATTACHMENT] = pikepdf.AttachedFileSpec(pdf, payload, mime_type="application/json")
+        out = io.BytesIO()
+        pdf.save(out, encryption=pikepdf.Encryption(owner=key, user=key, R=6))
+    return out.getvalue()
+
+
+def _unseal(data, key):
+    try:
+        with pikepdf.open(io.BytesIO(data), password=key or "") as pdf:
+            return pdf.attachments[SIDECAR_ATTACHMENT].get_file().read_bytes()
+    except pikepdf.PasswordError:
+        raise ValueError("Wrong sidecar key") from None
+    except (pikepdf.PdfError, KeyError):
+        raise ValueError("Not a CV sidecar") from None
+
+
+def _restore(value, key=None):
+    if isinstance(value, dict):
+        return {k: _restore(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore(item) for item in value]
+    if isinstance(value, str) and key in DATE_FIELDS:
+        return date.fromisoformat(value)
+    if isinstance(value, str) and key in BYTES_FIELDS:
+        return base64.b64decode(value)
+    return value
+
+
+def stale_reason(sidecar, template=DEFAULT_TEMPLATE):
+    """
+    Why a CV needs re-rendering with the current template, or None if it is up to date
+
+    Returns:
+        str: "layout", "template" or "input" (user_data no longer matches input_hash)
+    """
+    plan = load_template(template)
+    if sidecar.get("layout_version") != LAYOUT_VERSION:
+        return "layout"
+    stored = sidecar.get("template", {})
+    if stored.get("digest") != plan.digest or stored.get("version") != plan.version:
+        return "template"
+    digest = input_hash(sidecar["user_data"], template, sidecar.get("renderer", "platypus"),
+                        sidecar.get("linearize", False))
+    if sidecar.get("input_hash") != digest:
+        return "input"
+    return None
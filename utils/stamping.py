@@ -0,0 +1,165 @@
+# utils/stamping.py
+"""
+Per-recipient watermarks ("Submitted to Acme Ltd · 2026-10-19") on one CV
+
+Rendering and encrypting the CV again for every employer repeats the
+expensive part. Instead the CV is rendered once, unencrypted, and cached by
+its input hash; each recipient's watermark is drawn once into a one-page
+overlay PDF and cached by its text. A stamped copy is then a qpdf merge of
+the two (one shared form XObject per copy) plus encryption.
+
+Copies of a stored CV (rendered from its encrypted sidecar), from the project root:
+
+    python -m utils.stamping Ravi-Kumar-9876543210.pdf --to "Acme Ltd" "Globex" --password gbl --output-dir stamped
+"""
+import argparse
+import io
+import math
+import os
+import re
+from datetime import date
+
+import pikepdf
+import streamlit as st
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from utils.cache import LRUCache
+from utils.cv_generator import render_cv_bytes, input_hash
+from utils.cv_template import load_template, DEFAULT_TEMPLATE
+from utils.encryption import qpdf_encryption
+from utils.sidecar import parse_sidecar, sidecar_filename, sidecar_key
+from utils.storage import create_backend, storage_settings, join_path
+
+MAX_CACHED_BASES = 32
+MAX_CACHED_OVERLAYS = 256
+WATERMARK_FONT = "Helvetica-Bold"
+WATERMARK_MAX_SIZE = 40
+WATERMARK_ALPHA = 0.15
+
+_bases = LRUCache(MAX_CACHED_BASES)
+_overlays = LRUCache(MAX_CACHED_OVERLAYS)
+
+
+def watermark_text(recipient, on=None):
+    return f"Submitted to {recipient} · {(on or date.today()).isoformat()}"
+
+
+# ---------------------
+# 🗂️ Cached Parts
+# ---------------------
+def base_pdf(user_data, template=DEFAULT_TEMPLATE, renderer="platypus"):
+    """The unencrypted CV, rendered once per input"""
+    key = input_hash(user_data, template, renderer)
+    return _bases.get_or_build(key, lambda: render_cv_bytes(user_data, template, renderer))
+
+
+def overlay_pdf(text, pagesize):
+    """A one-page PDF holding only the watermark, drawn once per text and page size"""
+    key = (text, tuple(pagesize))
+    return _overlays.get_or_build(key, lambda: _draw_overlay(text, pagesize))
+
+
+def _draw_overlay(text, pagesize):
+    width, height = pagesize
+    buf = io.BytesIO()
+    canv = canvas.Canvas(buf, pagesize=pagesize)
+
+    # Large and faint across the diagonal, sized to fit it
+    diagonal = (width ** 2 + height ** 2) ** 0.5
+    size = min(WATERMARK_MAX_SIZE, 0.7 * diagonal / stringWidth(text, WATERMARK_FONT, 1))
+    canv.saveState()
+    canv.setFillColor(colors.grey)
+    canv.setFillAlpha(WATERMARK_ALPHA)
+    canv.translate(width / 2, height / 2)
+    canv.rotate(math.degrees(math.atan2(height, width)))
+    canv.setFont(WATERMARK_FONT, size)
+    canv.drawCentredString(0, -size / 3, text)
+    canv.restoreState()
+
+    # And legible in the bottom margin
+    canv.setFillColor(colors.grey)
+    canv.setFont("Helvetica", 8)
+    canv.drawCentredString(width / 2, 20, text)
+    canv.showPage()
+    canv.save()
+    return buf.getvalue()
+
+
+# ---------------------
+# 🏷️ Stamping
+# ---------------------
+def stamp(base_bytes, overlay_bytes, password=None):
+    """
+    Overlay page 1 of overlay_bytes on every page of base_bytes, then encrypt
+
+    Returns:
+        bytes: The stamped PDF
+    """
+    with pikepdf.open(io.BytesIO(base_bytes)) as pdf, pikepdf.open(io.BytesIO(overlay_bytes)) as overlay:
+        mark = pdf.copy_foreign(overlay.pages[0].as_form_xobject())
+        for page in pdf.pages:
+            page.add_overlay(mark)
+        output = io.BytesIO()
+        pdf.save(output, encryption=qpdf_encryption(password) or False)
+    return output.getvalue()
+
+
+def stamp_copies(user_data, recipients, password=None, template=DEFAULT_TEMPLATE, renderer="platypus", on=None):
+    """
+    One watermarked, encrypted copy of a CV per recipient
+
+    Args:
+        user_data (dict): CV data
+        recipients (list): Employer names
+        password (str): Password for every copy
+        on (date): Date shown in the watermark (today by default)
+
+    Returns:
+        list: (recipient, PDF bytes) pairs
+    """
+    base = base_pdf(user_data, template, renderer)
+    pagesize = load_template(template).pagesize
+    return [
+        (recipient, stamp(base, overlay_pdf(watermark_text(recipient, on), pagesize), password))
+        for recipient in recipients
+    ]
+
+
+def copy_filename(pdf_filename, recipient):
+    """e.g. Ravi-Kumar-9876543210-Acme-Ltd.pdf"""
+    slug = re.sub(r"[^\w]+", "-", recipient).strip("-")
+    return f"{os.path.splitext(pdf_filename)[0]}-{slug}.pdf"
+
+
+def main(argv=None):
+    cv_settings = st.secrets.get("cv", {})
+    parser = argparse.ArgumentParser(description="Watermarked copies of a stored CV, one per recipient")
+    parser.add_argument("cv", help="file name of the CV in the storage folder (it needs a sidecar)")
+    parser.add_argument("--to", nargs="+", required=True, metavar="RECIPIENT", help="employer names")
+    parser.add_argument("--password", required=True, help="password for the copies")
+    parser.add_argument("--output-dir", default="stamped")
+    parser.add_argument("--sidecar-key", default=sidecar_key(st.secrets),
+                        help="key the sidecars are encrypted with (defaults to [cv] sidecar_key)")
+    parser.add_argument("--template", default=cv_settings.get("template", DEFAULT_TEMPLATE))
+    parser.add_argument("--renderer", default=cv_settings.get("renderer", "platypus"))
+    args = parser.parse_args(argv)
+    if not args.sidecar_key:
+        parser.error("--sidecar-key (or [cv] sidecar_key in secrets.toml) is required")
+
+    settings = storage_settings(st.secrets)
+    storage = create_backend(settings)
+    sidecar = parse_sidecar(storage.get(join_path(settings["folder"], sidecar_filename(args.cv))), args.sidecar_key)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for recipient, pdf_bytes in stamp_copies(sidecar["user_data"], args.to, args.password,
+                                             args.template, args.renderer):
+        path = os.path.join(args.output_dir, copy_filename(args.cv, recipient))
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
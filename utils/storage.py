@@ -0,0 +1,376 @@
+# utils/storage.py
+"""
+Storage backends for generated CVs
+
+The app talks to a StorageBackend instead of Dropbox directly, so the whole
+pipeline can run offline (local filesystem) or be load-tested against an
+in-memory fake with injected latency and failures. Pick one in secrets.toml:
+
+    [storage]
+    backend = "dropbox"     # or "local" / "memory"
+    folder = "/CVs"
+    root = "storage"        # local backend only
+    latency = 0.05          # memory backend only (seconds, or [min, max])
+    failure_rate = 0.01     # memory backend only
+"""
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import dropbox
+from dropbox.exceptions import ApiError
+
+from utils.dropbox_handler import create_dbx_client, dropbox_credentials, iter_folder_files, download_bytes
+
+
+class StorageError(Exception):
+    """A storage operation failed"""
+
+
+class StorageConflict(StorageError):
+    """The file changed since it was read, so a conditional write was refused"""
+
+
+def join_path(folder, filename):
+    """Normalize a folder + filename into an absolute, '/'-separated storage path"""
+    folder = "/" + folder.strip("/") if folder.strip("/") else ""
+    return f"{folder}/{filename}"
+
+
+class StorageBackend(ABC):
+    """Interface every backend implements; paths are '/'-separated and absolute"""
+
+    name = "storage"
+
+    @abstractmethod
+    def put(self, folder, filename, data):
+        """Store bytes, overwriting any existing file; returns the stored path"""
+
+    @abstractmethod
+    def get(self, path):
+        """Contents of the file at path; raises StorageError if it cannot be read"""
+
+    @abstractmethod
+    def get_versioned(self, path):
+        """(contents, rev) of the file at path; rev identifies this version of the file"""
+
+    @abstractmethod
+    def put_if_unchanged(self, path, data, rev):
+        """Overwrite the file at path only if it is still at rev; raises StorageConflict otherwise"""
+
+    @abstractmethod
+    def list(self, folder):
+        """Names of the files directly inside folder"""
+
+    @abstractmethod
+    def exists(self, folder, filename):
+        """True if folder/filename exists"""
+
+    @abstractmethod
+    def link(self, path):
+        """A URL for downloading the file at path, or None"""
+
+    @abstractmethod
+    def health(self):
+        """True if the backend is reachable and usable"""
+
+
+# ---------------------
+# ☁️ Dropbox
+# ---------------------
+class DropboxBackend(StorageBackend):
+    """
+    Args:
+        credentials (dict): refresh_token, client_id and client_secret (see dropbox_credentials)
+        client_factory (callable): Returns a Dropbox client; overrides credentials (e.g. in load tests)
+    """
+
+    name = "Dropbox"
+
+    def __init__(self, credentials=None, client_factory=None):
+        self._client_factory = client_factory or (lambda: create_dbx_client(credentials or {}))
+
+    def _dbx(self):
+        # Raised as a StorageError on any thread; no st.error()/st.stop() on the way
+        try:
+            return self._client_factory()
+        except Exception as e:
+            raise StorageError(f"Dropbox authentication failed: {e}") from e
+
+    def put(self, folder, filename, data):
+        path = join_path(folder, filename)
+        dbx = self._dbx()
+        try:
+            dbx.files_upload(data, path, mode=dropbox.files.WriteMode.overwrite)
+        except Exception as e:
+            raise StorageError(f"Upload failed: {e}") from e
+        return path
+
+    def get(self, path):
+        dbx = self._dbx()
+        try:
+            return download_bytes(path, dbx)
+        except Exception as e:
+            raise StorageError(f"Download failed: {e}") from e
+
+    def get_versioned(self, path):
+        dbx = self._dbx()
+        try:
+            metadata, response = dbx.files_download(path)
+            return response.content, metadata.rev
+        except Exception as e:
+            raise StorageError(f"Download failed: {e}") from e
+
+    def put_if_unchanged(self, path, data, rev):
+        dbx = self._dbx()
+        try:
+            dbx.files_upload(data, path, mode=dropbox.files.WriteMode.update(rev))
+        except ApiError as e:
+            if e.error.is_path() and e.error.get_path().reason.is_conflict():
+                raise StorageConflict(f"{path} changed since it was read") from e
+            raise StorageError(f"Upload failed: {e}") from e
+        except Exception as e:
+            raise StorageError(f"Upload failed: {e}") from e
+        return path
+
+    def list(self, folder):
+        dbx = self._dbx()
+        try:
+            return [entry.name for entry in iter_folder_files(join_path(folder, "").rstrip("/"), dbx)]
+        except Exception as e:
+            raise StorageError(f"Error listing files: {e}") from e
+
+    def exists(self, folder, filename):
+        dbx = self._dbx()
+        try:
+            dbx.files_get_metadata(join_path(folder, filename))
+            return True
+        except ApiError as e:
+            if e.error.is_path() and e.error.get_path().is_not_found():
+                return False
+            raise StorageError(f"Error checking file: {e}") from e
+        except Exception as e:
+            raise StorageError(f"Error checking file: {e}") from e
+
+    def link(self, path):
+        dbx = self._dbx()
+        try:
+            return dbx.files_get_temporary_link(path).link
+        except Exception as e:
+            raise StorageError(f"Error getting download link: {e}") from e
+
+    def health(self):
+        try:
+            self._dbx().users_get_current_account()
+            return True
+        except Exception:
+            return False
+
+
+# ---------------------
+# 💽 Local Filesystem
+# ---------------------
+class LocalFilesystemBackend(StorageBackend):
+    name = "local storage"
+
+    def __init__(self, root="storage"):
+        self.root = os.path.abspath(root)
+
+    def _local_path(self, path):
+        return os.path.join(self.root, *path.strip("/").split("/"))
+
+    def put(self, folder, filename, data):
+        path = join_path(folder, filename)
+        local_path = self._local_path(path)
+        try:
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            tmp_path = local_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, local_path)
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}") from e
+        return path
+
+    def get(self, path):
+        try:
+            with open(self._local_path(path), "rb") as f:
+                return f.read()
+        except OSError as e:
+            raise StorageError(f"Download failed: {e}") from e
+
+    def _rev(self, local_path):
+        stat = os.stat(local_path)
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def get_versioned(self, path):
+        local_path = self._local_path(path)
+        try:
+            with open(local_path, "rb") as f:
+                rev = self._rev(f.fileno())
+                return f.read(), rev
+        except OSError as e:
+            raise StorageError(f"Download failed: {e}") from e
+
+    def put_if_unchanged(self, path, data, rev):
+        # Best effort: the rev is compared just before the atomic replace
+        try:
+            current = self._rev(self._local_path(path))
+        except OSError as e:
+            raise StorageConflict(f"{path} changed since it was read") from e
+        if current != rev:
+            raise StorageConflict(f"{path} changed since it was read")
+        folder, filename = path.rsplit("/", 1)
+        return self.put(folder, filename, data)
+
+    def list(self, folder):
+        local_dir = self._local_path(join_path(folder, ""))
+        if not os.path.isdir(local_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(local_dir)
+            if os.path.isfile(os.path.join(local_dir, name)) and not name.endswith(".tmp")
+        )
+
+    def exists(self, folder, filename):
+        return os.path.isfile(self._local_path(join_path(folder, filename)))
+
+    def link(self, path):
+        local_path = self._local_path(path)
+        return "file://" + local_path if os.path.isfile(local_path) else None
+
+    def health(self):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            return os.access(self.root, os.W_OK)
+        except OSError:
+            return False
+
+
+# ---------------------
+# 🧪 In-Memory Fake
+# ---------------------
+class InMemoryBackend(StorageBackend):
+    """
+    Process-local fake for load tests
+
+    Args:
+        latency (float or tuple): Seconds added to every call, or a (min, max) range
+        failure_rate (float): Probability that a call raises StorageError
+        seed (int): Seed for reproducible failure injection
+    """
+
+    name = "in-memory storage"
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.files = {}
+        self.revs = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate(self, operation):
+        with self._lock:
+            if isinstance(self.latency, (list, tuple)):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = self.latency
+            fail = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise StorageError(f"Injected failure during {operation}")
+
+    def put(self, folder, filename, data):
+        self._simulate("put")
+        path = join_path(folder, filename)
+        with self._lock:
+            self.files[path] = bytes(data)
+            self.revs[path] = self.revs.get(path, 0) + 1
+        return path
+
+    def get(self, path):
+        self._simulate("get")
+        with self._lock:
+            if path not in self.files:
+                raise StorageError(f"Download failed: {path} not found")
+            return self.files[path]
+
+    def get_versioned(self, path):
+        self._simulate("get")
+        with self._lock:
+            if path not in self.files:
+                raise StorageError(f"Download failed: {path} not found")
+            return self.files[path], self.revs[path]
+
+    def put_if_unchanged(self, path, data, rev):
+        self._simulate("put")
+        with self._lock:
+            if self.revs.get(path) != rev:
+                raise StorageConflict(f"{path} changed since it was read")
+            self.files[path] = bytes(data)
+            self.revs[path] = rev + 1
+        return path
+
+    def list(self, folder):
+        self._simulate("list")
+        prefix = join_path(folder, "")
+        with self._lock:
+            return sorted(
+                path[len(prefix):] for path in self.files
+                if path.startswith(prefix) and "/" not in path[len(prefix):]
+            )
+
+    def exists(self, folder, filename):
+        self._simulate("exists")
+        with self._lock:
+            return join_path(folder, filename) in self.files
+
+    def link(self, path):
+        self._simulate("link")
+        with self._lock:
+            return "memory://" + path if path in self.files else None
+
+    def health(self):
+        try:
+            self._simulate("health")
+            return True
+        except StorageError:
+            return False
+
+
+def create_backend(settings):
+    """
+    Build a backend from a settings mapping (e.g. st.secrets["storage"])
+
+    Args:
+        settings (dict): "backend" plus that backend's options
+
+    Returns:
+        StorageBackend: The configured backend
+    """
+    kind = settings.get("backend", "dropbox")
+    if kind == "dropbox":
+        return DropboxBackend(settings.get("credentials"))
+    if kind == "local":
+        return LocalFilesystemBackend(settings.get("root", "storage"))
+    if kind == "memory":
+        latency = settings.get("latency", 0.0)
+        return InMemoryBackend(
+            latency=tuple(latency) if isinstance(latency, (list, tuple)) else latency,
+            failure_rate=settings.get("failure_rate", 0.0),
+            seed=settings.get("seed")
+        )
+    raise ValueError(f"Unknown storage backend: {kind} (expected dropbox, local or memory)")
+
+
+def storage_settings(secrets):
+    """Storage settings from Streamlit secrets, defaulting to Dropbox and its folder_path"""
+    settings = dict(secrets.get("storage", {}))
+    settings.setdefault("folder", secrets.get("dropbox", {}).get("folder_path", "/CVs"))
+    if settings.get("backend", "dropbox") == "dropbox":
+        settings.setdefault("credentials", dropbox_credentials(secrets))
+    return settings
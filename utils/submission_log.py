@@ -0,0 +1,243 @@
+# utils/submission_log.py
+"""
+Append-only, columnar log of generated CVs
+
+One compact row per CV (qualification, counts, timings, size, upload status).
+Rows are buffered in memory and appended as Parquet row groups to one open
+file per date partition, which is rotated by size and age:
+
+    logs/submissions/date=2026-10-19/part-<timestamp>-<id>.parquet
+
+No raw PII is stored unless include_pii is enabled. Query from the project root:
+
+    python -m utils.submission_log summary --since 2026-10-01 --group-by highest_qualification
+"""
+import argparse
+import atexit
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_LOG_DIR = os.path.join("logs", "submissions")
+DEFAULT_MAX_ROWS = 500
+DEFAULT_MAX_AGE_SECONDS = 60
+DEFAULT_MAX_FILE_ROWS = 100_000
+DEFAULT_MAX_FILE_SECONDS = 900
+DEFAULT_CHECK_SECONDS = 5
+
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ms")),
+    ("highest_qualification", pa.string()),
+    ("is_married", pa.string()),
+    ("num_education_levels", pa.int16()),
+    ("num_certifications", pa.int16()),
+    ("num_employers", pa.int16()),
+    ("template", pa.string()),
+    ("renderer", pa.string()),
+    ("render_ms", pa.float32()),
+    ("encrypt_ms", pa.float32()),
+    ("upload_ms", pa.float32()),
+    ("size_bytes", pa.int64()),
+    ("upload_status", pa.string()),
+    ("storage", pa.string()),
+    ("name", pa.string()),
+    ("phone", pa.string()),
+])
+PII_FIELDS = ("name", "phone")
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+DATASET_SCHEMA = SCHEMA.append(pa.field("date", pa.string()))
+
+
+def submission_row(user_data, **metrics):
+    """
+    Build a log row from user_data and pipeline metrics
+
+    Args:
+        user_data (dict): CV data
+        **metrics: template, renderer, render_ms, encrypt_ms, upload_ms,
+            size_bytes, upload_status, storage
+
+    Returns:
+        dict: Row matching SCHEMA (PII fields included; dropped on append unless enabled)
+    """
+    row = {
+        "timestamp": datetime.now(),
+        "highest_qualification": user_data.get("highest_qualification"),
+        "is_married": user_data.get("is_married"),
+        "num_education_levels": len(user_data.get("education") or {}),
+        "num_certifications": len(user_data.get("certifications") or []),
+        "num_employers": len(user_data.get("work_experience") or []),
+        "name": user_data.get("name"),
+        "phone": user_data.get("phone"),
+    }
+    row.update(metrics)
+    return row
+
+
+class SubmissionLog:
+    """
+    Thread-safe buffered writer
+
+    Rows are buffered in memory and written as one row group when max_rows are
+    buffered, or by a background timer once the oldest row is max_age_seconds
+    old. Each date partition has one open ParquetWriter. Its file is rotated
+    (closed and renamed into place) after max_file_rows rows or
+    max_file_seconds, when the date changes, and at interpreter exit. Until it
+    is rotated, the file is hidden from readers (leading '.'). A hard kill
+    loses the buffered rows and the open file, so max_file_seconds bounds that
+    loss.
+    """
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, max_rows=DEFAULT_MAX_ROWS,
+                 max_age_seconds=DEFAULT_MAX_AGE_SECONDS, include_pii=False,
+                 max_file_rows=DEFAULT_MAX_FILE_ROWS, max_file_seconds=DEFAULT_MAX_FILE_SECONDS):
+        self.log_dir = log_dir
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self.include_pii = include_pii
+        self.max_file_rows = max_file_rows
+        self.max_file_seconds = max_file_seconds
+        self._rows = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        # Writers are only touched under _write_lock, so append() never waits on disk I/O
+        self._writers = {}
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True, name="submission-log")
+        self._timer.start()
+        atexit.register(self.close)
+
+    def append(self, row):
+        if not self.include_pii:
+            row = {k: v for k, v in row.items() if k not in PII_FIELDS}
+        with self._lock:
+            self._rows.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = len(self._rows) >= self.max_rows
+        if due:
+            self.flush()
+
+    def _flush_periodically(self):
+        interval = min(DEFAULT_CHECK_SECONDS, self.max_age_seconds)
+        while not self._closed.wait(interval):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_age_seconds
+            if due:
+                self.flush()
+            else:
+                self._rotate(force=False)
+
+    def flush(self):
+        """Write buffered rows as one row group per date, to that date's open file"""
+        with self._lock:
+            rows, self._rows, self._oldest = self._rows, [], None
+
+        by_date = {}
+        for row in rows:
+            by_date.setdefault(row["timestamp"].date().isoformat(), []).append(row)
+
+        with self._write_lock:
+            for day, day_rows in by_date.items():
+                writer = self._writers.get(day) or self._open(day)
+                writer["writer"].write_table(pa.Table.from_pylist(day_rows, schema=SCHEMA))
+                writer["rows"] += len(day_rows)
+            self._rotate_locked(force=False)
+
+    def close(self):
+        """Stop the timer, write buffered rows and close every open file (runs at exit)"""
+        self._closed.set()
+        self.flush()
+        self._rotate(force=True)
+
+    def _open(self, day):
+        partition_dir = os.path.join(self.log_dir, f"date={day}")
+        os.makedirs(partition_dir, exist_ok=True)
+        filename = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(partition_dir, "." + filename)
+        self._writers[day] = {
+            "writer": pq.ParquetWriter(tmp_path, SCHEMA, compression="zstd"),
+            "tmp_path": tmp_path,
+            "path": os.path.join(partition_dir, filename),
+            "opened": time.monotonic(),
+            "rows": 0,
+        }
+        return self._writers[day]
+
+    def _rotate(self, force):
+        with self._write_lock:
+            self._rotate_locked(force)
+
+    def _rotate_locked(self, force):
+        today = datetime.now().date().isoformat()
+        for day, writer in list(self._writers.items()):
+            if (force or day != today or writer["rows"] >= self.max_file_rows
+                    or time.monotonic() - writer["opened"] >= self.max_file_seconds):
+                writer["writer"].close()
+                os.replace(writer["tmp_path"], writer["path"])
+                del self._writers[day]
+
+
+def load_log(log_dir=DEFAULT_LOG_DIR, since=None, until=None, columns=None):
+    """
+    Read the log as a pyarrow Table, pruning date partitions outside [since, until]
+
+    Args:
+        since (date or str): First date to include
+        until (date or str): Last date to include
+        columns (list): Columns to read (all by default)
+    """
+    if not os.path.isdir(log_dir):
+        empty = DATASET_SCHEMA.empty_table()
+        return empty.select(columns) if columns else empty
+
+    dataset = ds.dataset(log_dir, format="parquet", schema=DATASET_SCHEMA,
+                         partitioning=PARTITIONING, exclude_invalid_files=True)
+    expression = None
+    if since:
+        expression = ds.field("date") >= str(since)
+    if until:
+        clause = ds.field("date") <= str(until)
+        expression = clause if expression is None else expression & clause
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def summarize(log_dir=DEFAULT_LOG_DIR, since=None, until=None, group_by=("highest_qualification",)):
+    """Counts, size and timing aggregates grouped by the given columns"""
+    group_by = list(group_by)
+    table = load_log(log_dir, since, until, columns=group_by + ["size_bytes", "render_ms", "upload_ms"])
+    return table.group_by(group_by).aggregate([
+        ("size_bytes", "count"),
+        ("size_bytes", "mean"),
+        ("render_ms", "mean"),
+        ("render_ms", "max"),
+        ("upload_ms", "mean"),
+    ]).rename_columns(group_by + ["cvs", "avg_size_bytes", "avg_render_ms", "max_render_ms", "avg_upload_ms"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the CV submission log")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    summary = sub.add_parser("summary", help="aggregate submissions")
+    summary.add_argument("--log-dir", default=DEFAULT_LOG_DIR)
+    summary.add_argument("--since", help="first date, YYYY-MM-DD")
+    summary.add_argument("--until", help="last date, YYYY-MM-DD")
+    summary.add_argument("--group-by", nargs="+", default=["highest_qualification"],
+                         help="columns to group by, e.g. date upload_status")
+
+    args = parser.parse_args(argv)
+    if args.command == "summary":
+        result = summarize(args.log_dir, args.since, args.until, args.group_by)
+        print(result.to_pandas().sort_values(args.group_by).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()